@@ -0,0 +1,421 @@
+"""
+@author: Team Mizogg
+
+Headless keyhunt runner for machines without a display.
+
+    python -m keyhunt_runner run -m bsgs -r 400000000000000000:7FFFFFFFFFFFFFFFFF -k 128 --instances 4 -t 2
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+from libs import keyhunt_core
+from libs.keyhunt_parser import KeyFoundEvent, ErrorEvent
+from libs.chunk_scheduler import CHUNK_BITS
+from libs.cpu_topology import describe_placement
+from libs.input_compiler import compile_input, describe_manifest, RMD160, PUBKEY
+from libs.preflight import check_input, scan_input
+from libs.memory_planner import largest_fitting_k
+from libs.orchestrator import Orchestrator
+from libs.range_ledger import LEDGER_FILE
+from libs.restart_policy import describe_exit
+from libs.throughput import format_rate, format_duration
+from libs import tuner
+from libs import benchmark
+from libs import coordinator
+from libs.worker_agent import WorkerAgent
+
+
+def log(message):
+    print(f"[{datetime.now():%H:%M:%S}] {message}", flush=True)
+
+
+def add_keyhunt_arguments(parser):
+    """Options mirroring the GUI's shared configuration"""
+    parser.add_argument("-m", "--mode", choices=keyhunt_core.MODES, default="address")
+    parser.add_argument("-t", "--threads", type=int, default=None, help="CPUs per instance, default tuned or 1")
+    parser.add_argument("-c", "--crypto", choices=keyhunt_core.CRYPTOS, default="btc")
+    parser.add_argument("-B", "--move-mode", default="random",
+                        choices=sorted(set(keyhunt_core.MOVE_MODES + keyhunt_core.BSGS_MOVE_MODES)))
+    parser.add_argument("-I", "--stride", default="1")
+    parser.add_argument("-l", "--look", choices=keyhunt_core.LOOK_TYPES, default="compress")
+    parser.add_argument("-f", "--file", default="btc.txt", help="file name in input/ or a path")
+    parser.add_argument("-k", "--k-value", choices=keyhunt_core.K_VALUES + ["auto"], default=None,
+                        help="BSGS K factor, auto picks the largest that fits in RAM for all instances, default tuned or 1")
+    parser.add_argument("-n", "--n-value", default="", help="BSGS N value, e.g. 0x1000000000000000")
+    parser.add_argument("-q", "--quiet", action="store_true", help="pass -q to keyhunt")
+    parser.add_argument("-S", "--share-table", action="store_true",
+                        help="BSGS: build the bloom/bP table once with keyhunt -S, other instances load it")
+    parser.add_argument("-r", "--range", default=keyhunt_core.DEFAULT_RANGE, help="hex start:end")
+
+
+def apply_tuned(args):
+    """Fill instances, threads and -k left unset from the tuned optimum for this mode and host"""
+    tuned = tuner.load_tuned(args.mode)
+    trial = tuned[0] if tuned else None
+    used = []
+    if getattr(args, "instances", 1) is None:
+        args.instances = trial.instances if trial else 1
+        used.append(f"{args.instances} instance(s)")
+    if args.threads is None:
+        args.threads = trial.threads if trial else 1
+        used.append(f"{args.threads} thread(s)")
+    if args.k_value is None:
+        args.k_value = str(trial.k_value) if trial and args.mode == "bsgs" else "1"
+        if args.mode == "bsgs":
+            used.append(f"-k {args.k_value}")
+    if trial and used:
+        log(f"Tuned for {args.mode} on {tuner.host_name()}: {', '.join(used)} ({format_rate(tuned[1])} measured)")
+
+
+def config_from_args(args):
+    apply_tuned(args)
+    k_value = args.k_value
+    if k_value == "auto":
+        k_value = largest_fitting_k(args.n_value, getattr(args, "instances", 1))
+        if k_value is None:
+            raise ValueError("No K factor fits in the available RAM, use fewer instances or a smaller N value")
+        log(f"Selected -k {k_value} for the available RAM")
+    return keyhunt_core.KeyhuntConfig(
+        mode=args.mode,
+        thread_count=args.threads,
+        crypto=args.crypto,
+        move_mode=args.move_mode,
+        stride=args.stride,
+        look=args.look,
+        input_file=args.file,
+        k_value=k_value,
+        n_value=args.n_value,
+        quiet=args.quiet,
+        save_table=args.share_table,
+    )
+
+
+class HeadlessRunner:
+    """Drive the orchestrator without a GUI and stream aggregated stats to stdout"""
+
+    def __init__(self, config, ranges, pin=True, verbose=False, ledger_file=LEDGER_FILE, chunk_bits=None,
+                 table_cache=True, auto_restart=True, max_restarts=None, restart_stalled=False):
+        self.config = config
+        self.ranges = ranges
+        self.chunk_bits = chunk_bits
+        self.verbose = verbose
+        self.engine = Orchestrator(on_output=self.on_output, on_event=self.on_event,
+                                   on_finished=self.on_finished, pin_cpus=pin, ledger_file=ledger_file)
+        self.engine.table_cache_enabled = table_cache
+        self.engine.auto_restart = auto_restart
+        if max_restarts is not None:
+            self.engine.get_restart_policy().max_restarts = max_restarts
+        if restart_stalled:
+            self.engine.watchdog.restart_stalled = True
+        self.tracker = self.engine.tracker
+
+    def on_output(self, instance_number, line):
+        if self.verbose or line.startswith(("Executing command", "Error", "Table cache", "Preflight", "Crashed", "Not restarting",
+                                          "Stall", "Terminating stalled")):
+            log(f"#{instance_number} {line.strip()}")
+
+    def on_event(self, instance_number, event):
+        if isinstance(event, KeyFoundEvent):
+            log(f"Instance {instance_number} FOUND KEY: {event.private_key}")
+        elif isinstance(event, ErrorEvent) and event.level == "error":
+            log(f"Instance {instance_number} error: {event.message}")
+
+    def on_finished(self, instance_number, exit_code):
+        instance = self.engine.instances.get(instance_number)
+        if instance:
+            log(f"Instance {instance_number}: {describe_exit(exit_code, instance.stop_requested, instance.last_error)}")
+        else:
+            log(f"Instance {instance_number} exited with code {exit_code}")
+
+    def report(self):
+        self.tracker.tick()
+        parts = [f"Total {format_rate(self.tracker.total_keys_per_second())} "
+                 f"(avg {format_rate(self.tracker.total_rolling_average())})"]
+        for stats in self.tracker.instances.values():
+            stall = self.engine.watchdog.describe_stall(stats.instance_number)
+            parts.append(f"#{stats.instance_number} {format_rate(stats.keys_per_second)} "
+                         f"{stats.progress() * 100:.6f}% ETA {format_duration(stats.eta_seconds())}"
+                         + (f" STALLED {stall}" if stall else ""))
+        log(" | ".join(parts))
+
+    def run(self, stats_interval, metrics_port=None):
+        try:
+            metrics = self.engine.serve_metrics(metrics_port)
+        except OSError as e:
+            log(f"Metrics endpoint not started: {e}")
+            metrics = None
+        if metrics:
+            log(f"Metrics served on {metrics.url}")
+        self.engine.start_all(self.config, self.ranges, chunk_bits=self.chunk_bits)
+        if self.engine.topology:
+            log(f"CPU topology: {self.engine.topology.summary()}")
+        for instance in self.engine.instances.values():
+            if instance.placement:
+                log(f"Instance {instance.instance_number} placed on {describe_placement(instance.placement)}")
+        next_report = time.monotonic() + stats_interval
+        try:
+            while self.engine.running():
+                time.sleep(0.2)
+                if time.monotonic() >= next_report:
+                    self.report()
+                    next_report += stats_interval
+        except KeyboardInterrupt:
+            log("Stopping all instances")
+        finally:
+            self.engine.stop_all().result()
+            for instance in self.engine.instances.values():
+                if instance.task is not None:
+                    concurrent.futures.wait([instance.task], timeout=1)
+        self.report()
+        return 0
+
+
+def cmd_run(args):
+    config = config_from_args(args)
+    start_range, end_range = keyhunt_core.parse_range(args.range)
+    ranges = keyhunt_core.split_range(start_range, end_range, args.instances)
+    runner = HeadlessRunner(config, ranges, pin=not args.no_pin, verbose=args.verbose,
+                            ledger_file=None if args.no_ledger else args.ledger, chunk_bits=args.chunk_bits,
+                            table_cache=not args.no_table_cache, auto_restart=not args.no_restart,
+                            max_restarts=args.max_restarts, restart_stalled=args.restart_stalled)
+    return runner.run(args.stats_interval, args.metrics_port)
+
+
+def cmd_tune(args):
+    instance_choices = args.instances
+    args.instances = 1  # the grid decides, keep apply_tuned from filling it in
+    config = config_from_args(args)
+    grid = tuner.default_grid(config, instance_choices=instance_choices, k_values=args.k_grid,
+                              thread_choices=args.threads_grid)
+    if not grid:
+        raise ValueError("Nothing to try, no combination fits in RAM")
+    log(f"Timing {len(grid)} combination(s) for {args.seconds}s each on a throwaway range")
+    results = tuner.tune(config, grid, args.seconds, progress=log)
+    working = [result for result in results if not result.error]
+    if not working:
+        log("No combination produced a speed line")
+        return 1
+    for result in working:
+        log(tuner.describe_result(result, config.mode))
+    best = working[0]
+    if args.dry_run:
+        log(f"Best: {tuner.describe_trial(best.trial, config.mode)}")
+    else:
+        tuner.save_best(best, config.mode)
+        log(f"Saved {tuner.describe_trial(best.trial, config.mode)} as [{tuner.section_name(config.mode)}] in config.ini")
+    return 0
+
+
+def cmd_benchmark(args):
+    if args.compare:
+        return report_changes(*(benchmark.load_report(path) for path in args.compare), args.threshold)
+    if args.threads is None:
+        args.threads = multiprocessing.cpu_count()
+    if args.k_value is None:
+        args.k_value = "1"  # fixed settings, tuned values would differ between machines
+    config = config_from_args(args)
+    baseline = benchmark.load_report(args.baseline) if args.baseline else None
+    inputs = {"address": args.file, "bsgs": args.bsgs_file}
+    if "rmd160" in args.modes:
+        inputs["rmd160"] = benchmark.rmd160_input(args.file, progress=log)
+    cases = benchmark.default_cases(args.modes, args.looks, inputs)
+    key_range = keyhunt_core.parse_range(args.range) if args.range else tuner.TRIAL_RANGE
+    log(f"Benchmarking {len(cases)} case(s) for {args.seconds}s each with {args.threads} thread(s)")
+    report = benchmark.run_benchmark(config, cases, args.seconds, key_range, progress=log)
+    prefix = args.output or f"benchmarks/{report['host']}-{time.strftime('%Y%m%d-%H%M%S')}"
+    for path in benchmark.write_report(report, prefix):
+        log(f"Wrote {path}")
+    if baseline:
+        return report_changes(baseline, report, args.threshold)
+    return 0 if all(not row["error"] for row in report["results"]) else 1
+
+
+def report_changes(baseline, current, threshold):
+    """Log the comparison of two reports, returns 1 when anything regressed"""
+    log(f"Baseline {baseline['host']} {baseline['created']}, current {current['host']} {current['created']}")
+    if baseline["keyhunt"]["sha256"] != current["keyhunt"]["sha256"]:
+        log("Different keyhunt builds")
+    changes = benchmark.compare_reports(baseline, current, threshold)
+    for change in changes:
+        log(benchmark.describe_change(change))
+    regressions = [change for change in changes if change.status == "regression"]
+    log(f"{len(regressions)} regression(s)" if regressions else "No regressions")
+    return 1 if regressions else 0
+
+
+def cmd_coordinator(args):
+    if args.threads is None:
+        args.threads = 1  # every worker picks its own
+    if args.k_value is None:
+        args.k_value = "1"  # workers differ in RAM, a tuned -k of this machine may not fit theirs
+    config = config_from_args(args)
+    start_range, end_range = keyhunt_core.parse_range(args.range)
+    settings = coordinator.read_settings()
+    job = coordinator.Coordinator(config, start_range, end_range, args.chunk_bits,
+                                  ledger_file=None if args.no_ledger else args.ledger,
+                                  token=settings["token"] if args.token is None else args.token,
+                                  lease_seconds=settings["lease_seconds"], progress_seconds=settings["progress_seconds"])
+    job.on_log = log
+    server = coordinator.CoordinatorServer(job, args.host or settings["host"], args.port or settings["port"]).start()
+    log(f"Coordinator serving {server.url}, start workers with: keyhunt_runner.py worker --coordinator {server.url}")
+    next_report = time.monotonic()
+    try:
+        while not job.finished():
+            if time.monotonic() >= next_report:
+                log(" | ".join(coordinator.describe_status(job.status())[1:3]))
+                next_report += args.stats_interval
+            time.sleep(0.5)
+        log("Every chunk is searched")
+    except KeyboardInterrupt:
+        log("Stopping the coordinator, leased chunks are queued again when it restarts")
+    finally:
+        server.stop()
+        for line in coordinator.describe_status(job.status()):
+            log(line)
+        job.close()
+    return 0
+
+
+def cmd_worker(args):
+    def on_output(instance_number, line):
+        if args.verbose or line.startswith(("Executing command", "Error", "Preflight", "Crashed", "Not restarting",
+                                            "Stall", "Terminating stalled", "Next chunk")):
+            log(f"#{instance_number} {line.strip()}")
+
+    client = coordinator.CoordinatorClient.from_config(args.coordinator, args.token)
+    agent = WorkerAgent(client, args.instances, args.threads, args.name, pin_cpus=not args.no_pin,
+                        on_output=on_output, log=log)
+    try:
+        agent.run()
+    except KeyboardInterrupt:
+        log("Worker stopped, unfinished chunks handed back to the coordinator")
+    except OSError as e:
+        raise ValueError(f"Coordinator {client.url} not reachable: {e}")
+    return 0
+
+
+def cmd_compile(args):
+    manifest = compile_input(keyhunt_core.input_path(args.source), args.output, args.kind, progress=log)
+    log(describe_manifest(manifest))
+    for error in manifest["stats"]["first_errors"]:
+        log(f"  {error}")
+    return 0
+
+
+def cmd_preflight(args):
+    config = config_from_args(args)
+    for warning in check_input(config):
+        log(f"Warning: {warning}")
+    log(f"{config.input_file} suits {config.mode} mode")
+    log(scan_input(keyhunt_core.input_path(config.input_file), progress=log).describe())
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="keyhunt_runner", description="Headless KeyHunter runner")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="launch keyhunt instances and stream stats")
+    add_keyhunt_arguments(run_parser)
+    run_parser.add_argument("--instances", type=int, default=None, help="number of keyhunt instances, default tuned or 1")
+    run_parser.add_argument("--no-pin", action="store_true", help="do not pin instances to CPUs and NUMA nodes")
+    run_parser.add_argument("--stats-interval", type=float, default=10, help="seconds between stats lines")
+    run_parser.add_argument("--chunk-bits", type=int, choices=CHUNK_BITS, default=None,
+                            help="hand out 2^N key chunks on demand instead of one slice per instance")
+    run_parser.add_argument("--ledger", default=LEDGER_FILE, help="range ledger database for sequential scans")
+    run_parser.add_argument("--no-ledger", action="store_true", help="search the whole range, ignore the ledger")
+    run_parser.add_argument("--no-table-cache", action="store_true",
+                            help="do not reuse or store tables in the cache configured in config.ini")
+    run_parser.add_argument("--no-restart", action="store_true", help="leave crashed instances stopped")
+    run_parser.add_argument("--max-restarts", type=int, default=None,
+                            help="restarts allowed per instance, default from [restart] in config.ini")
+    run_parser.add_argument("--restart-stalled", action="store_true",
+                            help="restart instances the watchdog finds silent or slowed down for too long")
+    run_parser.add_argument("--metrics-port", type=int, default=None,
+                            help="serve Prometheus metrics on 127.0.0.1:PORT/metrics, default from [metrics] in config.ini")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="echo keyhunt output")
+    run_parser.set_defaults(func=cmd_run)
+
+    preflight_parser = subparsers.add_parser("preflight", help="check the input file against the mode and print its statistics")
+    add_keyhunt_arguments(preflight_parser)
+    preflight_parser.set_defaults(func=cmd_preflight)
+
+    tune_parser = subparsers.add_parser("tune", help="time instance, thread and -k combinations and save the fastest")
+    add_keyhunt_arguments(tune_parser)
+    tune_parser.add_argument("--instances", type=int, nargs="+", default=None,
+                             help="instance counts to try, default powers of two")
+    tune_parser.add_argument("--threads-grid", type=int, nargs="+", default=None,
+                             help="-t values to try with each instance count, default powers of two and the even split "
+                                  "that use half to all CPUs")
+    tune_parser.add_argument("--k-grid", type=int, nargs="+", default=None,
+                             help="BSGS -k values to try, default current, largest that fits and one between")
+    tune_parser.add_argument("--seconds", type=float, default=tuner.TRIAL_SECONDS, help="measured seconds per combination")
+    tune_parser.add_argument("--dry-run", action="store_true", help="print the result without saving it")
+    tune_parser.set_defaults(func=cmd_tune)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="time each mode and look type on a fixed range and write JSON and CSV reports")
+    add_keyhunt_arguments(benchmark_parser)
+    benchmark_parser.set_defaults(range=None)
+    benchmark_parser.add_argument("--modes", nargs="+", choices=keyhunt_core.MODES, default=keyhunt_core.MODES)
+    benchmark_parser.add_argument("--looks", nargs="+", choices=keyhunt_core.LOOK_TYPES, default=keyhunt_core.LOOK_TYPES)
+    benchmark_parser.add_argument("--bsgs-file", default=benchmark.BSGS_INPUT, help="public keys for bsgs mode")
+    benchmark_parser.add_argument("--seconds", type=float, default=benchmark.BENCHMARK_SECONDS,
+                                  help="measured seconds per case after its first speed line")
+    benchmark_parser.add_argument("-o", "--output", help="report path without extension, default benchmarks/<host>-<time>")
+    benchmark_parser.add_argument("--baseline", help="report to compare the new results against")
+    benchmark_parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                                  help="compare two reports without running anything")
+    benchmark_parser.add_argument("--threshold", type=float, default=benchmark.REGRESSION_THRESHOLD,
+                                  help="relative slowdown that counts as a regression, default 0.05")
+    benchmark_parser.set_defaults(func=cmd_benchmark)
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="hand out chunks of a range to worker agents on other machines")
+    add_keyhunt_arguments(coordinator_parser)
+    coordinator_parser.set_defaults(move_mode="sequential")
+    coordinator_parser.add_argument("--chunk-bits", type=int, choices=CHUNK_BITS, default=40,
+                                    help="lease 2^N key chunks, default 40")
+    coordinator_parser.add_argument("--host", default=None,
+                                    help="address to listen on, default from [distributed] in config.ini (127.0.0.1)")
+    coordinator_parser.add_argument("--port", type=int, default=None, help="default from [distributed] in config.ini (8765)")
+    coordinator_parser.add_argument("--token", default=None, help="shared secret workers must send, default from config.ini")
+    coordinator_parser.add_argument("--ledger", default=LEDGER_FILE, help="range ledger database of searched chunks")
+    coordinator_parser.add_argument("--no-ledger", action="store_true", help="keep searched chunks in memory only")
+    coordinator_parser.add_argument("--stats-interval", type=float, default=30, help="seconds between progress lines")
+    coordinator_parser.set_defaults(func=cmd_coordinator)
+
+    worker_parser = subparsers.add_parser("worker", help="search chunks leased from a coordinator")
+    worker_parser.add_argument("--coordinator", default=None,
+                               help="coordinator URL, default http://127.0.0.1:8765 or [distributed] in config.ini")
+    worker_parser.add_argument("--token", default=None, help="shared secret of the coordinator, default from config.ini")
+    worker_parser.add_argument("--instances", type=int, default=1, help="keyhunt instances on this machine")
+    worker_parser.add_argument("-t", "--threads", type=int, default=None, help="CPUs per instance, default all CPUs shared out")
+    worker_parser.add_argument("--name", default=None, help="worker name shown by the coordinator, default the host name")
+    worker_parser.add_argument("--no-pin", action="store_true", help="do not pin instances to CPUs and NUMA nodes")
+    worker_parser.add_argument("-v", "--verbose", action="store_true", help="echo keyhunt output")
+    worker_parser.set_defaults(func=cmd_worker)
+
+    compile_parser = subparsers.add_parser("compile", help="validate, dedupe and sort an input file for keyhunt")
+    compile_parser.add_argument("source", help="text file of addresses, hash160s or public keys")
+    compile_parser.add_argument("-o", "--output", help="default: next to the source, .bin or .keys.txt")
+    compile_parser.add_argument("--kind", choices=[RMD160, PUBKEY], help="default: detected from the first lines")
+    compile_parser.set_defaults(func=cmd_compile)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return 1
+    try:
+        return args.func(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+@author: Team Mizogg
+"""
+import copy
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import time
+from collections import namedtuple
+from libs import keyhunt_core
+from libs import tuner
+from libs.input_compiler import compile_input, RMD160
+
+REPORT_VERSION = 1
+BENCHMARK_SECONDS = 30
+REGRESSION_THRESHOLD = 0.05  # a median keys/s this much below the baseline is a regression
+STARTUP_SLACK = 1.0  # seconds, startup changes smaller than this are noise
+BSGS_INPUT = "pubkey_1_50_test.txt"
+# keyhunt searches the public keys in a bsgs file as given, -l does not change its work
+LOOK_MODES = ["address", "rmd160"]
+# Stages of building or loading the bloom filter and bP table, see keyhunt_parser.SETUP_STAGES
+TABLE_STAGES = {"bloom", "allocate", "table", "load", "sort", "checksum", "save"}
+CSV_FIELDS = ["mode", "look", "input_file", "threads", "k_value", "samples", "median_keys_per_second",
+              "p95_keys_per_second", "startup_seconds", "table_seconds", "error", "command"]
+
+Case = namedtuple("Case", ["mode", "look", "input_file"])
+Change = namedtuple("Change", ["mode", "look", "baseline", "current", "ratio", "status", "detail"])
+
+
+def default_cases(modes, looks, inputs):
+    """One case per mode and look type, bsgs once. `inputs` maps each mode to its input file"""
+    cases = []
+    for mode in modes:
+        mode_looks = looks if mode in LOOK_MODES else looks[:1]
+        cases += [Case(mode, look, inputs[mode]) for look in mode_looks]
+    return cases
+
+
+def rmd160_input(input_file, progress=None):
+    """rmd160 mode needs hash160s, compile an address list to a .bin once and reuse it"""
+    source = keyhunt_core.input_path(input_file)
+    if source.endswith(".bin"):
+        return input_file
+    output = os.path.splitext(source)[0] + ".bin"
+    if not os.path.isfile(output) or os.path.getmtime(output) < os.path.getmtime(source):
+        compile_input(source, output, RMD160, progress=progress)
+    return output if os.path.dirname(input_file) else os.path.basename(output)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(fraction * 100) - 1]
+
+
+def binary_digest(path):
+    """sha256 of the keyhunt executable, tells builds apart in reports"""
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_case(config, case, seconds=BENCHMARK_SECONDS, key_range=tuner.TRIAL_RANGE, stop_event=None):
+    """Run one mode and look type as a single instance on key_range, returns its report row"""
+    case_config = copy.copy(config)
+    case_config.mode, case_config.look, case_config.input_file = case
+    case_config.stats_seconds = tuner.STATS_SECONDS
+    command = keyhunt_core.construct_command_key(case_config, *key_range)
+    row = {
+        "mode": case.mode,
+        "look": case.look,
+        "input_file": case.input_file,
+        "threads": case_config.thread_count,
+        "k_value": case_config.k_value if case.mode == "bsgs" else None,
+        "samples": 0,
+        "median_keys_per_second": 0,
+        "p95_keys_per_second": 0,
+        "startup_seconds": None,
+        "table_seconds": None,
+        "error": None,
+        "command": " ".join(command),
+    }
+    timing = tuner.time_run(case_config, 1, seconds, key_range, stop_event=stop_event)
+    speeds, setup = timing.speeds[1], timing.setup[1]
+    if timing.error:
+        row["error"] = timing.error
+        return row
+    rates = [sample.keys_per_second for sample in tuner.measured_samples(speeds)]
+    row["samples"] = len(rates)
+    row["median_keys_per_second"] = int(statistics.median(rates))
+    row["p95_keys_per_second"] = int(percentile(rates, 0.95))
+    row["startup_seconds"] = round(speeds[0].elapsed, 2)
+    table = [event.elapsed for event in setup if event.stage in TABLE_STAGES]
+    if table:
+        # From the first table stage to the first speed line, which comes once the table is ready
+        row["table_seconds"] = round(speeds[0].elapsed - table[0], 2)
+    return row
+
+
+def run_benchmark(config, cases, seconds=BENCHMARK_SECONDS, key_range=tuner.TRIAL_RANGE, progress=None,
+                  stop_event=None):
+    """Run every case and return the report as a dict"""
+    binary = keyhunt_core.keyhunt_binary()
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": tuner.host_name(),
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "keyhunt": {"path": binary, "sha256": binary_digest(binary)},
+        "seconds": seconds,
+        "range": f"{format(key_range[0], 'x')}:{format(key_range[1], 'x')}",
+        "results": [],
+    }
+    for index, case in enumerate(cases, start=1):
+        if stop_event and stop_event.is_set():
+            break
+        if progress:
+            progress(f"Case {index}/{len(cases)}: {case.mode} {case.look} on {case.input_file}")
+        row = run_case(config, case, seconds, key_range, stop_event)
+        if progress:
+            progress(f"  {describe_row(row)}")
+        report["results"].append(row)
+    return report
+
+
+def describe_row(row):
+    if row["error"]:
+        return f"{row['mode']} {row['look']}: failed, {row['error']}"
+    text = (f"{row['mode']} {row['look']}: median {row['median_keys_per_second']:,} keys/s, "
+            f"p95 {row['p95_keys_per_second']:,} keys/s, startup {row['startup_seconds']}s")
+    if row["table_seconds"] is not None:
+        text += f", table {row['table_seconds']}s"
+    return text
+
+
+def write_report(report, prefix):
+    """Write prefix.json and prefix.csv, returns both paths"""
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    json_path, csv_path = prefix + ".json", prefix + ".csv"
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=2)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["host", "created"] + CSV_FIELDS)
+        writer.writeheader()
+        for row in report["results"]:
+            writer.writerow(dict(row, host=report["host"], created=report["created"]))
+    return json_path, csv_path
+
+
+def load_report(path):
+    """Read a JSON report, raises ValueError when it is not one"""
+    try:
+        with open(path) as f:
+            report = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read benchmark report {path}: {e}")
+    if not isinstance(report, dict) or report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path} is not a version {REPORT_VERSION} benchmark report")
+    return report
+
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Match cases by mode and look type, returns a Change per case found in either report"""
+    old = {(row["mode"], row["look"]): row for row in baseline["results"]}
+    new = {(row["mode"], row["look"]): row for row in current["results"]}
+    changes = []
+    for key in list(old) + [key for key in new if key not in old]:
+        before, after = old.get(key), new.get(key)
+        if before is None or after is None:
+            status = "new" if before is None else "missing"
+            changes.append(Change(*key, before, after, None, status, ""))
+            continue
+        if after["error"]:
+            changes.append(Change(*key, before, after, None, "regression" if not before["error"] else "failed",
+                                  after["error"]))
+            continue
+        if before["error"]:
+            changes.append(Change(*key, before, after, None, "fixed", ""))
+            continue
+        ratio = after["median_keys_per_second"] / before["median_keys_per_second"] \
+            if before["median_keys_per_second"] else None
+        status, detail = "ok", ""
+        if ratio is not None and ratio < 1 - threshold:
+            status = "regression"
+        elif ratio is not None and ratio > 1 + threshold:
+            status = "improved"
+        slower = startup_change(before, after, threshold)
+        if slower:
+            status, detail = "regression", slower
+        changes.append(Change(*key, before, after, ratio, status, detail))
+    return changes
+
+
+def startup_change(before, after, threshold):
+    """Text when startup or table build got slower by more than the threshold and STARTUP_SLACK"""
+    for field, name in (("table_seconds", "table build"), ("startup_seconds", "startup")):
+        old, new = before.get(field), after.get(field)
+        if old is not None and new is not None and new - old > max(STARTUP_SLACK, old * threshold):
+            return f"{name} {old}s -> {new}s"
+    return ""
+
+
+def describe_change(change):
+    name = f"{change.mode} {change.look}"
+    if change.status == "new":
+        return f"{name}: new, not in the baseline"
+    if change.status == "missing":
+        return f"{name}: missing from the current report"
+    if change.ratio is None:
+        return f"{name}: {change.status}" + (f", {change.detail}" if change.detail else "")
+    text = (f"{name}: {change.baseline['median_keys_per_second']:,} -> {change.current['median_keys_per_second']:,} "
+            f"keys/s ({(change.ratio - 1) * 100:+.1f}%) {change.status}")
+    return text + (f", {change.detail}" if change.detail else "")
@@ -0,0 +1,71 @@
+"""
+@author: Team Mizogg
+"""
+import threading
+from collections import deque
+
+CHUNK_BITS = [24, 28, 32, 36, 40, 44, 48, 52, 56, 60, 64]
+STATIC_SPLIT = "Static split"
+SCHEDULER_CHOICES = [STATIC_SPLIT] + [f"Chunks of 2^{bits}" for bits in CHUNK_BITS]
+
+
+def chunk_bits_from_choice(choice):
+    """Scheduler dropdown text to chunk bits, None for the static split"""
+    if choice == STATIC_SPLIT or "^" not in choice:
+        return None
+    return int(choice.rsplit("^", 1)[1])
+
+
+def chunk_end(start, end, chunk_size):
+    """End of the chunk holding `start`, chunks are aligned to multiples of chunk_size"""
+    return min(end, (start // chunk_size + 1) * chunk_size - 1)
+
+
+class ChunkQueue:
+    """Hands out fixed-size chunks of a set of intervals on demand.
+
+    Chunks are cut lazily so a 2^70 keyspace never has to be materialised, and take()
+    is thread safe because finished instances ask for work from the supervisor thread while the GUI may start a run.
+    """
+
+    def __init__(self, intervals, chunk_size):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self.chunk_size = chunk_size
+        self.intervals = deque((start, end) for start, end in intervals if start <= end)
+        self.total_keys = sum(end - start + 1 for start, end in self.intervals)
+        self.remaining_keys = self.total_keys
+        self.handed_out = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Next (start, end) chunk, or None when the keyspace is used up"""
+        with self.lock:
+            if not self.intervals:
+                return None
+            start, end = self.intervals[0]
+            piece_end = chunk_end(start, end, self.chunk_size)
+            if piece_end == end:
+                self.intervals.popleft()
+            else:
+                self.intervals[0] = (piece_end + 1, end)
+            self.remaining_keys -= piece_end - start + 1
+            self.handed_out += 1
+            return start, piece_end
+
+    def give_back(self, start, end):
+        """Queue an unfinished piece again, ahead of everything not handed out yet"""
+        if start > end:
+            return
+        with self.lock:
+            self.intervals.appendleft((start, end))
+            self.remaining_keys += end - start + 1
+
+    def remaining_chunks(self):
+        with self.lock:
+            return sum(
+                (end // self.chunk_size) - (start // self.chunk_size) + 1 for start, end in self.intervals
+            )
+
+    def __bool__(self):
+        return bool(self.intervals)
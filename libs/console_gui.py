@@ -1,16 +1,25 @@
 """
 @author: Team Mizogg
 """
-from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
+import threading
+from collections import deque
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import pyqtSlot
 
+FLUSH_INTERVAL_MS = 50  # 20 Hz
+BUFFER_LINES = 5000
+
 class ConsoleWindow(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
+        self.resourceLabel = QLabel("", self)
+        self.resourceLabel.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> CPU (100% per busy core), resident memory, major page faults, voluntary/involuntary context switches and time spent waiting for a CPU, sampled from /proc </span>')
+        self.layout.addWidget(self.resourceLabel)
         self.consoleOutput = QPlainTextEdit(self)
         self.consoleOutput.setReadOnly(True)
+        self.consoleOutput.setUndoRedoEnabled(False)
         self.layout.addWidget(self.consoleOutput)
 
         button_widget = QWidget(self)
@@ -39,10 +48,15 @@ class ConsoleWindow(QWidget):
 
         self.thresholdLabel = QLabel("Console Threshold:", self)
         self.thresholdDropdown = QComboBox(self)
-        self.thresholdDropdown.addItems(["50", "100", "500", "1000"])
+        self.thresholdDropdown.addItems(["50", "100", "500", "1000", "10000", "50000"])
         self.thresholdDropdown.setCurrentIndex(2)
+        self.thresholdDropdown.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Number of lines kept in the scrollback, oldest lines are dropped first </span>')
         button_layout.addWidget(self.thresholdLabel)
         button_layout.addWidget(self.thresholdDropdown)
+
+        self.statsLabel = QLabel("", self)
+        self.statsLabel.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Lines batched into a single update / lines dropped because output arrived faster than the console refresh </span>')
+        button_layout.addWidget(self.statsLabel)
         self.layout.addWidget(button_widget)
 
         self.clearButton.clicked.connect(self.clear_console)
@@ -51,15 +65,53 @@ class ConsoleWindow(QWidget):
         self.thresholdDropdown.currentIndexChanged.connect(self.update_threshold)
         
         self.threshold = int(self.thresholdDropdown.currentText())
+        # Bounded scrollback: Qt evicts the oldest blocks itself as new ones arrive
+        self.consoleOutput.setMaximumBlockCount(self.threshold)
+
+        # Lines are buffered here and flushed to the widget in one append per tick
+        self.output_buffer = deque(maxlen=BUFFER_LINES)
+        self.buffer_lock = threading.Lock()
+        self.lines_coalesced = 0
+        self.lines_dropped = 0
+
+        self.flushTimer = QTimer(self)
+        self.flushTimer.setInterval(FLUSH_INTERVAL_MS)
+        self.flushTimer.timeout.connect(self.flush_output)
+        self.flushTimer.start()
+
+    def set_resources(self, text):
+        if self.resourceLabel.text() != text:
+            self.resourceLabel.setText(text)
 
     def set_output(self, output):
+        """Replace the text, lines still waiting for a flush are dropped with the old text"""
+        with self.buffer_lock:
+            self.output_buffer.clear()
         self.consoleOutput.setPlainText(output)
 
     def append_output(self, output):
-        QMetaObject.invokeMethod(self.consoleOutput, "appendPlainText", Qt.ConnectionType.QueuedConnection, Q_ARG(str, output))
-        line_count = self.consoleOutput.document().blockCount()
-        if line_count > self.threshold:
-            QMetaObject.invokeMethod(self.consoleOutput, "clear", Qt.ConnectionType.QueuedConnection)
+        """Queue a line for the next flush, safe to call from any thread"""
+        with self.buffer_lock:
+            if len(self.output_buffer) == self.output_buffer.maxlen:
+                self.lines_dropped += 1
+            self.output_buffer.append(output)
+
+    @pyqtSlot()
+    def flush_output(self):
+        """Append everything buffered since the last tick in a single update"""
+        with self.buffer_lock:
+            if not self.output_buffer:
+                return
+            lines = list(self.output_buffer)
+            self.output_buffer.clear()
+            self.lines_coalesced += len(lines) - 1
+            dropped = self.lines_dropped
+
+        # Anything older than the scrollback limit would be evicted right away
+        if len(lines) > self.threshold:
+            lines = lines[-self.threshold:]
+        self.consoleOutput.appendPlainText("\n".join(lines))
+        self.statsLabel.setText(f"Coalesced: {self.lines_coalesced:,}  Dropped: {dropped:,}")
 
     @pyqtSlot()
     def clear_console(self):
@@ -79,3 +131,4 @@ class ConsoleWindow(QWidget):
     @pyqtSlot()
     def update_threshold(self):
         self.threshold = int(self.thresholdDropdown.currentText())
+        self.consoleOutput.setMaximumBlockCount(self.threshold)
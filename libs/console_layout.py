@@ -0,0 +1,98 @@
+"""
+@author: Team Mizogg
+"""
+import math
+import threading
+from collections import deque
+from libs.memory_planner import format_bytes
+from libs.throughput import format_rate
+
+MAX_GRID_CONSOLES = 8  # above this one console is shared and every instance gets a summary line
+MAX_INSTANCES = 256
+SCROLLBACK_LINES = 1000  # kept per instance while its output is not on screen
+# The shapes the Instances menu always had
+GRID_SHAPES = {1: (1, 1), 2: (1, 2), 4: (2, 2), 6: (2, 3), 8: (2, 4)}
+
+
+def grid_shape(count):
+    """(rows, cols) for `count` consoles, about twice as wide as high to suit a landscape screen"""
+    if count in GRID_SHAPES:
+        return GRID_SHAPES[count]
+    rows = max(1, round(math.sqrt(count / 2)))
+    return rows, math.ceil(count / rows)
+
+
+def uses_grid(count):
+    return count <= MAX_GRID_CONSOLES
+
+
+class InstanceLog:
+    """Scrollback of one instance in summary mode, forwarded to the shared console while it is selected.
+
+    Has the append_output, set_resources and set_status of a console so the GUIs treat both alike.
+    """
+
+    def __init__(self, instance_number, scrollback=SCROLLBACK_LINES):
+        self.instance_number = instance_number
+        self.lines = deque(maxlen=scrollback)
+        self.lock = threading.Lock()
+        self.view = None
+        self.resources = ""
+        self.status = None
+
+    def append_output(self, line):
+        """Safe to call from any thread"""
+        with self.lock:
+            self.lines.append(line)
+            if self.view is not None:
+                self.view.append_output(line)
+
+    def set_resources(self, text):
+        self.resources = text
+        if self.view is not None:
+            self.view.set_resources(text)
+
+    def set_status(self, text):
+        self.status = text
+        if self.view is not None:
+            self.view.set_status(text)
+
+    def flush(self):
+        if self.view is not None:
+            self.view.flush()
+
+    def attach(self, view):
+        """Show this instance in `view` from its scrollback on, None detaches it. GUI thread only."""
+        with self.lock:
+            self.view = view
+            if view is None:
+                return
+            view.set_output("\n".join(self.lines))
+        view.set_resources(self.resources)
+        if self.status is not None:
+            view.set_status(self.status)
+
+
+def instance_state(engine, instance_number):
+    instance = engine.instances.get(instance_number)
+    if instance is None:
+        return "idle"
+    if instance.restart_pending:
+        return "restarting"
+    if not instance.running():
+        return "stopped"
+    return "stalled" if engine.watchdog.describe_stall(instance_number) else "running"
+
+
+def summary_line(engine, instance_number, total):
+    """One line per instance, e.g.  12/24  running     4.12 Mkeys/s  0.0031%  CPU 398%  RSS 1.9 GB"""
+    state = instance_state(engine, instance_number)
+    parts = [f"{instance_number:>3}/{total}", f"{state:<10}"]
+    stats = engine.tracker.instances.get(instance_number)
+    if stats is not None:
+        rate = format_rate(stats.keys_per_second) if state in ("running", "stalled") else "-"
+        parts += [f"{rate:>15}", f"{stats.progress() * 100:.4f}%"]
+    sample = engine.sampler.latest(instance_number)
+    if sample is not None and state not in ("idle", "stopped"):
+        parts.append(f"CPU {sample.cpu_percent:.0f}%  RSS {format_bytes(sample.rss_bytes)}")
+    return "  ".join(parts)
@@ -0,0 +1,411 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import hashlib
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from libs import keyhunt_core
+from libs.chunk_scheduler import ChunkQueue
+from libs.orchestrator import RESUMABLE_MOVE_MODES
+from libs.range_ledger import LEDGER_FILE, RangeLedger, merge_intervals, search_key
+from libs.throughput import format_rate, format_duration
+
+CONFIG_FILE = "config.ini"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LEASE_SECONDS = 300  # a lease nobody reported on for this long goes back to the queue
+PROGRESS_SECONDS = 15  # how often workers report on their leases
+FOUND_FILE = "KEYFOUNDKEYFOUND.txt"
+TOKEN_HEADER = "X-Keyhunt-Token"
+MAX_LEASE_LINES = 50
+
+
+def file_digest(path):
+    """sha256 of the input file, workers must search the same targets"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_settings(path=CONFIG_FILE):
+    """The [distributed] section of config.ini"""
+    config = configparser.ConfigParser()
+    config.read(path)
+    return {
+        "host": config.get("distributed", "host", fallback=DEFAULT_HOST),
+        "port": config.getint("distributed", "port", fallback=DEFAULT_PORT),
+        "token": config.get("distributed", "token", fallback=""),
+        "lease_seconds": config.getfloat("distributed", "lease_seconds", fallback=LEASE_SECONDS),
+        "progress_seconds": config.getfloat("distributed", "progress_seconds", fallback=PROGRESS_SECONDS),
+    }
+
+
+class Lease:
+    """A chunk handed to one worker, renewed by every progress report"""
+
+    def __init__(self, lease_id, worker, start, end, now):
+        self.lease_id = lease_id
+        self.worker = worker
+        self.start = start
+        self.end = end
+        self.searched_to = start - 1
+        self.keys_per_second = 0
+        self.renewed = now
+
+    def progress(self):
+        return (self.searched_to - self.start + 1) / (self.end - self.start + 1)
+
+
+class Coordinator:
+    """Tracks which chunks of one search are done or leased and hands them to worker agents.
+
+    Searched intervals go to the range ledger, so a restarted coordinator carries on where it stopped.
+    Every method is called from the HTTP server's threads and takes the lock.
+    """
+
+    def __init__(self, config, start_range, end_range, chunk_bits, ledger_file=LEDGER_FILE, token="",
+                 lease_seconds=LEASE_SECONDS, progress_seconds=PROGRESS_SECONDS, clock=time.monotonic):
+        if config.move_mode not in RESUMABLE_MOVE_MODES:
+            raise ValueError(f"Distributed chunks need a sequential scan, {config.move_mode} never finishes a chunk")
+        self.config = config
+        self.start_range = start_range
+        self.end_range = end_range
+        self.chunk_bits = chunk_bits
+        self.token = token
+        self.lease_seconds = lease_seconds
+        self.progress_seconds = progress_seconds
+        self.clock = clock
+        self.input_digest = file_digest(keyhunt_core.input_path(config.input_file))
+        self.search = search_key(config)
+        self.ledger = RangeLedger(ledger_file) if ledger_file else None
+        if self.ledger:
+            self.ledger.release_stale()
+            gaps = self.ledger.uncovered(self.search, start_range, end_range)
+        else:
+            gaps = [(start_range, end_range)]
+        self.chunks = ChunkQueue(gaps, 2 ** chunk_bits)
+        self.done = [(start, end) for start, end in
+                     merge_intervals(self.ledger.done(self.search) if self.ledger else [])
+                     if end >= start_range and start <= end_range]
+        self.leases = {}  # lease_id -> Lease
+        self.expired = {}  # lease_id -> Lease queued again, its worker may still report what it searched
+        self.workers = {}  # worker_id -> registration and last_seen
+        self.found = []
+        self.lease_ids = itertools.count(1)
+        self.worker_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.on_log = None
+
+    @classmethod
+    def from_config(cls, config, start_range, end_range, chunk_bits, ledger_file=LEDGER_FILE, path=CONFIG_FILE):
+        settings = read_settings(path)
+        return cls(config, start_range, end_range, chunk_bits, ledger_file, settings["token"],
+                   settings["lease_seconds"], settings["progress_seconds"])
+
+    def log(self, message):
+        if self.on_log:
+            self.on_log(message)
+
+    def job(self):
+        """What every worker runs, thread counts are left to the worker"""
+        config = dict(vars(self.config))
+        config.pop("thread_count")
+        return {"config": config, "input_sha256": self.input_digest, "progress_seconds": self.progress_seconds}
+
+    def register(self, name, instances, threads):
+        with self.lock:
+            worker_id = f"{name}#{next(self.worker_ids)}"
+            self.workers[worker_id] = {"instances": instances, "threads": threads, "last_seen": self.clock()}
+        self.log(f"Worker {worker_id} joined with {instances} instance(s) x {threads} thread(s)")
+        return dict(self.job(), worker_id=worker_id)
+
+    def seen(self, worker_id):
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            raise ValueError(f"Unknown worker {worker_id}, register first")
+        worker["last_seen"] = self.clock()
+
+    def lease(self, worker_id):
+        """Next chunk for the worker, None when everything is searched or leased"""
+        with self.lock:
+            self.seen(worker_id)
+            self.expire()
+            chunk = self.chunks.take()
+            if chunk is None:
+                return {"lease": None, "finished": not self.leases, "remaining_chunks": 0}
+            lease = Lease(next(self.lease_ids), worker_id, chunk[0], chunk[1], self.clock())
+            self.leases[lease.lease_id] = lease
+            if self.ledger:
+                # Local runs sharing the ledger leave leased chunks alone
+                self.ledger.mark_in_flight(self.search, lease.start, lease.end)
+            return {"lease": {"id": lease.lease_id, "start": f"{lease.start:x}", "end": f"{lease.end:x}"},
+                    "remaining_chunks": self.chunks.remaining_chunks()}
+
+    def progress(self, worker_id, lease_id, searched_to, keys_per_second=0, done=False, release=False):
+        """Record what a worker searched of its lease. `done` completes it, `release` gives the rest back.
+
+        Only the worker a chunk was leased to can report on it, and only within that chunk.
+        """
+        with self.lock:
+            self.seen(worker_id)
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.worker != worker_id:
+                expired = self.expired.get(lease_id)
+                if expired is not None and expired.worker == worker_id:
+                    # Queued again, the rest may be searched twice but what this worker searched counts
+                    self.mark_searched(expired, expired.end if done else searched_to)
+                return {"known": False}
+            self.mark_searched(lease, lease.end if done else searched_to)
+            lease.keys_per_second = keys_per_second
+            lease.renewed = self.clock()
+            if done:
+                self.drop_lease(lease)
+            elif release:
+                self.drop_lease(lease, give_back=True)
+            return {"known": True}
+
+    def drop_lease(self, lease, give_back=False):
+        del self.leases[lease.lease_id]
+        if give_back:
+            self.chunks.give_back(lease.searched_to + 1, lease.end)
+        if self.ledger:
+            self.ledger.release(self.search, lease.start, lease.end)
+
+    def mark_searched(self, lease, searched_to):
+        searched_to = min(searched_to, lease.end)
+        if searched_to > lease.searched_to:
+            self.mark_done(lease.searched_to + 1, searched_to)
+            lease.searched_to = searched_to
+
+    def mark_done(self, start, end):
+        self.done = merge_intervals(self.done + [(start, end)])
+        if self.ledger:
+            self.ledger.mark_done(self.search, start, end)
+
+    def expire(self):
+        """Queue again what is left of leases whose worker stopped reporting"""
+        now = self.clock()
+        for lease in [lease for lease in self.leases.values() if now - lease.renewed > self.lease_seconds]:
+            self.drop_lease(lease, give_back=True)
+            self.expired[lease.lease_id] = lease
+            self.log(f"Lease {lease.lease_id} of {lease.worker} expired, {lease.searched_to + 1:x} to {lease.end:x} "
+                     f"queued again")
+
+    def record_found(self, worker_id, private_key, line):
+        with self.lock:
+            self.seen(worker_id)
+            self.found.append({"worker": worker_id, "private_key": private_key, "line": line,
+                               "time": time.strftime("%Y-%m-%d %H:%M:%S")})
+            with open(FOUND_FILE, "a") as f:
+                f.write(f"{line}\n")
+        self.log(f"Key found by {worker_id}: {private_key}")
+        return {"ok": True}
+
+    def searched_keys(self):
+        return sum(min(end, self.end_range) - max(start, self.start_range) + 1 for start, end in self.done)
+
+    def finished(self):
+        with self.lock:
+            self.expire()
+            return not self.chunks and not self.leases
+
+    def status(self):
+        with self.lock:
+            self.expire()
+            now = self.clock()
+            leases = sorted(self.leases.values(), key=lambda lease: lease.lease_id)
+            return {
+                "job": {"mode": self.config.mode, "crypto": self.config.crypto, "look": self.config.look,
+                        "input_file": self.config.input_file, "k_value": self.config.k_value,
+                        "range": f"{self.start_range:x}:{self.end_range:x}", "chunk_bits": self.chunk_bits},
+                "total_keys": self.end_range - self.start_range + 1,
+                "searched_keys": self.searched_keys(),
+                "remaining_chunks": self.chunks.remaining_chunks(),
+                "finished": not self.chunks and not self.leases,
+                "workers": [
+                    {"id": worker_id, "instances": worker["instances"], "threads": worker["threads"],
+                     "leases": sum(1 for lease in leases if lease.worker == worker_id),
+                     "keys_per_second": sum(lease.keys_per_second for lease in leases if lease.worker == worker_id),
+                     "last_seen_seconds": round(now - worker["last_seen"], 1)}
+                    for worker_id, worker in self.workers.items()
+                ],
+                "leases": [
+                    {"id": lease.lease_id, "worker": lease.worker, "start": f"{lease.start:x}", "end": f"{lease.end:x}",
+                     "progress": round(lease.progress(), 6), "keys_per_second": lease.keys_per_second,
+                     "renewed_seconds": round(now - lease.renewed, 1)}
+                    for lease in leases
+                ],
+                "found": list(self.found),
+            }
+
+    def close(self):
+        if self.ledger:
+            self.ledger.close()
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    coordinator = None
+
+    def authorized(self):
+        token = self.coordinator.token
+        if token and self.headers.get(TOKEN_HEADER, "") != token:
+            self.reply(403, {"error": "wrong or missing token"})
+            return False
+        return True
+
+    def reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        if self.path.split("?")[0] != "/status":
+            self.reply(404, {"error": f"no such endpoint {self.path}"})
+            return
+        self.reply(200, self.coordinator.status())
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        coordinator = self.coordinator
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            path = self.path.split("?")[0]
+            if path == "/register":
+                payload = coordinator.register(str(request.get("name", self.client_address[0])),
+                                               int(request.get("instances", 1)), int(request.get("threads", 1)))
+            elif path == "/lease":
+                payload = coordinator.lease(request["worker_id"])
+            elif path == "/progress":
+                payload = coordinator.progress(request["worker_id"], int(request["lease_id"]),
+                                               int(request["searched_to"], 16), int(request.get("keys_per_second", 0)),
+                                               bool(request.get("done")), bool(request.get("release")))
+            elif path == "/found":
+                payload = coordinator.record_found(request["worker_id"], str(request["private_key"]),
+                                                   str(request.get("line", "")))
+            else:
+                self.reply(404, {"error": f"no such endpoint {path}"})
+                return
+        except (ValueError, KeyError, TypeError) as e:
+            self.reply(400, {"error": str(e) if not isinstance(e, KeyError) else f"missing field {e}"})
+            return
+        self.reply(200, payload)
+
+    def log_message(self, format, *args):
+        pass  # every worker reports every few seconds
+
+
+class CoordinatorServer:
+    """HTTP front of a Coordinator on a daemon thread, same shape as the metrics exporter"""
+
+    def __init__(self, coordinator, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.coordinator = coordinator
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Bind and serve, raises OSError when the port is taken"""
+        handler = type("BoundCoordinatorHandler", (CoordinatorHandler,), {"coordinator": self.coordinator})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="keyhunt-coordinator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class CoordinatorClient:
+    """JSON over HTTP to a coordinator. Raises OSError when it can't be reached, ValueError when it refuses."""
+
+    def __init__(self, url, token="", timeout=10):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, url=None, token=None, path=CONFIG_FILE):
+        settings = read_settings(path)
+        host = "127.0.0.1" if settings["host"] in ("", "0.0.0.0") else settings["host"]
+        return cls(url or f"http://{host}:{settings['port']}", settings["token"] if token is None else token)
+
+    def call(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise ValueError(f"Coordinator refused {path}: {message}")
+
+    def status(self):
+        return self.call("/status")
+
+
+def describe_status(status):
+    """Lines for a viewer or the coordinator's log"""
+    job = status["job"]
+    total, searched = status["total_keys"], status["searched_keys"]
+    speed = sum(worker["keys_per_second"] for worker in status["workers"])
+    eta = (total - searched) / speed if speed else None
+    lines = [
+        f"Job: {job['mode']} {job['crypto']} {job['look']} on {job['input_file']}, range {job['range']}, "
+        f"chunks of 2^{job['chunk_bits']}",
+        f"Searched: {searched / total * 100:.6f}% ({searched:,} of {total:,} keys), "
+        f"{status['remaining_chunks']:,} chunks queued, {len(status['leases'])} leased"
+        + (", finished" if status["finished"] else ""),
+        f"Speed: {format_rate(speed)} from {len(status['workers'])} worker(s), ETA {format_duration(eta)}",
+    ]
+    if status["workers"]:
+        lines.append("Workers:")
+        lines += [f"  {worker['id']}: {worker['instances']} x {worker['threads']} threads, "
+                  f"{format_rate(worker['keys_per_second'])}, {worker['leases']} lease(s), "
+                  f"seen {format_duration(worker['last_seen_seconds'])} ago" for worker in status["workers"]]
+    if status["leases"]:
+        lines.append("Leases:")
+        lines += [f"  #{lease['id']} {lease['worker']}: {lease['start']} to {lease['end']} "
+                  f"{lease['progress'] * 100:.2f}%" for lease in status["leases"][:MAX_LEASE_LINES]]
+        if len(status["leases"]) > MAX_LEASE_LINES:
+            lines.append(f"  ... and {len(status['leases']) - MAX_LEASE_LINES} more")
+    if status["found"]:
+        lines.append("Found:")
+        lines += [f"  {found['time']} {found['worker']}: {found['private_key']}" for found in status["found"]]
+    return lines
+
+
+def status_text(client):
+    """The coordinator's status as text for a viewer, or why it could not be fetched"""
+    try:
+        return "\n".join(describe_status(client.status()))
+    except (OSError, ValueError) as e:
+        return f"{client.url}: {e}"
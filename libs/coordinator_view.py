@@ -0,0 +1,60 @@
+"""
+@author: Team Mizogg
+"""
+import threading
+from PyQt6.QtCore import QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QFontDatabase
+from PyQt6.QtWidgets import *
+from libs.coordinator import status_text
+
+REFRESH_INTERVAL_MS = 2000
+
+
+class CoordinatorView(QDialog):
+    """Read-only view of a coordinator's /status, polled off the GUI thread"""
+    statusReceived = pyqtSignal(str)
+
+    def __init__(self, client, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.fetching = False
+        self.setWindowTitle(f"Coordinator {client.url}")
+        self.resize(760, 420)
+
+        layout = QVBoxLayout(self)
+        self.statusOutput = QPlainTextEdit(self)
+        self.statusOutput.setReadOnly(True)
+        self.statusOutput.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.statusOutput.setPlainText(f"Connecting to {client.url} ...")
+        layout.addWidget(self.statusOutput)
+
+        self.statusReceived.connect(self.show_status)
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(REFRESH_INTERVAL_MS)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.refreshTimer.start()
+        self.refresh()
+
+    @pyqtSlot()
+    def refresh(self):
+        if self.fetching:
+            return
+        self.fetching = True
+        threading.Thread(target=self.fetch, daemon=True).start()
+
+    def fetch(self):
+        text = status_text(self.client)
+        try:
+            self.statusReceived.emit(text)
+        except RuntimeError:
+            pass  # closed while the request was out
+
+    @pyqtSlot(str)
+    def show_status(self, text):
+        self.fetching = False
+        if text != self.statusOutput.toPlainText():
+            self.statusOutput.setPlainText(text)
+
+    def closeEvent(self, event):
+        self.refreshTimer.stop()
+        super().closeEvent(event)
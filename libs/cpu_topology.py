@@ -0,0 +1,174 @@
+"""
+@author: Team Mizogg
+"""
+import os
+import shutil
+from collections import namedtuple
+
+CPU_ROOT = "/sys/devices/system/cpu"
+NODE_ROOT = "/sys/devices/system/node"
+
+CpuInfo = namedtuple("CpuInfo", ["cpu", "core", "socket", "node"])
+Placement = namedtuple("Placement", ["cpus", "node", "sockets", "shared_cores"])
+
+
+def available_cpus():
+    """CPUs this process may run on, honouring any affinity already applied"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpulist(text):
+    """Kernel cpulist format, e.g. '0-3,8-11' -> [0, 1, 2, 3, 8, 9, 10, 11]"""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-")
+            cpus.extend(range(int(low), int(high) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def format_cpulist(cpus):
+    """Inverse of parse_cpulist"""
+    runs = []
+    for cpu in sorted(cpus):
+        if runs and cpu == runs[-1][1] + 1:
+            runs[-1][1] = cpu
+        else:
+            runs.append([cpu, cpu])
+    return ",".join(str(low) if low == high else f"{low}-{high}" for low, high in runs)
+
+
+def read_sysfs(path, default=None):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+class CpuTopology:
+    """Sockets, NUMA nodes and SMT siblings of the CPUs we are allowed to use"""
+
+    def __init__(self, cpus):
+        self.cpus = cpus  # list of CpuInfo
+
+    @classmethod
+    def detect(cls, cpu_root=CPU_ROOT, node_root=NODE_ROOT, allowed=None):
+        allowed = allowed if allowed is not None else available_cpus()
+        node_of = {}
+        if os.path.isdir(node_root):
+            for entry in os.listdir(node_root):
+                if entry.startswith("node") and entry[4:].isdigit():
+                    for cpu in parse_cpulist(read_sysfs(os.path.join(node_root, entry, "cpulist"), "")):
+                        node_of[cpu] = int(entry[4:])
+        cpus = []
+        for cpu in allowed:
+            topology = os.path.join(cpu_root, f"cpu{cpu}", "topology")
+            socket = int(read_sysfs(os.path.join(topology, "physical_package_id"), "0"))
+            core = int(read_sysfs(os.path.join(topology, "core_id"), str(cpu)))
+            cpus.append(CpuInfo(cpu, (socket, core), socket, node_of.get(cpu, 0)))
+        return cls(cpus)
+
+    @property
+    def sockets(self):
+        return sorted({info.socket for info in self.cpus})
+
+    @property
+    def nodes(self):
+        return sorted({info.node for info in self.cpus})
+
+    @property
+    def cores(self):
+        return len({info.core for info in self.cpus})
+
+    @property
+    def threads_per_core(self):
+        return max(1, len(self.cpus) // max(1, self.cores))
+
+    def summary(self):
+        return (f"{len(self.sockets)} socket(s), {len(self.nodes)} NUMA node(s), {self.cores} cores, "
+                f"{len(self.cpus)} CPUs ({self.threads_per_core} thread(s) per core)")
+
+    def node_cpus(self, node):
+        """CPUs of a node ordered one per physical core first, SMT siblings after"""
+        infos = [info for info in self.cpus if info.node == node]
+        sibling_index = {}
+        ordered = []
+        for info in sorted(infos, key=lambda info: (info.core, info.cpu)):
+            index = sibling_index.get(info.core, 0)
+            sibling_index[info.core] = index + 1
+            ordered.append((index, info.socket, info.core, info))
+        return [entry[-1] for entry in sorted(ordered, key=lambda entry: entry[:3])]
+
+    def plan(self, num_instances, threads_per_instance):
+        """Place instances on NUMA nodes in proportion to their size, one thread per core where possible.
+
+        A node never takes more instances than it has CPUs for. The rest spill over to nodes with
+        room to spare, then span nodes on the CPUs still free and get node None; CPUs are only
+        shared once there are more threads than CPUs.
+        """
+        nodes = self.nodes
+        sizes = {node: len(self.node_cpus(node)) for node in nodes}
+        total = sum(sizes.values())
+        # Instances per node in proportion to node size, largest remainder first
+        quotas = {node: num_instances * sizes[node] // total for node in nodes}
+        leftover = sorted(nodes, key=lambda node: -(num_instances * sizes[node] % total))
+        for node in leftover[:num_instances - sum(quotas.values())]:
+            quotas[node] += 1
+        # A node only takes the instances it has CPUs for, the rest go to nodes with room to spare
+        capacity = {node: sizes[node] // threads_per_instance for node in nodes}
+        spill = sum(max(0, quotas[node] - capacity[node]) for node in nodes)
+        quotas = {node: min(quotas[node], capacity[node]) for node in nodes}
+        for node in sorted(nodes, key=lambda node: quotas[node] - capacity[node]):
+            taken = min(spill, capacity[node] - quotas[node])
+            quotas[node] += taken
+            spill -= taken
+
+        placements = []
+        used = set()
+        for node in nodes:
+            node_cpus = self.node_cpus(node)
+            for slot in range(quotas[node]):
+                block = node_cpus[slot * threads_per_instance:(slot + 1) * threads_per_instance]
+                used.update(info.cpu for info in block)
+                placements.append(self.placement(block, node))
+        # Free CPUs first, so an instance spanning nodes only shares a CPU when none is left
+        spanning = self.cpus_by_node()
+        spanning = [info for info in spanning if info.cpu not in used] + [info for info in spanning if info.cpu in used]
+        for slot in range(num_instances - len(placements)):
+            block = [spanning[(slot * threads_per_instance + j) % len(spanning)] for j in range(threads_per_instance)]
+            placements.append(self.placement(block, None))
+        return placements
+
+    def cpus_by_node(self):
+        return [info for node in self.nodes for info in self.node_cpus(node)]
+
+    def placement(self, block, node):
+        unique = {info.cpu: info for info in block}
+        cores = [info.core for info in unique.values()]
+        return Placement(
+            cpus=sorted(unique),
+            node=node,
+            sockets=sorted({info.socket for info in unique.values()}),
+            shared_cores=len(cores) - len(set(cores)),
+        )
+
+
+def describe_placement(placement):
+    node = f"node {placement.node}" if placement.node is not None else "all nodes"
+    sockets = ",".join(str(socket) for socket in placement.sockets)
+    smt = f", {placement.shared_cores} SMT sibling(s) sharing a core" if placement.shared_cores else ""
+    return f"CPUs {format_cpulist(placement.cpus)} on {node} (socket {sockets}){smt}"
+
+
+def numactl_prefix(placement, topology):
+    """numactl binding CPUs and memory to the node, only worth it on multi-node machines"""
+    if placement.node is None or len(topology.nodes) < 2 or not shutil.which("numactl"):
+        return []
+    return ["numactl", f"--physcpubind={format_cpulist(placement.cpus)}", f"--membind={placement.node}"]
@@ -0,0 +1,81 @@
+"""
+@author: Team Mizogg
+"""
+from PyQt6.QtCore import QTimer, pyqtSlot
+from PyQt6.QtWidgets import *
+from libs.throughput import sparkline, format_rate, format_duration
+
+REFRESH_INTERVAL_MS = 1000
+COLUMNS = ["Instance", "Keys/s", "Average", "History", "Progress", "ETA", "Last Update", "Stalled"]
+
+class ThroughputDashboard(QGroupBox):
+    def __init__(self, tracker, parent=None, watchdog=None):
+        super().__init__(parent)
+        self.setTitle("Throughput Dashboard")
+        self.setStyleSheet("QGroupBox { border: 3px solid; padding: 5px; }")
+        self.tracker = tracker  # Fed by the orchestrator's supervisor thread
+        self.watchdog = watchdog
+
+        layout = QVBoxLayout(self)
+        self.totalLabel = QLabel("Total: -", self)
+        self.totalLabel.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Combined speed of all instances, current and rolling average </span>')
+        layout.addWidget(self.totalLabel)
+
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(REFRESH_INTERVAL_MS)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.refreshTimer.start()
+
+    def reset(self):
+        """Start a new run, the rows follow the instances the tracker has a range for"""
+        self.table.setRowCount(0)
+        self.refresh()
+
+    def resize_rows(self, count):
+        old_count = self.table.rowCount()
+        self.table.setRowCount(count)
+        for row in range(old_count, count):
+            for col in range(len(COLUMNS)):
+                self.table.setItem(row, col, QTableWidgetItem(""))
+
+    @pyqtSlot()
+    def refresh(self):
+        # The supervisor thread adds instances as they get a range, iterate over a copy
+        instances = sorted(list(self.tracker.instances.items()))
+        if not instances:
+            return
+        if self.table.rowCount() != len(instances):
+            self.resize_rows(len(instances))
+        self.tracker.tick()
+        total = self.tracker.total_keys_per_second()
+        self.totalLabel.setText(
+            f"Total: {format_rate(total)}   Average: {format_rate(self.tracker.total_rolling_average())}"
+            f"   {sparkline(self.tracker.total_history, 30)}"
+        )
+        for row, (instance_number, stats) in enumerate(instances):
+            values = [
+                f"{instance_number}/{len(instances)}",
+                format_rate(stats.keys_per_second),
+                format_rate(stats.rolling_average()),
+                sparkline(stats.history, 30),
+                f"{stats.progress() * 100:.6f}%",
+                format_duration(stats.eta_seconds()),
+                format_duration(stats.seconds_since_update()),
+                self.stall_text(stats.instance_number),
+            ]
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is not None and item.text() != value:
+                    item.setText(value)
+
+    def stall_text(self, instance_number):
+        stall = self.watchdog.describe_stall(instance_number) if self.watchdog else None
+        return stall or "-"
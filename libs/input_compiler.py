@@ -0,0 +1,274 @@
+"""
+@author: Team Mizogg
+"""
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+import time
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BASE58_INDEX = {char: index for index, char in enumerate(BASE58_ALPHABET)}
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_HRPS = ("bc", "tb")
+SECP256K1_P = 2 ** 256 - 2 ** 32 - 977
+
+# What a valid line turns into
+RMD160 = "rmd160"  # 20 byte hash160, what address and rmd160 modes search for
+PUBKEY = "pubkey"  # 33 byte compressed public key, what bsgs mode searches for
+RECORD_SIZES = {RMD160: 20, PUBKEY: 33}
+# Entry types reported by classify()
+LEGACY, P2SH, BECH32, HASH160, ETH, COMPRESSED, UNCOMPRESSED = (
+    "legacy", "p2sh", "bech32", "rmd160", "eth", "compressed pubkey", "uncompressed pubkey")
+ENTRY_KINDS = {LEGACY: RMD160, BECH32: RMD160, HASH160: RMD160, ETH: RMD160,
+               COMPRESSED: PUBKEY, UNCOMPRESSED: PUBKEY}
+
+RUN_RECORDS = 4 * 1024 * 1024  # records sorted in memory per run before spilling to disk
+
+
+def sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+def base58check_decode(text):
+    """Payload of a Base58Check string, None if it is malformed or the checksum fails"""
+    value = 0
+    for char in text:
+        if char not in BASE58_INDEX:
+            return None
+        value = value * 58 + BASE58_INDEX[char]
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    raw = b"\x00" * (len(text) - len(text.lstrip("1"))) + raw
+    if len(raw) < 5 or sha256(sha256(raw[:-4]))[:4] != raw[-4:]:
+        return None
+    return raw[:-4]
+
+
+def bech32_polymod(values):
+    generator = [0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3]
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            checksum ^= generator[i] if (top >> i) & 1 else 0
+    return checksum
+
+
+def bech32_decode(text):
+    """(witness version, program) of a segwit address, None if invalid"""
+    text = text.lower()
+    hrp, _, data = text.rpartition("1")
+    if hrp not in BECH32_HRPS or len(data) < 7 or any(char not in BECH32_CHARSET for char in data):
+        return None
+    values = [BECH32_CHARSET.index(char) for char in data]
+    expanded = [ord(char) >> 5 for char in hrp] + [0] + [ord(char) & 31 for char in hrp]
+    constant = bech32_polymod(expanded + values)
+    if constant not in (1, 0x2BC830A3):  # bech32 or bech32m
+        return None
+    version, words = values[0], values[1:-6]
+    bits, accumulator, program = 0, 0, bytearray()
+    for word in words:
+        accumulator = accumulator << 5 | word
+        bits += 5
+        while bits >= 8:
+            bits -= 8
+            program.append(accumulator >> bits & 0xFF)
+    if bits >= 5 or accumulator & ((1 << bits) - 1):
+        return None
+    return version, bytes(program)
+
+
+def compress_pubkey(raw):
+    """33 byte compressed form of a 33 or 65 byte public key, None if it is not on the curve"""
+    if len(raw) == 33 and raw[0] in (2, 3):
+        return raw
+    if len(raw) == 65 and raw[0] == 4:
+        x, y = int.from_bytes(raw[1:33], "big"), int.from_bytes(raw[33:], "big")
+        if (y * y - x ** 3 - 7) % SECP256K1_P:
+            return None
+        return bytes([2 + (y & 1)]) + raw[1:33]
+    return None
+
+
+def is_hex(text):
+    try:
+        bytes.fromhex(text)
+        return True
+    except ValueError:
+        return False
+
+
+def classify(entry):
+    """(entry type, record bytes) for one line, record is None for entries keyhunt can't search.
+
+    Raises ValueError for lines that are not a valid entry at all.
+    """
+    if entry[:2] in ("0x", "0X") and len(entry) == 42 and is_hex(entry[2:]):
+        return ETH, bytes.fromhex(entry[2:])
+    if len(entry) == 40 and is_hex(entry):
+        return HASH160, bytes.fromhex(entry)
+    if len(entry) in (66, 130) and is_hex(entry):
+        pubkey = compress_pubkey(bytes.fromhex(entry))
+        if pubkey is None:
+            raise ValueError("not a valid public key")
+        return (COMPRESSED if len(entry) == 66 else UNCOMPRESSED), pubkey
+    if entry[:3].lower() in ("bc1", "tb1"):
+        decoded = bech32_decode(entry)
+        if decoded is None:
+            raise ValueError("bad bech32 checksum")
+        version, program = decoded
+        # Only P2WPKH commits to a hash160 of a public key
+        return BECH32, program if version == 0 and len(program) == 20 else None
+    if entry[:1] in ("1", "3", "m", "n", "2"):
+        payload = base58check_decode(entry)
+        if payload is None or len(payload) != 21:
+            raise ValueError("bad Base58Check address")
+        if payload[0] in (0x00, 0x6F):
+            return LEGACY, payload[1:]
+        return P2SH, None  # a script hash, no key of ours hashes to it
+    raise ValueError("unrecognised entry")
+
+
+class CompileStats:
+    def __init__(self):
+        self.lines = 0
+        self.valid = 0
+        self.invalid = 0
+        self.unsupported = 0
+        self.other_kind = 0
+        self.duplicates = 0
+        self.written = 0
+        self.types = {}
+        self.first_errors = []
+
+    def as_dict(self):
+        return {
+            "lines": self.lines, "valid": self.valid, "invalid": self.invalid,
+            "unsupported": self.unsupported, "other_kind": self.other_kind,
+            "duplicates": self.duplicates, "written": self.written, "types": self.types,
+            "first_errors": self.first_errors,
+        }
+
+
+def detect_kind(path, sample_lines=1000):
+    """rmd160 or pubkey, whichever the first valid lines of the file are"""
+    counts = {RMD160: 0, PUBKEY: 0}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for _, line in zip(range(sample_lines), f):
+            try:
+                entry_type, record = classify(line.strip())
+            except ValueError:
+                continue
+            if record is not None:
+                counts[ENTRY_KINDS[entry_type]] += 1
+    return PUBKEY if counts[PUBKEY] > counts[RMD160] else RMD160
+
+
+def write_run(records, directory):
+    records.sort()
+    run = tempfile.NamedTemporaryFile(dir=directory, suffix=".run", delete=False)
+    with run:
+        previous = None
+        for record in records:
+            if record != previous:
+                run.write(record)
+            previous = record
+    return run.name
+
+
+def read_run(path, size):
+    with open(path, "rb") as f:
+        for record in iter(lambda: f.read(size), b""):
+            yield record
+
+
+def compile_input(source, output=None, kind=None, run_records=RUN_RECORDS, progress=None):
+    """Stream `source`, validate and dedupe its entries and write a sorted target file plus a manifest.
+
+    rmd160 targets become a binary file of sorted 20 byte hashes that keyhunt loads without
+    parsing. keyhunt only reads public keys as text, so pubkey targets are written as sorted,
+    deduplicated compressed hex lines. Deduplication is an external merge sort, memory use is
+    bounded by `run_records` whatever the size of the input.
+    """
+    kind = kind or detect_kind(source)
+    size = RECORD_SIZES[kind]
+    if output is None:
+        output = os.path.splitext(source)[0] + (".bin" if kind == RMD160 else ".keys.txt")
+    stats = CompileStats()
+    work_dir = os.path.dirname(os.path.abspath(output))
+    runs, records = [], []
+    started = time.monotonic()
+    try:
+        with open(source, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                stats.lines += 1
+                entry = line.strip()
+                if not entry or entry.startswith("#"):
+                    continue
+                try:
+                    entry_type, record = classify(entry)
+                except ValueError as e:
+                    stats.invalid += 1
+                    if len(stats.first_errors) < 10:
+                        stats.first_errors.append(f"line {stats.lines}: {e}")
+                    continue
+                stats.valid += 1
+                stats.types[entry_type] = stats.types.get(entry_type, 0) + 1
+                if record is None:
+                    stats.unsupported += 1
+                elif ENTRY_KINDS[entry_type] != kind:
+                    stats.other_kind += 1
+                else:
+                    records.append(record)
+                    if len(records) >= run_records:
+                        runs.append(write_run(records, work_dir))
+                        records = []
+                if progress and stats.lines % 1000000 == 0:
+                    progress(f"{stats.lines:,} lines read")
+        if records or not runs:
+            runs.append(write_run(records, work_dir))
+        records = []
+
+        digest = hashlib.sha256()
+        kept = 0
+        with open(output, "wb") as out:
+            previous = None
+            for record in heapq.merge(*(read_run(run, size) for run in runs)):
+                if record == previous:
+                    continue
+                previous = record
+                data = record if kind == RMD160 else (record.hex() + "\n").encode()
+                out.write(data)
+                digest.update(data)
+                kept += 1
+    finally:
+        for run in runs:
+            os.remove(run)
+
+    accepted = stats.valid - stats.unsupported - stats.other_kind
+    stats.written = kept
+    stats.duplicates = accepted - kept
+    manifest = {
+        "source": os.path.abspath(source),
+        "source_bytes": os.path.getsize(source),
+        "output": os.path.abspath(output),
+        "kind": kind,
+        "format": "binary" if kind == RMD160 else "text",
+        "record_size": size if kind == RMD160 else None,
+        "sha256": digest.hexdigest(),
+        "seconds": round(time.monotonic() - started, 3),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stats": stats.as_dict(),
+    }
+    with open(output + ".json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def describe_manifest(manifest):
+    stats = manifest["stats"]
+    return (f"{stats['written']:,} {manifest['kind']} targets written to {manifest['output']} "
+            f"({stats['lines']:,} lines, {stats['duplicates']:,} duplicates, {stats['invalid']:,} invalid, "
+            f"{stats['unsupported'] + stats['other_kind']:,} skipped) sha256 {manifest['sha256'][:16]}")
@@ -0,0 +1,162 @@
+"""
+@author: Team Mizogg
+"""
+import glob
+import math
+import os
+import platform
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+INPUT_DIR = "input"
+MODES = ["address", "bsgs", "rmd160"]
+CRYPTOS = ["btc", "eth"]
+LOOK_TYPES = ["compress", "uncompress", "both"]
+K_VALUES = ['1', '4', '8', '16', '24', '32', '64', '128', '256', '512', '756', '1024', '2048']
+MOVE_MODES = ["random", "sequential"]
+BSGS_MOVE_MODES = ["sequential", "backward", "both", "random", "dance"]
+DEFAULT_RANGE = "400000000000000000:7FFFFFFFFFFFFFFFFF"
+DEFAULT_N = 0x100000000000  # keyhunt's own default for -n
+
+
+class KeyhuntConfig:
+    """Options shared by every instance, independent of the GUI toolkit"""
+
+    def __init__(self, mode="address", thread_count=1, crypto="btc", move_mode="random", stride="1",
+                 look="compress", input_file="btc.txt", k_value=1, n_value="", quiet=False, save_table=False,
+                 stats_seconds=0):
+        self.mode = mode.strip()
+        self.thread_count = int(thread_count)
+        if self.thread_count < 1:
+            raise ValueError(f"Thread count must be at least 1, got {thread_count}")
+        self.crypto = crypto.strip()
+        self.move_mode = move_mode.strip()
+        self.stride = str(stride).strip()
+        self.look = look.strip()
+        self.input_file = input_file.strip()
+        self.k_value = int(k_value)
+        self.n_value = n_value.strip()
+        self.quiet = bool(quiet)
+        self.save_table = bool(save_table)  # BSGS: -S saves the bloom/bP table files, or loads them if present
+        self.stats_seconds = int(stats_seconds)  # keyhunt's -s speed line interval, 0 keeps its default of 30
+
+
+def keyhunt_binary():
+    """Path of the bundled keyhunt executable for this platform"""
+    base_path = os.path.join(ROOT_DIR, "keyhunt")
+    if platform.system() == "Windows":
+        return os.path.join(base_path, "keyhunt.exe")
+    return os.path.join(base_path, "keyhunt")
+
+
+def input_path(file):
+    """Bare file names live in the input folder, anything with a directory is used as is"""
+    if os.path.dirname(file):
+        return file
+    return os.path.join(INPUT_DIR, file)
+
+
+def parse_range(range_text):
+    """Parse 'start:end' hex text into integers, raises ValueError on bad input"""
+    range_text = range_text.strip()
+    if not range_text:
+        raise ValueError("Please enter a range")
+    start_range, end_range = range_text.split(':')
+    start_range = int(start_range, 16)
+    end_range = int(end_range, 16)
+    if start_range > end_range:
+        raise ValueError("Start range must be less than end range")
+    return start_range, end_range
+
+
+def split_range(start, end, num_splits):
+    """Split a range into equal parts, raises ValueError when there are more parts than keys"""
+    if num_splits > end - start + 1:
+        raise ValueError(f"{num_splits} instances need at least {num_splits} keys, "
+                         f"{start:x}:{end:x} holds only {end - start + 1}")
+    total_range = end - start
+    chunk_size = total_range // num_splits
+    remainder = total_range % num_splits
+
+    ranges = []
+    current_start = start
+
+    for i in range(num_splits):
+        extra = 1 if i < remainder else 0
+        current_end = current_start + chunk_size + extra - 1
+        if i == num_splits - 1:
+            current_end = end
+        ranges.append((current_start, current_end))
+        current_start = current_end + 1
+
+    return ranges
+
+
+def parse_n_value(n_value):
+    """-n as keyhunt reads it, hex with 0x or decimal, empty for the default"""
+    n_value = str(n_value or "").strip()
+    if not n_value:
+        return DEFAULT_N
+    return int(n_value, 16) if n_value.lower().startswith("0x") else int(n_value)
+
+
+def bsgs_baby_steps(k_value, n_value=""):
+    """keyhunt's bsgs_m: sqrt(n) baby steps multiplied by the K factor"""
+    return math.isqrt(parse_n_value(n_value)) * int(k_value)
+
+
+def bsgs_table_files(config, directory="."):
+    """Saved bloom/bP table files matching this config's -n and -k. They hold multiples of G
+    only, so any target file can reuse them."""
+    baby_steps = bsgs_baby_steps(config.k_value, config.n_value)
+    return sorted(glob.glob(os.path.join(directory, f"keyhunt_bsgs_*_{baby_steps}.*")))
+
+
+def construct_command_key(config, start_range, end_range):
+    """Construct keyhunt command for the given configuration and range"""
+    mode = config.mode
+    command = [keyhunt_binary(), "-m", mode, "-t", str(config.thread_count)]
+
+    # Add range
+    command.extend(["-r", f"{format(start_range, 'x')}:{format(end_range, 'x')}"])
+
+    if config.input_file:
+        command.extend(["-f", input_path(config.input_file)])
+
+    move_mode = config.move_mode
+    if move_mode == 'random':
+        if mode == 'bsgs':
+            command.extend(["-B", move_mode])
+        else:
+            command.append("-R")
+    elif move_mode == 'sequential':
+        if mode == 'bsgs':
+            command.extend(["-B", move_mode])
+        else:
+            command.append("-S")
+    elif move_mode in ('backward', 'dance', 'both') and mode == 'bsgs':
+        command.extend(["-B", move_mode])
+
+    if not (mode == 'bsgs' and move_mode == 'both'):
+        if config.stride:
+            command.extend(["-I", config.stride])
+
+    if config.crypto == "eth":
+        command.extend(["-c", config.crypto])
+
+    if config.look and config.crypto != "eth":  # Only add look type if not ETH
+        command.extend(["-l", config.look])
+
+    if mode == 'bsgs':
+        if config.n_value:
+            command.extend(["-n", config.n_value])
+        command.extend(["-k", str(config.k_value)])
+        if config.save_table:
+            command.append("-S")
+
+    if config.quiet:
+        command.append("-q")
+
+    if config.stats_seconds:
+        command.extend(["-s", str(config.stats_seconds)])
+
+    return command
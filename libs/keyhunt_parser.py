@@ -0,0 +1,113 @@
+"""
+@author: Team Mizogg
+"""
+import re
+import time
+from collections import namedtuple
+
+# Typed events produced from keyhunt's stdout. `elapsed` is seconds since the
+# parser (i.e. the process) was started, which gives setup timings for free.
+SpeedSample = namedtuple("SpeedSample", ["total_keys", "seconds", "keys_per_second", "elapsed"])
+SetupEvent = namedtuple("SetupEvent", ["stage", "detail", "elapsed"])
+PositionEvent = namedtuple("PositionEvent", ["key", "elapsed"])
+KeyFoundEvent = namedtuple("KeyFoundEvent", ["private_key", "line", "elapsed"])
+ErrorEvent = namedtuple("ErrorEvent", ["level", "message", "elapsed"])
+
+SPEED_RE = re.compile(
+    r"Total\s+([\d,]+)\s+keys\s+in\s+([\d,]+)\s+seconds:\s*"
+    r"(?:~[\d.,]+\s+\S+\s+\(([\d,]+)\s+keys/s\)|([\d,]+)\s+keys/s)"
+)
+POSITION_RE = re.compile(r"^\[\+\] Thread 0x([0-9a-fA-F]+)\s*$")
+KEY_FOUND_RE = re.compile(r"(?:Private Key|privkey)\s*:?\s*(?:0x)?([0-9a-fA-F]+)")
+PROCESSING_RE = re.compile(r"processing\s+(\d+)/(\d+)\s+bP points\s*:\s*(\d+)%")
+THREADS_RE = re.compile(r"^\[\+\] Threads?\s*:\s*(\d+)")
+# [E] lines keyhunt prints for a bad input line before carrying on with the rest, e.g.
+# "... is not valid Base58, omiting it" or "Ignoring invalid hexvalue"
+SKIPPED_INPUT_RE = re.compile(r"omit+ing|ignoring|skipping", re.IGNORECASE)
+
+# (prefix after "[+] ", stage name) for setup lines worth reporting
+SETUP_STAGES = [
+    ("Mode ", "mode"),
+    ("Opening file", "input"),
+    ("Reading file", "input"),
+    ("Added ", "input"),
+    ("Bloom filter for", "bloom"),
+    ("Loading data to the bloomfilter", "bloom"),
+    ("Allocating", "allocate"),
+    ("Reading bloom filter from file", "load"),
+    ("Reading bP Table from file", "load"),
+    ("Sorting", "sort"),
+    ("Making checkums", "checksum"),
+    ("Writing bloom filter to file", "save"),
+    ("Writing bP Table to file", "save"),
+    ("Writing file", "save"),  # -S saving a bloom filter, bP table or data file
+]
+
+
+def to_int(text):
+    return int(text.replace(",", ""))
+
+
+class KeyhuntOutputParser:
+    """Turn raw keyhunt output lines into typed events"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.last_speed = None
+        self.first_speed_elapsed = None
+
+    def feed(self, line):
+        """Parse one line of output and return the list of events it contains"""
+        events = []
+        # keyhunt redraws its status line with carriage returns
+        for segment in line.split("\r"):
+            segment = segment.strip()
+            if segment:
+                event = self.parse_segment(segment)
+                if event is not None:
+                    events.append(event)
+        return events
+
+    def parse_segment(self, segment):
+        elapsed = self.clock() - self.started
+
+        match = SPEED_RE.search(segment)
+        if match:
+            rate = match.group(3) or match.group(4)
+            sample = SpeedSample(to_int(match.group(1)), to_int(match.group(2)), to_int(rate), elapsed)
+            self.last_speed = sample
+            if self.first_speed_elapsed is None:
+                self.first_speed_elapsed = elapsed
+            return sample
+
+        match = POSITION_RE.match(segment)
+        if match:
+            return PositionEvent(int(match.group(1), 16), elapsed)
+
+        match = KEY_FOUND_RE.search(segment)
+        if match and ("Hit" in segment or "HIT" in segment or "found" in segment or segment.startswith("Private Key")):
+            return KeyFoundEvent(match.group(1).lower(), segment, elapsed)
+
+        if segment.startswith("[E]") or segment.startswith("Error:"):
+            message = segment.split(None, 1)[-1]
+            return ErrorEvent("warning" if SKIPPED_INPUT_RE.search(message) else "error", message, elapsed)
+        if segment.startswith("[W]"):
+            return ErrorEvent("warning", segment[3:].strip(), elapsed)
+
+        if not segment.startswith("[+]"):
+            return None
+        body = segment[3:].strip()
+
+        match = THREADS_RE.match(segment)
+        if match:
+            return SetupEvent("threads", int(match.group(1)), elapsed)
+
+        match = PROCESSING_RE.search(body)
+        if match:
+            return SetupEvent("table", int(match.group(3)), elapsed)
+
+        for prefix, stage in SETUP_STAGES:
+            if body.startswith(prefix):
+                return SetupEvent(stage, body, elapsed)
+        return None
@@ -0,0 +1,106 @@
+"""
+@author: Team Mizogg
+"""
+import math
+from libs.keyhunt_core import K_VALUES, bsgs_baby_steps
+
+MEMINFO = "/proc/meminfo"
+# keyhunt sizes its bloom filters for a 1e-6 false positive rate
+BLOOM_BYTES_PER_ITEM = -math.log(0.000001) / (math.log(2) ** 2) / 8
+TABLE_ENTRY_BYTES = 16  # struct bsgs_xvalue, 6 byte value plus 8 byte index, padded
+PROCESS_OVERHEAD = 64 * 1024 ** 2
+# Never plan past this share of MemAvailable, the rest is left for the OS and page cache
+USABLE_FRACTION = 0.9
+
+
+def read_meminfo(path=MEMINFO):
+    """/proc/meminfo as a dict of bytes, empty where it does not exist"""
+    info = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if parts and parts[0].isdigit():
+                    info[key] = int(parts[0]) * (1024 if len(parts) > 1 and parts[1] == "kB" else 1)
+    except OSError:
+        pass
+    return info
+
+
+def available_memory(meminfo=None):
+    """Bytes that can be allocated without swapping, None if unknown"""
+    meminfo = meminfo if meminfo is not None else read_meminfo()
+    if "MemAvailable" in meminfo:
+        return meminfo["MemAvailable"]
+    if "MemFree" in meminfo:
+        return meminfo["MemFree"] + meminfo.get("Cached", 0)
+    return None
+
+
+def format_bytes(size):
+    for factor, unit in ((1024 ** 4, "TB"), (1024 ** 3, "GB"), (1024 ** 2, "MB")):
+        if size >= factor:
+            return f"{size / factor:.1f} {unit}"
+    return f"{size / 1024:.0f} KB"
+
+
+def bsgs_memory(k_value, n_value=""):
+    """Estimated resident bytes of one BSGS instance: three bloom filters and the bP table.
+
+    keyhunt uses m = sqrt(n) * k baby steps, a second bloom of m/32 and a third of m/1024
+    items, and keeps m/1024 table entries. This gives about 2 GB at -k 128 and 30 GB at
+    -k 2048 for the default -n, within the README's 2 GB and 32 GB RAM recommendations.
+    """
+    baby_steps = bsgs_baby_steps(k_value, n_value)
+    blooms = baby_steps * (1 + 1 / 32 + 1 / 1024) * BLOOM_BYTES_PER_ITEM
+    table = baby_steps // 1024 * TABLE_ENTRY_BYTES
+    return int(blooms + table) + PROCESS_OVERHEAD
+
+
+def plan_memory(mode, k_value, n_value, num_instances):
+    """Total bytes needed by num_instances instances (only BSGS has a meaningful footprint)"""
+    per_instance = bsgs_memory(k_value, n_value) if mode == "bsgs" else PROCESS_OVERHEAD
+    return per_instance * num_instances
+
+
+def usable_memory(available=None):
+    available = available if available is not None else available_memory()
+    return None if available is None else int(available * USABLE_FRACTION)
+
+
+def largest_fitting_k(n_value, num_instances, available=None):
+    """Largest -k from the GUI's list whose tables fit in RAM for every instance, None if none do"""
+    usable = usable_memory(available)
+    if usable is None:
+        return None
+    fitting = [k for k in K_VALUES if plan_memory("bsgs", k, n_value, num_instances) <= usable]
+    return int(fitting[-1]) if fitting else None
+
+
+def describe_plan(mode, k_value, n_value, num_instances, available=None):
+    """One line summary and whether it fits, e.g. for a label next to the K factor"""
+    needed = plan_memory(mode, k_value, n_value, num_instances)
+    usable = usable_memory(available)
+    if usable is None:
+        return f"Needs ~{format_bytes(needed)} RAM", True
+    fits = needed <= usable
+    return f"Needs ~{format_bytes(needed)} of {format_bytes(usable)} usable RAM", fits
+
+
+def check_memory(config, num_instances, available=None):
+    """Raise ValueError when a BSGS launch would push the machine into swap"""
+    if config.mode != "bsgs":
+        return
+    usable = usable_memory(available)
+    if usable is None:
+        return
+    needed = plan_memory(config.mode, config.k_value, config.n_value, num_instances)
+    if needed <= usable:
+        return
+    best_k = largest_fitting_k(config.n_value, num_instances, available)
+    advice = f"Largest K factor that fits: {best_k}" if best_k else "Use fewer instances or a smaller N value"
+    raise ValueError(
+        f"{num_instances} BSGS instance(s) with -k {config.k_value} need ~{format_bytes(needed)} RAM "
+        f"but only {format_bytes(usable)} is usable without swapping. {advice}"
+    )
@@ -0,0 +1,146 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from libs.proc_stats import read_stat
+
+CONFIG_FILE = "config.ini"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9101
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# name, type, help
+METRICS = [
+    ("keyhunt_up", "gauge", "1 while the instance's keyhunt process is running"),
+    ("keyhunt_keys_per_second", "gauge", "Last speed reported by keyhunt"),
+    ("keyhunt_keys_searched", "counter", "Keys searched by the instance in this run, over restarts and chunks"),
+    ("keyhunt_range_progress_ratio", "gauge", "Share of the instance's current range searched"),
+    ("keyhunt_restarts", "counter", "Crash and stall restarts of the instance in this run"),
+    ("keyhunt_stalled_seconds", "gauge", "How long the watchdog has found the instance stalled, 0 when healthy"),
+    ("keyhunt_process_resident_memory_bytes", "gauge", "Resident set size of the keyhunt process"),
+    ("keyhunt_process_cpu_seconds", "counter", "User and system CPU time of the keyhunt process"),
+    ("keyhunt_process_major_faults", "counter", "Page faults of the keyhunt process that needed disk I/O"),
+    ("keyhunt_process_voluntary_switches_per_second", "gauge", "Voluntary context switches over the last sampler interval"),
+    ("keyhunt_process_involuntary_switches_per_second", "gauge", "Involuntary context switches over the last sampler interval"),
+    ("keyhunt_process_run_queue_wait_ratio", "gauge", "Share of the last sampler interval threads spent waiting for a CPU"),
+]
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_sample(name, labels, value):
+    label_text = ",".join(f'{key}="{escape_label(label)}"' for key, label in labels.items())
+    return f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}"
+
+
+def collect(orchestrator):
+    """{metric name: [(labels, value)]} from the orchestrator's current state"""
+    samples = {name: [] for name, _, _ in METRICS}
+    instances = dict(orchestrator.instances)
+    for number, stats in list(orchestrator.tracker.instances.items()):
+        labels = {"instance_number": number}  # Prometheus keeps "instance" for the scrape target
+        instance = instances.get(number)
+        running = instance is not None and instance.running()
+        samples["keyhunt_up"].append((labels, int(running)))
+        samples["keyhunt_keys_per_second"].append((labels, stats.keys_per_second if running else 0))
+        samples["keyhunt_keys_searched"].append((labels, stats.keys_searched))
+        samples["keyhunt_range_progress_ratio"].append((labels, round(stats.progress(), 9)))
+        restart_state = orchestrator.restart_states.get(number)
+        samples["keyhunt_restarts"].append((labels, restart_state.restarts if restart_state else 0))
+        samples["keyhunt_stalled_seconds"].append((labels, round(orchestrator.watchdog.stalled_seconds(number) or 0, 1)))
+        process_stat = read_stat(instance.pid) if running else None
+        if process_stat is not None:
+            samples["keyhunt_process_resident_memory_bytes"].append((labels, process_stat.rss_bytes))
+            samples["keyhunt_process_cpu_seconds"].append((labels, process_stat.cpu_seconds))
+            samples["keyhunt_process_major_faults"].append((labels, process_stat.major_faults))
+        resources = orchestrator.sampler.latest(number) if running else None
+        if resources is not None and resources.pid == instance.pid:
+            if resources.voluntary_switches_per_second is not None:
+                samples["keyhunt_process_voluntary_switches_per_second"].append(
+                    (labels, round(resources.voluntary_switches_per_second, 1)))
+                samples["keyhunt_process_involuntary_switches_per_second"].append(
+                    (labels, round(resources.involuntary_switches_per_second, 1)))
+            if resources.run_wait_percent is not None:
+                samples["keyhunt_process_run_queue_wait_ratio"].append((labels, round(resources.run_wait_percent / 100, 4)))
+    return samples
+
+
+def render(orchestrator, openmetrics=False):
+    """Exposition text for one scrape, in Prometheus or OpenMetrics format"""
+    samples = collect(orchestrator)
+    lines = []
+    for name, metric_type, help_text in METRICS:
+        # Counter samples end in _total, OpenMetrics names the family without it
+        suffix = "_total" if metric_type == "counter" else ""
+        family = name if openmetrics else name + suffix
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {metric_type}")
+        lines.extend(format_sample(name + suffix, labels, value) for labels, value in samples[name])
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    orchestrator = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = render(self.orchestrator, openmetrics).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+class MetricsExporter:
+    """Local HTTP /metrics endpoint on a daemon thread. Metrics are only gathered when scraped."""
+
+    def __init__(self, orchestrator, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.orchestrator = orchestrator
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @classmethod
+    def from_config(cls, orchestrator, path=CONFIG_FILE):
+        """Exporter for the [metrics] section of config.ini, None unless it is enabled"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        if not config.getboolean("metrics", "enabled", fallback=False):
+            return None
+        return cls(orchestrator, config.get("metrics", "host", fallback=DEFAULT_HOST),
+                   config.getint("metrics", "port", fallback=DEFAULT_PORT))
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        """Bind and serve, raises OSError when the port is taken"""
+        handler = type("BoundMetricsHandler", (MetricsHandler,), {"orchestrator": self.orchestrator})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="keyhunt-metrics", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
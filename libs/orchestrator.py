@@ -0,0 +1,684 @@
+"""
+@author: Team Mizogg
+"""
+import asyncio
+import concurrent.futures
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from libs import keyhunt_core
+from libs.chunk_scheduler import ChunkQueue
+from libs.cpu_topology import CpuTopology, describe_placement, numactl_prefix
+from libs.memory_planner import check_memory
+from libs.metrics_exporter import MetricsExporter, DEFAULT_HOST
+from libs.preflight import check_input
+from libs.keyhunt_parser import KeyhuntOutputParser, SpeedSample, PositionEvent, ErrorEvent
+from libs.supervisor import AsyncSupervisor, spawn, read_lines
+from libs.table_cache import TableCache, saves_tables
+from libs.resource_sampler import ResourceSampler
+from libs.restart_policy import RestartPolicy, RestartState, ExitStatus, classify_exit
+from libs.stall_watchdog import StallWatchdog, SILENT, SLOW
+from libs.range_ledger import RangeLedger, LEDGER_FILE, search_key, split_intervals
+from libs.throughput import ThroughputTracker
+
+# Escalation used when stopping: (action, seconds to wait for exit before escalating)
+INTERRUPT_GRACE = 5
+TERMINATE_GRACE = 1
+KILL_GRACE = 1
+RESUMABLE_MOVE_MODES = ("sequential",)
+# keyhunt hands sequential work to its threads in blocks of this many keys (N_SEQUENTIAL_MAX)
+# and prints "[+] Thread 0x..." as each block starts, not as it ends. BSGS blocks are 2n keys.
+SEQUENTIAL_BLOCK = 0x100000000
+SPAWN_TIMEOUT = 10
+WATCH_INTERVAL = 1
+
+
+def stride_step(config):
+    """Distance between the keys keyhunt checks, -I is hex with 0x and decimal otherwise"""
+    if config.mode == "bsgs":
+        return 1  # BSGS ignores -I
+    text = config.stride or "1"
+    try:
+        return max(1, int(text[2:], 16) if text.startswith("0x") else int(text))
+    except ValueError:
+        return 1
+
+
+def sequential_block(config):
+    """Keys one thread takes per "[+] Thread 0x..." line, BSGS_N_double in BSGS mode"""
+    if config.mode == "bsgs":
+        return 2 * keyhunt_core.parse_n_value(config.n_value)
+    return SEQUENTIAL_BLOCK
+
+
+class KeyhuntInstance:
+    """One keyhunt process and everything the orchestrator knows about it"""
+
+    def __init__(self, instance_number, command, range_start, range_end, placement=None, threads=1, stride=1,
+                 block=SEQUENTIAL_BLOCK):
+        self.instance_number = instance_number
+        self.command = command
+        self.range_start = range_start
+        self.range_end = range_end
+        self.placement = placement
+        self.threads = threads
+        self.stride = stride
+        self.block = block
+        self.process = None
+        self.task = None  # concurrent Future of the supervisor coroutine
+        self.spawned = threading.Event()
+        self.parser = KeyhuntOutputParser()
+        self.exit_code = None
+        self.stop_requested = False
+        self.keys_done = 0
+        self.last_position = None
+        self.search = None  # ledger search key when the range is tracked
+        self.last_error = None
+        self.started = None
+        self.restart_pending = False  # crashed, waiting out the backoff before a restart
+        self.stalled_reason = None  # set when the watchdog kills the process for stalling
+
+    @property
+    def cpus(self):
+        return self.placement.cpus if self.placement else None
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def finished_range(self):
+        return self.exit_code == 0 and not self.stop_requested and self.last_error is None
+
+    def confirmed_position(self):
+        """Next key that still needs searching, as far as keyhunt's own output confirms.
+
+        The latest block start and the total key count say nothing about which blocks below
+        them are finished, so the block every thread may still be working on is left out.
+        """
+        if self.finished_range():
+            return self.range_end + 1
+        in_flight = self.threads * self.block
+        if self.last_position is not None:
+            return max(self.range_start, self.last_position - in_flight * self.stride)
+        searched = max(0, self.keys_done - in_flight) * self.stride
+        return min(self.range_end + 1, self.range_start + searched)
+
+    def running(self):
+        return self.process is not None and self.process.returncode is None
+
+    def elapsed(self):
+        return self.parser.clock() - self.parser.started
+
+
+class Orchestrator:
+    """Toolkit independent owner of keyhunt process lifecycle, range planning and output parsing.
+
+    Processes are run by a single asyncio supervisor thread and callbacks are invoked from it;
+    GUI adapters marshal them onto their own loop.
+    on_output(instance_number, line), on_event(instance_number, event), on_finished(instance_number, exit_code)
+    """
+
+    def __init__(self, on_output=None, on_event=None, on_finished=None, pin_cpus=False, ledger_file=LEDGER_FILE):
+        self.on_output = on_output
+        self.on_event = on_event
+        self.on_finished = on_finished
+        self.pin_cpus = pin_cpus
+        self.topology = None
+        self.memory_check = True  # refuse BSGS launches that would swap
+        self.preflight_check = True  # refuse input files that don't suit the mode
+        self.ledger_file = ledger_file  # None disables the range ledger
+        self.ledger = None
+        self.supervisor = AsyncSupervisor()
+        self.instances = {}
+        self.pending = {}  # instance_number -> ranges still queued for that instance
+        self.chunks = None  # shared ChunkQueue when running with the chunk scheduler
+        self.tracker = ThroughputTracker()
+        self.config = None
+        self.active = False
+        self.generation = 0  # bumped by every stop_all, a launch deferred past it is dropped
+        self.table_builder = None  # instance building the shared BSGS table
+        self.held_launches = []  # (instance_number, start, end, placement) waiting for that table
+        self.launch_task = None  # launch waiting for the table cache to be restored
+        self.hold_lock = threading.Lock()
+        self.table_cache_enabled = True
+        self.table_cache = None
+        self.cache_store_pending = False
+        self.cache_since = 0
+        self.auto_restart = True
+        self.restart_policy = None
+        self.restart_states = {}  # instance_number -> RestartState for the current run
+        self.watchdog = StallWatchdog.from_config()
+        self.watch_task = None
+        self.sampler = ResourceSampler.from_config()
+        self.sample_task = None
+        self.metrics = None
+
+    def emit_output(self, instance_number, line):
+        if self.on_output:
+            self.on_output(instance_number, line)
+
+    def emit_event(self, instance_number, event):
+        if self.on_event:
+            self.on_event(instance_number, event)
+
+    def emit_finished(self, instance_number, exit_code):
+        if self.on_finished:
+            self.on_finished(instance_number, exit_code)
+
+    def serve_metrics(self, port=None, host=None):
+        """Start the local /metrics endpoint, raises OSError if the port is taken.
+
+        Without a port the [metrics] section of config.ini decides, returns None when it is disabled.
+        """
+        if self.metrics is not None:
+            return self.metrics
+        if port is None:
+            exporter = MetricsExporter.from_config(self)
+            if exporter is None:
+                return None
+        else:
+            exporter = MetricsExporter(self, host or DEFAULT_HOST, port)
+        self.metrics = exporter.start()
+        return self.metrics
+
+    def plan_ranges(self, start_range, end_range, num_instances):
+        return keyhunt_core.split_range(start_range, end_range, num_instances)
+
+    def start_all(self, config, ranges, resume=True, chunk_bits=None, chunk_source=None, wait=True):
+        """Launch one instance per range, stopping anything this orchestrator already runs.
+
+        For sequential scans with `resume`, the range ledger decides what is left: only
+        intervals not yet searched (or claimed by another live process) are handed out,
+        split evenly over the instances. Each instance works through its share in order.
+
+        With `chunk_bits` the keyspace is instead cut into 2^chunk_bits key chunks that
+        instances take on demand, so a slow instance never holds up the end of the run.
+        A `chunk_source` with the same take() and remaining_chunks(), e.g. a distributed
+        coordinator, hands out the ranges that follow `ranges` instead.
+
+        Raises ValueError without launching anything if the input file does not suit the mode
+        or the BSGS tables would not fit in RAM. Without `wait`, e.g. from a GUI thread, instances
+        still stopping are not waited for and cached tables are restored off the caller's thread:
+        the launch happens on the supervisor loop once that is done, and a refusal or failure
+        then is reported as an ErrorEvent of instance 1.
+        """
+        stopping = self.stop_all()
+        generation = self.generation
+        if wait or stopping.done():
+            stopping.result()
+            self.launch_all(config, ranges, resume, chunk_bits, chunk_source, wait)
+            return
+
+        def launch(_):
+            if self.generation != generation:
+                return  # stopped or started again while the old instances were exiting
+            try:
+                self.launch_all(config, ranges, resume, chunk_bits, chunk_source, wait=False)
+            except Exception as e:  # nobody waits on this callback, an uncaught error would vanish
+                self.launch_failed(e)
+
+        stopping.add_done_callback(launch)
+
+    def launch_failed(self, error):
+        """Report a launch nobody waited for that did not happen"""
+        self.emit_output(1, f"Not started: {error}")
+        self.emit_event(1, ErrorEvent("error", str(error), 0.0))
+
+    def launch_all(self, config, ranges, resume, chunk_bits, chunk_source, wait=True):
+        warnings = check_input(config) if self.preflight_check else []
+        if self.memory_check:
+            check_memory(config, len(ranges))
+        for warning in warnings:
+            self.emit_output(1, f"Preflight: {warning}")
+        self.instances.clear()
+        self.pending.clear()
+        self.restart_states.clear()
+        self.watchdog.reset()
+        self.sampler.reset()
+        self.chunks = chunk_source
+        self.config = config
+        self.active = True
+        if resume and self.ledger_tracking(config):
+            ledger = self.get_ledger()
+            ledger.release_stale()
+            gaps = ledger.uncovered(search_key(config), ranges[0][0], ranges[-1][1])
+        else:
+            gaps = [(ranges[0][0], ranges[-1][1])]
+        if chunk_bits and config.move_mode not in RESUMABLE_MOVE_MODES:
+            for instance_number in range(1, len(ranges) + 1):
+                self.emit_output(instance_number, f"Chunk scheduling needs a sequential scan, {config.move_mode} instances "
+                                                  f"never finish a chunk. Using one range per instance.")
+            chunk_bits = None
+        if chunk_bits:
+            self.chunks = ChunkQueue(gaps, 2 ** chunk_bits)
+            shares = [[chunk] if chunk else [] for chunk in (self.chunks.take() for _ in ranges)]
+        elif resume and self.ledger_tracking(config):
+            shares = split_intervals(gaps, len(ranges))
+        else:
+            shares = [[instance_range] for instance_range in ranges]
+        self.tracker.reset([share[0] if share else None for share in shares])
+        cpu_plan = self.plan_placement(len(ranges), config.thread_count)
+        launches = []
+        for instance_number, share in enumerate(shares, start=1):
+            if not share:
+                self.emit_output(instance_number, "Nothing left to search for this instance")
+                continue
+            if len(share) > 1:
+                self.emit_output(instance_number, f"{len(share)} unsearched intervals queued for this instance")
+            self.pending[instance_number] = share[1:]
+            launches.append((instance_number, share[0][0], share[0][1], cpu_plan[instance_number - 1]))
+        self.table_builder = None
+        self.cache_store_pending = False
+        restore = launches and self.table_cache_enabled and saves_tables(config)
+        if restore and not wait:
+            # The cache key hashes the input file, which takes a while for a large list
+            self.launch_task = self.supervisor.submit(self.restore_and_launch(config, launches, self.generation))
+        else:
+            if restore:
+                self.restore_tables(config, launches[0][0])
+            self.launch_instances(config, launches)
+        if self.watch_task is None or self.watch_task.done():
+            self.watch_task = self.supervisor.submit(self.watch())
+        if self.sample_task is None or self.sample_task.done():
+            self.sample_task = self.supervisor.submit(self.sample_resources())
+
+    async def restore_and_launch(self, config, launches, generation):
+        """Supervisor coroutine: restore cached tables on an executor thread, then launch"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.restore_tables, config, launches[0][0])
+            if self.generation != generation:
+                return  # stopped while the input file was hashed
+            self.launch_instances(config, launches)
+        except Exception as e:
+            self.launch_failed(e)
+
+    def launch_instances(self, config, launches):
+        """Start the planned instances, holding back all but the builder of a shared BSGS table"""
+        if launches and self.needs_table_build(config):
+            # One instance builds and saves the table, the rest load it instead of building their own
+            self.table_builder = launches[0][0]
+            with self.hold_lock:
+                self.held_launches = launches[1:]
+            for instance_number, _, _, _ in launches[1:]:
+                self.emit_output(instance_number, f"Waiting for instance {self.table_builder} to build the shared BSGS table")
+            launches = launches[:1]
+        for instance_number, start_range, end_range, placement in launches:
+            self.start_instance(instance_number, config, start_range, end_range, placement)
+
+    def get_table_cache(self):
+        if self.table_cache is None:
+            self.table_cache = TableCache.from_config()
+        return self.table_cache
+
+    def restore_tables(self, config, instance_number):
+        """Reuse cached tables for this input and parameters, or remember to cache the new build"""
+        try:
+            cache = self.get_table_cache()
+            hit = cache.restore(config)
+        except OSError as e:
+            self.emit_output(instance_number, f"Table cache unavailable: {e}")
+            return
+        self.emit_output(instance_number, f"Table cache {'hit' if hit else 'miss'}, {cache.summary()}")
+        if not hit:
+            self.cache_store_pending = True
+            self.cache_since = time.time() - 1  # allow for coarse filesystem timestamps
+
+    def store_tables(self, instance):
+        """Called once the first instance is searching, i.e. its table files are complete.
+
+        Links or copies files of up to many GB, so it runs on an executor thread, never on the loop.
+        """
+        try:
+            written = self.get_table_cache().store(self.config, self.cache_since)
+        except OSError as e:
+            self.emit_output(instance.instance_number, f"Could not cache tables: {e}")
+            return
+        if written:
+            self.emit_output(instance.instance_number, f"Cached {len(written)} table file(s) for the next start")
+
+    def needs_table_build(self, config):
+        """Shared table mode with no saved table for this -n/-k yet"""
+        return config.mode == "bsgs" and config.save_table and not keyhunt_core.bsgs_table_files(config)
+
+    def release_held_launches(self, builder_failed=False):
+        """The shared table is on disk: start everyone who was waiting.
+
+        If the builder died before writing it, the next waiting instance becomes the builder
+        so several instances never write the same table files at once.
+        """
+        with self.hold_lock:
+            held, self.held_launches = self.held_launches, []
+            if builder_failed and held and self.needs_table_build(self.config):
+                self.held_launches = held[1:]
+                held = held[:1]
+                self.table_builder = held[0][0]
+            else:
+                self.table_builder = None
+        for instance_number, start_range, end_range, placement in held:
+            if self.active:
+                self.start_instance(instance_number, self.config, start_range, end_range, placement)
+
+    def plan_placement(self, num_instances, threads_per_instance):
+        """NUMA aware CPU placement per instance, or no pinning at all"""
+        if not self.pin_cpus:
+            return [None] * num_instances
+        if self.topology is None:
+            self.topology = CpuTopology.detect()
+        return self.topology.plan(num_instances, threads_per_instance)
+
+    async def next_range(self, instance_number):
+        """Next interval for an instance: its own queued share first, then the shared chunks"""
+        queue = self.pending.get(instance_number)
+        if queue:
+            return queue.pop(0)
+        if self.chunks is not None:
+            # A chunk source may ask a remote coordinator, keep the loop reading every other pipe meanwhile
+            return await asyncio.get_running_loop().run_in_executor(None, self.chunks.take)
+        return None
+
+    async def start_next_range(self, instance):
+        """Relaunch a cleanly finished instance on the next interval it should search"""
+        if not self.active or not instance.finished_range():
+            return
+        next_range = await self.next_range(instance.instance_number)
+        if next_range is None or not self.active:
+            return
+        start_range, end_range = next_range
+        if self.chunks is not None:
+            self.emit_output(instance.instance_number, f"Next chunk: {start_range:x} to {end_range:x} "
+                                                       f"({self.chunks.remaining_chunks()} chunks left)")
+        self.tracker.set_range(instance.instance_number, start_range, end_range)
+        self.start_instance(instance.instance_number, self.config, start_range, end_range, instance.placement)
+
+    def start_instance(self, instance_number, config, start_range, end_range, placement=None):
+        existing = self.instances.get(instance_number)
+        if existing and existing.running():
+            stopping = self.stop_instances([existing])
+            if not self.supervisor.in_loop():
+                stopping.result()
+
+        command = keyhunt_core.construct_command_key(config, start_range, end_range)
+        if placement:
+            command = numactl_prefix(placement, self.topology) + command
+            self.emit_output(instance_number, f"Placement: {describe_placement(placement)}")
+        instance = KeyhuntInstance(instance_number, command, start_range, end_range, placement,
+                                   config.thread_count, stride_step(config), sequential_block(config))
+        self.instances[instance_number] = instance
+        if self.ledger_tracking(config):
+            instance.search = search_key(config)
+            self.get_ledger().mark_in_flight(instance.search, start_range, end_range)
+        self.emit_output(instance_number, f"Executing command: {' '.join(str(x) for x in command)}")
+
+        instance.task = self.supervisor.submit(self.run_instance(instance))
+        if not self.supervisor.in_loop():
+            # Callers outside the loop expect a started process (pid, placement) on return
+            instance.spawned.wait(SPAWN_TIMEOUT)
+        return instance
+
+    async def run_instance(self, instance):
+        """Supervisor coroutine: spawn, forward lines, parse them into events, report the exit code"""
+        instance_number = instance.instance_number
+        try:
+            instance.process = await spawn(instance.command)
+        except (OSError, ValueError) as e:
+            instance.exit_code = -1
+            instance.last_error = str(e)
+            instance.spawned.set()
+            self.emit_output(instance_number, f"Error: {str(e)}")
+            self.emit_event(instance_number, ErrorEvent("error", str(e), 0.0))
+            self.emit_finished(instance_number, -1)
+            return
+        instance.started = time.monotonic()
+        self.watchdog.started(instance_number)
+        self.sampler.track(instance_number, instance.pid)
+        instance.spawned.set()
+
+        if instance.placement and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(instance.pid, instance.placement.cpus)
+            except OSError as e:
+                self.emit_output(instance_number, f"Could not pin to CPUs {instance.placement.cpus}: {e}")
+
+        process = instance.process
+        try:
+            async for output in read_lines(process.stdout):
+                self.emit_output(instance_number, output)
+                self.watchdog.output(instance_number)
+                for event in instance.parser.feed(output):
+                    self.update_instance(instance, event)
+                    self.emit_event(instance_number, event)
+        except (OSError, ValueError) as e:
+            self.emit_output(instance_number, f"Error: {str(e)}")
+        finally:
+            instance.exit_code = await process.wait()
+            self.watchdog.stopped(instance_number)
+            self.sampler.untrack(instance_number)
+            self.record_progress(instance)
+            if instance_number == self.table_builder:
+                self.release_held_launches(builder_failed=not instance.finished_range())
+            self.emit_finished(instance_number, instance.exit_code)
+            if not await self.restart_crashed(instance):
+                await self.start_next_range(instance)
+
+    def get_restart_policy(self):
+        if self.restart_policy is None:
+            self.restart_policy = RestartPolicy.from_config()
+        return self.restart_policy
+
+    def remaining_range(self, instance):
+        """Part of a crashed instance's range still to search, all of it unless the scan is sequential"""
+        if self.config.move_mode in RESUMABLE_MOVE_MODES:
+            return instance.confirmed_position(), instance.range_end
+        return instance.range_start, instance.range_end
+
+    async def restart_crashed(self, instance):
+        """Restart a crashed instance on what is left of its range after an exponential backoff.
+
+        Returns False when the exit was not a crash, so the caller moves on as usual.
+        """
+        instance_number = instance.instance_number
+        status = classify_exit(instance.exit_code, instance.stop_requested, instance.last_error)
+        if instance.stalled_reason and not instance.stop_requested:
+            status = ExitStatus("crashed", f"stalled, {instance.stalled_reason}", True)
+        if status.outcome in ("finished", "stopped") or not self.active:
+            return False
+        if not status.restartable or not self.auto_restart:
+            self.emit_output(instance_number, f"Not restarting: {status.reason}")
+            return False
+        policy = self.get_restart_policy()
+        state = self.restart_states.setdefault(instance_number, RestartState())
+        uptime = time.monotonic() - instance.started if instance.started else 0
+        state.record_crash(status.reason, uptime, policy)
+        start_range, end_range = self.remaining_range(instance)
+        if start_range > end_range:
+            # Crashed after its last key, treat the range as done
+            next_range = await self.next_range(instance_number)
+            if next_range is None:
+                return True
+            start_range, end_range = next_range
+        if not state.budget_left(policy):
+            self.emit_output(instance_number, f"Crashed: {status.reason}. Restart budget of {policy.max_restarts} used up, "
+                                              f"{start_range:x} to {end_range:x} is left unsearched")
+            self.emit_event(instance_number, ErrorEvent("error", f"gave up after {state.restarts} restarts: {status.reason}",
+                                                        instance.elapsed()))
+            return True
+        state.restarts += 1
+        delay = policy.delay(state.consecutive)
+        self.emit_output(instance_number, f"Crashed: {status.reason}. Restarting on {start_range:x} to {end_range:x} "
+                                          f"in {delay:g}s (restart {state.restarts}/{policy.max_restarts})")
+        instance.restart_pending = True
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return True
+        finally:
+            instance.restart_pending = False
+        if not self.active or instance.stop_requested or self.instances.get(instance_number) is not instance:
+            return True
+        self.tracker.set_range(instance_number, start_range, end_range)
+        with self.hold_lock:
+            if self.table_builder not in (None, instance_number) and self.needs_table_build(self.config):
+                # Another instance took over building the shared table, wait for it like the others
+                self.held_launches.append((instance_number, start_range, end_range, instance.placement))
+                return True
+        self.start_instance(instance_number, self.config, start_range, end_range, instance.placement)
+        return True
+
+    async def watch(self):
+        """Supervisor coroutine: run the stall watchdog while instances are active"""
+        while self.active:
+            await asyncio.sleep(WATCH_INTERVAL)
+            for instance_number, old_state, state, reason in self.watchdog.check():
+                instance = self.instances.get(instance_number)
+                if reason:
+                    self.emit_output(instance_number, f"Stalled: {reason}")
+                    if instance:
+                        self.emit_event(instance_number, ErrorEvent("warning", f"stalled: {reason}", instance.elapsed()))
+                elif old_state in (SILENT, SLOW):
+                    self.emit_output(instance_number, "Stall cleared, instance is searching again")
+            for instance_number, instance in list(self.instances.items()):
+                if instance.running() and not instance.stalled_reason and self.watchdog.due_for_restart(instance_number):
+                    self.kill_stalled(instance)
+
+    async def sample_resources(self):
+        """Supervisor coroutine: sample CPU, memory and scheduler counters of every keyhunt"""
+        while self.active:
+            await asyncio.sleep(self.sampler.interval)
+            self.sampler.sample()
+
+    def kill_stalled(self, instance):
+        """Terminate a stalled process, the crash restart path brings it back on the rest of its range"""
+        cadence = self.watchdog.instances[instance.instance_number]
+        instance.stalled_reason = cadence.reason
+        self.emit_output(instance.instance_number, f"Terminating stalled instance: {cadence.reason}")
+        self.signal_instance(instance, "terminate")
+        self.supervisor.loop.call_later(TERMINATE_GRACE, self.kill_if_running, instance)
+
+    def kill_if_running(self, instance):
+        if instance.running():
+            self.signal_instance(instance, "kill")
+
+    def update_instance(self, instance, event):
+        if isinstance(event, SpeedSample):
+            instance.keys_done = event.total_keys
+            self.watchdog.speed(instance.instance_number, event.keys_per_second)
+            self.tracker.record(instance.instance_number, event)
+            if self.cache_store_pending:
+                with self.hold_lock:
+                    pending, self.cache_store_pending = self.cache_store_pending, False
+                if pending:
+                    self.supervisor.loop.run_in_executor(None, self.store_tables, instance)
+            if instance.instance_number == self.table_builder:
+                # keyhunt only starts searching once its table files are written
+                self.release_held_launches()
+        elif isinstance(event, PositionEvent):
+            if instance.range_start <= event.key <= instance.range_end + 1:
+                instance.last_position = event.key
+        elif isinstance(event, ErrorEvent) and event.level == "error":
+            instance.last_error = event.message
+
+    def ledger_tracking(self, config):
+        """Only sequential scans cover a contiguous range that can be recorded as searched"""
+        return self.ledger_file is not None and config.move_mode in RESUMABLE_MOVE_MODES
+
+    def get_ledger(self):
+        if self.ledger is None:
+            self.ledger = RangeLedger(self.ledger_file)
+        return self.ledger
+
+    def record_progress(self, instance):
+        """Move the searched part of the instance's range into the ledger and drop its claim"""
+        if instance.search is None:
+            return
+        ledger = self.get_ledger()
+        ledger.mark_done(instance.search, instance.range_start, instance.confirmed_position() - 1)
+        ledger.release(instance.search, instance.range_start, instance.range_end)
+
+    def signal_instance(self, instance, action):
+        """Send interrupt/terminate/kill to the instance's process group only"""
+        process = instance.process
+        try:
+            if platform.system() == "Windows":
+                if action == "interrupt":
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+                elif action == "kill":
+                    subprocess.run(["taskkill", "/f", "/t", "/pid", str(process.pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)
+                else:
+                    process.terminate()
+            else:
+                sig = {"interrupt": signal.SIGINT, "terminate": signal.SIGTERM, "kill": signal.SIGKILL}[action]
+                os.killpg(process.pid, sig)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            pass
+        except OSError as e:
+            self.emit_output(instance.instance_number, f"Error sending {action}: {e}")
+
+    async def wait_for_exit(self, instances, timeout):
+        """Wait for all instances together, return the ones still alive after the timeout"""
+        waits = [asyncio.ensure_future(instance.process.wait()) for instance in instances if instance.running()]
+        if waits:
+            _, pending = await asyncio.wait(waits, timeout=timeout)
+            for wait in pending:
+                wait.cancel()
+        return [instance for instance in instances if instance.running()]
+
+    async def escalate_stop(self, running, interrupt_grace):
+        """Supervisor coroutine: SIGINT, then SIGTERM, then SIGKILL to whatever is still alive"""
+        stopped = [instance.instance_number for instance in running]
+        for action, grace in (("interrupt", interrupt_grace), ("terminate", TERMINATE_GRACE), ("kill", KILL_GRACE)):
+            for instance in running:
+                self.signal_instance(instance, action)
+            running = await self.wait_for_exit(running, grace)
+            if not running:
+                break
+        return stopped
+
+    def stop_instances(self, instances, interrupt_grace=INTERRUPT_GRACE):
+        """Stop the given instances in parallel without blocking the caller.
+
+        Returns a concurrent Future of the numbers of the instances that were running,
+        done once they have all exited; result() waits for that.
+        """
+        for instance in instances:
+            if instance.restart_pending:
+                instance.stop_requested = True
+                instance.task.cancel()
+        running = [instance for instance in instances if instance.running()]
+        for instance in running:
+            instance.stop_requested = True
+        if not running:
+            stopped = concurrent.futures.Future()
+            stopped.set_result([])
+            return stopped
+        return self.supervisor.submit(self.escalate_stop(running, interrupt_grace))
+
+    def stop_instance(self, instance_number, interrupt_grace=INTERRUPT_GRACE):
+        instance = self.instances.get(instance_number)
+        return self.stop_instances([instance] if instance else [], interrupt_grace)
+
+    def stop_all(self, interrupt_grace=INTERRUPT_GRACE):
+        """Stop every instance, returns a Future of the numbers of the ones that were running"""
+        self.active = False
+        self.generation += 1
+        with self.hold_lock:
+            self.held_launches = []
+        return self.stop_instances(list(self.instances.values()), interrupt_grace)
+
+    def close(self, interrupt_grace=INTERRUPT_GRACE):
+        """Stop everything and release the supervisor thread and metrics endpoint"""
+        self.stop_all(interrupt_grace).result()
+        if self.metrics is not None:
+            self.metrics.stop()
+            self.metrics = None
+        self.supervisor.stop()
+
+    def running(self):
+        """True while any instance's supervisor task is live (running or relaunching) or waits for its tables"""
+        if self.launch_task is not None and not self.launch_task.done():
+            return True
+        return bool(self.held_launches) or any(
+            instance.task is not None and not instance.task.done() for instance in self.instances.values())
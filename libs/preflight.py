@@ -0,0 +1,178 @@
+"""
+@author: Team Mizogg
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from libs.keyhunt_core import input_path
+from libs import input_compiler as ic
+
+SAMPLE_BYTES = 64 * 1024  # head of the file read by the blocking check
+SAMPLE_LINES = 500
+HLL_BITS = 14  # 16384 registers, about 0.8% error on the distinct count
+
+# Entry types each mode can search for, the first group blocks the launch, the second only warns
+MODE_TYPES = {
+    "address": ({ic.LEGACY, ic.BECH32, ic.ETH}, {ic.P2SH}),
+    "rmd160": ({ic.HASH160, ic.ETH}, set()),
+    "bsgs": ({ic.COMPRESSED, ic.UNCOMPRESSED}, set()),
+}
+MODE_HINTS = {
+    "address": "addresses (1..., bc1q..., 0x... for ETH)",
+    "rmd160": "hash160 hex strings or a compiled .bin file",
+    "bsgs": "public keys (02/03/04 hex)",
+}
+
+
+class HyperLogLog:
+    """Distinct count estimate in fixed memory, so duplicate ratios work on any file size"""
+
+    def __init__(self, bits=HLL_BITS):
+        self.bits = bits
+        self.size = 1 << bits
+        self.registers = bytearray(self.size)
+
+    def add(self, value):
+        hashed = int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.bits)
+        rest = hashed & ((1 << (64 - self.bits)) - 1)
+        rank = (64 - self.bits) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)  # small range correction
+        return int(estimate)
+
+
+def dominant_type(types):
+    return max(types, key=types.get) if types else None
+
+
+def sample_types(path):
+    """Entry types in the first lines of a text file, reads at most SAMPLE_BYTES"""
+    types, invalid = {}, 0
+    with open(path, "rb") as f:
+        head = f.read(SAMPLE_BYTES)
+    lines = head.split(b"\n")
+    if len(head) == SAMPLE_BYTES:
+        lines = lines[:-1]  # the last line is probably cut off
+    for raw in lines[:SAMPLE_LINES]:
+        entry = raw.decode("utf-8", "replace").strip()
+        if not entry or entry.startswith("#"):
+            continue
+        try:
+            entry_type, _ = ic.classify(entry)
+        except ValueError:
+            invalid += 1
+            continue
+        types[entry_type] = types.get(entry_type, 0) + 1
+    return types, invalid
+
+
+def check_input(config):
+    """Fast preflight: raise ValueError when the input file can't work in this mode.
+
+    Only the head of the file is read, so this takes milliseconds for any file size.
+    Returns a list of warnings that should not block the launch.
+    """
+    if not config.input_file:
+        raise ValueError("No input file selected")
+    path = input_path(config.input_file)
+    if not os.path.isfile(path):
+        raise ValueError(f"Input file not found: {path}")
+    size = os.path.getsize(path)
+    if size == 0:
+        raise ValueError(f"Input file is empty: {path}")
+    allowed, tolerated = MODE_TYPES.get(config.mode, (None, set()))
+    if allowed is None:
+        return []
+    if path.endswith(".bin"):
+        if config.mode == "bsgs":
+            raise ValueError(f"{os.path.basename(path)} is a binary hash file, bsgs mode needs {MODE_HINTS['bsgs']}")
+        if size % ic.RECORD_SIZES[ic.RMD160]:
+            raise ValueError(f"{os.path.basename(path)} is not a whole number of 20 byte hashes")
+        return []
+    types, invalid = sample_types(path)
+    found = dominant_type(types)
+    if found is None:
+        raise ValueError(f"No valid entries in the first lines of {os.path.basename(path)}, "
+                         f"{config.mode} mode needs {MODE_HINTS[config.mode]}")
+    if found not in allowed | tolerated:
+        raise ValueError(f"{os.path.basename(path)} looks like a list of {found} entries but "
+                         f"{config.mode} mode needs {MODE_HINTS[config.mode]}")
+    warnings = []
+    if found in tolerated:
+        warnings.append(f"{os.path.basename(path)} is mostly {found} entries, keyhunt can't find keys for those")
+    if (found == ic.ETH) != (config.crypto == "eth") and config.mode == "address":
+        warnings.append(f"{os.path.basename(path)} holds {found} entries but crypto is set to {config.crypto}")
+    if invalid:
+        warnings.append(f"{invalid} invalid line(s) in the first {SAMPLE_LINES} of {os.path.basename(path)}")
+    return warnings
+
+
+class InputStats:
+    def __init__(self, path):
+        self.path = path
+        self.bytes = os.path.getsize(path)
+        self.lines = 0
+        self.invalid = 0
+        self.types = {}
+        self.distinct = 0
+        self.seconds = 0.0
+
+    @property
+    def valid(self):
+        return sum(self.types.values())
+
+    @property
+    def duplicate_ratio(self):
+        return max(0.0, 1 - self.distinct / self.valid) if self.valid else 0.0
+
+    def describe(self):
+        types = ", ".join(f"{count:,} {name}" for name, count in sorted(self.types.items(), key=lambda item: -item[1]))
+        return (f"{os.path.basename(self.path)}: {self.lines:,} lines ({types or 'no valid entries'}), "
+                f"{self.invalid:,} invalid, ~{self.duplicate_ratio * 100:.1f}% duplicates, "
+                f"scanned in {self.seconds:.1f}s")
+
+
+def scan_input(path, progress=None):
+    """Stream the whole file once for line count, entry types and an estimated duplicate ratio"""
+    stats = InputStats(path)
+    started = time.monotonic()
+    if path.endswith(".bin"):
+        stats.lines = stats.bytes // ic.RECORD_SIZES[ic.RMD160]
+        stats.types[ic.HASH160] = stats.lines
+        stats.distinct = stats.lines
+        manifest = path + ".json"
+        if os.path.isfile(manifest):
+            with open(manifest) as f:
+                stats.distinct = json.load(f)["stats"]["written"]
+        stats.seconds = time.monotonic() - started
+        return stats
+    distinct = HyperLogLog()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            stats.lines += 1
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            try:
+                entry_type, record = ic.classify(entry)
+            except ValueError:
+                stats.invalid += 1
+                continue
+            stats.types[entry_type] = stats.types.get(entry_type, 0) + 1
+            distinct.add(record if record is not None else entry.encode())
+            if progress and stats.lines % 1000000 == 0:
+                progress(f"{stats.lines:,} lines scanned")
+    # The estimate can't exceed the number of entries it was built from
+    stats.distinct = min(distinct.count(), stats.valid)
+    stats.seconds = time.monotonic() - started
+    return stats
@@ -0,0 +1,129 @@
+"""
+@author: Team Mizogg
+"""
+import os
+from collections import namedtuple
+
+PROC = "/proc"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+ProcessStat = namedtuple("ProcessStat", ["cpu_seconds", "rss_bytes", "minor_faults", "major_faults", "threads"])
+ProcessStatus = namedtuple("ProcessStatus", ["rss_bytes", "swap_bytes", "voluntary_switches", "involuntary_switches"])
+SchedStat = namedtuple("SchedStat", ["run_seconds", "wait_seconds", "timeslices"])
+
+
+def read_stat(pid, proc=PROC):
+    """Counters from /proc/<pid>/stat, None when the process is gone or there is no procfs"""
+    try:
+        with open(os.path.join(proc, str(pid), "stat")) as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name is in parentheses and may itself contain spaces or parentheses
+    fields = data[data.rindex(")") + 2:].split()
+    # fields[0] is field 3 (state) of proc(5)
+    return ProcessStat(
+        cpu_seconds=(int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        rss_bytes=int(fields[21]) * PAGE_SIZE,
+        minor_faults=int(fields[7]),
+        major_faults=int(fields[9]),
+        threads=int(fields[17]),
+    )
+
+
+def read_key_values(path):
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            values[key.strip()] = value.split()
+    return values
+
+
+def task_dirs(pid, proc=PROC):
+    """/proc/<pid>/task/<tid> of every thread, keyhunt does its work in its threads"""
+    base = os.path.join(proc, str(pid), "task")
+    try:
+        return [os.path.join(base, tid) for tid in os.listdir(base)]
+    except OSError:
+        return []
+
+
+def read_status(pid, proc=PROC):
+    """Memory from /proc/<pid>/status and context switches summed over all threads, None when gone"""
+    try:
+        values = read_key_values(os.path.join(proc, str(pid), "status"))
+    except OSError:
+        return None
+    voluntary = involuntary = 0
+    for task in task_dirs(pid, proc):
+        try:
+            task_values = read_key_values(os.path.join(task, "status"))
+        except OSError:
+            continue  # thread exited between listdir and open
+        voluntary += int(task_values.get("voluntary_ctxt_switches", ["0"])[0])
+        involuntary += int(task_values.get("nonvoluntary_ctxt_switches", ["0"])[0])
+    return ProcessStatus(
+        rss_bytes=int(values.get("VmRSS", ["0"])[0]) * 1024,
+        swap_bytes=int(values.get("VmSwap", ["0"])[0]) * 1024,
+        voluntary_switches=voluntary,
+        involuntary_switches=involuntary,
+    )
+
+
+def read_schedstat(pid, proc=PROC):
+    """Scheduler time summed over all threads, wait is time spent runnable but not on a CPU.
+
+    Uses the per thread schedstat files, /proc/<pid>/sched only exists with CONFIG_SCHED_DEBUG
+    and only covers the main thread.
+    """
+    run = wait = slices = 0
+    found = False
+    for task in task_dirs(pid, proc):
+        try:
+            with open(os.path.join(task, "schedstat")) as f:
+                fields = f.read().split()
+        except OSError:
+            continue
+        found = True
+        run, wait, slices = run + int(fields[0]), wait + int(fields[1]), slices + int(fields[2])
+    return SchedStat(run / 1e9, wait / 1e9, slices) if found else None
+
+
+def cpu_stat_path(pid, proc=PROC, root=CGROUP_ROOT):
+    """cpu.stat of the cgroup the process runs in (v2 or the v1 cpu controller), None if there is none"""
+    try:
+        with open(os.path.join(proc, str(pid), "cgroup")) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    candidates = []
+    for line in lines:
+        _, controllers, path = line.split(":", 2)
+        if controllers == "":
+            candidates += [os.path.join(root, path.lstrip("/")), os.path.join(root, "unified", path.lstrip("/"))]
+        elif "cpu" in controllers.split(","):
+            candidates += [os.path.join(root, mount, path.lstrip("/")) for mount in (controllers, "cpu", "cpu,cpuacct")]
+    for candidate in candidates:
+        stat_path = os.path.join(candidate, "cpu.stat")
+        if os.path.isfile(stat_path):
+            return stat_path
+    return None
+
+
+def read_throttled_seconds(stat_path):
+    """Time the cgroup's CPU quota held the process back, None without a quota or cgroup"""
+    if stat_path is None:
+        return None
+    try:
+        with open(stat_path) as f:
+            values = dict(line.split() for line in f if line.strip())
+    except (OSError, ValueError):
+        return None
+    if "throttled_usec" in values:
+        return int(values["throttled_usec"]) / 1e6
+    if "throttled_time" in values:
+        return int(values["throttled_time"]) / 1e9
+    return None
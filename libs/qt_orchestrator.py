@@ -0,0 +1,22 @@
+"""
+@author: Team Mizogg
+"""
+from PyQt6.QtCore import QObject, pyqtSignal
+from libs.orchestrator import Orchestrator
+
+class QtOrchestrator(QObject):
+    """Qt adapter: orchestrator callbacks arrive as signals on the GUI thread.
+
+    Output lines skip the event loop and go straight to `output_sink`, which must
+    be thread safe (ConsoleWindow.append_output only touches a locked buffer).
+    """
+    commandEvent = pyqtSignal(int, object)
+    commandFinished = pyqtSignal(int, int)
+
+    def __init__(self, output_sink, parent=None):
+        super().__init__(parent)
+        self.engine = Orchestrator(
+            on_output=output_sink,
+            on_event=self.commandEvent.emit,
+            on_finished=self.commandFinished.emit,
+        )
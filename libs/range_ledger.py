@@ -0,0 +1,172 @@
+"""
+@author: Team Mizogg
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+LEDGER_FILE = "ledger.db"
+KEY_WIDTH = 64  # zero padded hex so text ordering matches numeric ordering
+DONE = "done"
+IN_FLIGHT = "in_flight"
+
+
+def to_key(value):
+    return f"{value:0{KEY_WIDTH}x}"
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or adjacent inclusive (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start, end, covered):
+    """Parts of [start, end] not covered by the merged `covered` intervals"""
+    gaps = []
+    current = start
+    for covered_start, covered_end in covered:
+        if covered_end < current:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > current:
+            gaps.append((current, covered_start - 1))
+        current = max(current, covered_end + 1)
+        if current > end:
+            break
+    if current <= end:
+        gaps.append((current, end))
+    return gaps
+
+
+def split_intervals(intervals, num_shares):
+    """Divide the keys in `intervals` into num_shares lists of contiguous pieces of about equal size"""
+    total = sum(end - start + 1 for start, end in intervals)
+    if total == 0:
+        return [[] for _ in range(num_shares)]
+    target = -(-total // num_shares)
+    shares = [[]]
+    room = target
+    for start, end in intervals:
+        while start <= end:
+            if room == 0:
+                shares.append([])
+                room = target
+            piece_end = min(end, start + room - 1)
+            shares[-1].append((start, piece_end))
+            room -= piece_end - start + 1
+            start = piece_end + 1
+    shares.extend([] for _ in range(num_shares - len(shares)))
+    return shares
+
+
+def search_key(config):
+    """What a searched interval is valid for: the same targets searched the same way"""
+    return f"{config.mode}|{config.crypto}|{config.look}|{config.input_file}|stride={config.stride or '1'}"
+
+
+def session_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True  # can't tell for other machines, assume they are still working
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RangeLedger:
+    """Persistent interval set of searched and in-flight sub-ranges, stored in SQLite"""
+
+    def __init__(self, path=LEDGER_FILE, owner=None):
+        self.path = path
+        self.owner = owner or session_owner()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS intervals ("
+            " search TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL,"
+            " state TEXT NOT NULL, owner TEXT, updated REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS intervals_search ON intervals (search, state, start)")
+        self.db.commit()
+
+    def intervals(self, search, state):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT start, end, owner FROM intervals WHERE search = ? AND state = ? ORDER BY start",
+                (search, state),
+            ).fetchall()
+        return [(int(start, 16), int(end, 16), owner) for start, end, owner in rows]
+
+    def done(self, search):
+        return merge_intervals((start, end) for start, end, _ in self.intervals(search, DONE))
+
+    def mark_done(self, search, start, end):
+        """Record [start, end] as searched, merging it with neighbouring done intervals"""
+        if end < start:
+            return
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT rowid, start, end FROM intervals WHERE search = ? AND state = ? AND start <= ? AND end >= ?",
+                (search, DONE, to_key(end + 1), to_key(max(0, start - 1))),
+            ).fetchall()
+            merged_start = min([start] + [int(row[1], 16) for row in rows])
+            merged_end = max([end] + [int(row[2], 16) for row in rows])
+            self.db.executemany("DELETE FROM intervals WHERE rowid = ?", [(row[0],) for row in rows])
+            self.db.execute(
+                "INSERT INTO intervals (search, start, end, state, owner, updated) VALUES (?, ?, ?, ?, NULL, ?)",
+                (search, to_key(merged_start), to_key(merged_end), DONE, time.time()),
+            )
+            self.db.commit()
+
+    def mark_in_flight(self, search, start, end):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO intervals (search, start, end, state, owner, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (search, to_key(start), to_key(end), IN_FLIGHT, self.owner, time.time()),
+            )
+            self.db.commit()
+
+    def release(self, search, start, end):
+        """Drop our in-flight claim on [start, end]"""
+        with self.lock:
+            self.db.execute(
+                "DELETE FROM intervals WHERE search = ? AND state = ? AND owner = ? AND start = ? AND end = ?",
+                (search, IN_FLIGHT, self.owner, to_key(start), to_key(end)),
+            )
+            self.db.commit()
+
+    def release_stale(self):
+        """Forget in-flight claims whose owning process is gone (including our own previous runs)"""
+        with self.lock:
+            owners = [row[0] for row in self.db.execute(
+                "SELECT DISTINCT owner FROM intervals WHERE state = ?", (IN_FLIGHT,))]
+            stale = [(IN_FLIGHT, owner) for owner in owners if owner == self.owner or not owner_alive(owner)]
+            self.db.executemany("DELETE FROM intervals WHERE state = ? AND owner = ?", stale)
+            self.db.commit()
+
+    def uncovered(self, search, start, end):
+        """Parts of [start, end] that are neither searched nor claimed by a live process"""
+        covered = [(s, e) for s, e, _ in self.intervals(search, DONE)]
+        covered += [(s, e) for s, e, owner in self.intervals(search, IN_FLIGHT) if owner != self.owner]
+        return subtract_intervals(start, end, merge_intervals(covered))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,134 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import time
+from collections import deque, namedtuple
+from libs import proc_stats
+from libs.memory_planner import format_bytes
+
+CONFIG_FILE = "config.ini"
+DEFAULT_INTERVAL = 2.0
+DEFAULT_HISTORY = 300  # samples kept per instance, 10 minutes at the default interval
+
+# Rates are per second over the last interval. cpu_percent is summed over threads, so 400 is four busy cores.
+# run_wait_percent is time runnable but waiting for a CPU (contention), throttled_percent is time held
+# back by a cgroup CPU quota, both relative to the interval.
+ResourceSample = namedtuple("ResourceSample", [
+    "time", "pid", "cpu_percent", "rss_bytes", "swap_bytes", "major_faults", "major_faults_per_second",
+    "voluntary_switches_per_second", "involuntary_switches_per_second", "run_wait_percent", "throttled_percent",
+])
+RawCounters = namedtuple("RawCounters", ["time", "stat", "status", "sched", "throttled"])
+
+
+def rate(current, previous, seconds):
+    if current is None or previous is None or seconds <= 0:
+        return None
+    return max(0.0, (current - previous) / seconds)
+
+
+class ResourceSampler:
+    """Reads /proc/<pid>/stat, status and per thread schedstat of every keyhunt at a fixed interval.
+
+    Keeps a ring buffer of ResourceSample per instance number, across restarts of the instance.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY, clock=time.monotonic):
+        self.interval = interval
+        self.history_size = history
+        self.clock = clock
+        self.pids = {}  # instance_number -> pid being sampled
+        self.cgroups = {}  # pid -> cpu.stat path
+        self.previous = {}  # instance_number -> RawCounters of the last sample
+        self.series = {}  # instance_number -> deque of ResourceSample
+
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE):
+        """Settings from the [sampler] section of config.ini"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        return cls(config.getfloat("sampler", "interval_seconds", fallback=DEFAULT_INTERVAL),
+                   config.getint("sampler", "history", fallback=DEFAULT_HISTORY))
+
+    def reset(self):
+        self.pids.clear()
+        self.cgroups.clear()
+        self.previous.clear()
+        self.series.clear()
+
+    def track(self, instance_number, pid):
+        self.pids[instance_number] = pid
+        self.previous.pop(instance_number, None)  # counters of a new process start from zero
+        self.cgroups[pid] = proc_stats.cpu_stat_path(pid)
+        self.series.setdefault(instance_number, deque(maxlen=self.history_size))
+
+    def untrack(self, instance_number):
+        pid = self.pids.pop(instance_number, None)
+        self.cgroups.pop(pid, None)
+        self.previous.pop(instance_number, None)
+
+    def read(self, pid):
+        stat = proc_stats.read_stat(pid)
+        if stat is None:
+            return None
+        return RawCounters(self.clock(), stat, proc_stats.read_status(pid), proc_stats.read_schedstat(pid),
+                           proc_stats.read_throttled_seconds(self.cgroups.get(pid)))
+
+    def sample(self):
+        """Take one sample of every tracked process, returns {instance_number: ResourceSample}"""
+        taken = {}
+        for instance_number, pid in list(self.pids.items()):
+            current = self.read(pid)
+            if current is None:
+                continue
+            previous = self.previous.get(instance_number)
+            self.previous[instance_number] = current
+            if previous is None:
+                continue  # rates need two readings
+            seconds = current.time - previous.time
+            status, old_status = current.status, previous.status
+            sched, old_sched = current.sched, previous.sched
+            wait = rate(sched and sched.wait_seconds, old_sched and old_sched.wait_seconds, seconds)
+            throttled = rate(current.throttled, previous.throttled, seconds)
+            sample = ResourceSample(
+                time=time.time(),
+                pid=pid,
+                cpu_percent=rate(current.stat.cpu_seconds, previous.stat.cpu_seconds, seconds) * 100,
+                rss_bytes=status.rss_bytes if status else current.stat.rss_bytes,
+                swap_bytes=status.swap_bytes if status else 0,
+                major_faults=current.stat.major_faults,
+                major_faults_per_second=rate(current.stat.major_faults, previous.stat.major_faults, seconds),
+                voluntary_switches_per_second=rate(status and status.voluntary_switches,
+                                                   old_status and old_status.voluntary_switches, seconds),
+                involuntary_switches_per_second=rate(status and status.involuntary_switches,
+                                                     old_status and old_status.involuntary_switches, seconds),
+                run_wait_percent=None if wait is None else wait * 100,
+                throttled_percent=None if throttled is None else min(100.0, throttled * 100),
+            )
+            self.series.setdefault(instance_number, deque(maxlen=self.history_size)).append(sample)
+            taken[instance_number] = sample
+        return taken
+
+    def latest(self, instance_number):
+        series = self.series.get(instance_number)
+        return series[-1] if series else None
+
+    def history(self, instance_number):
+        return list(self.series.get(instance_number, ()))
+
+
+def describe_sample(sample):
+    """One line for a console header, e.g. CPU 398% | RSS 1.9 GB | majflt 0/s | ctx 12/310/s"""
+    if sample is None:
+        return ""
+    parts = [f"CPU {sample.cpu_percent:.0f}%", f"RSS {format_bytes(sample.rss_bytes)}"]
+    if sample.swap_bytes:
+        parts.append(f"swap {format_bytes(sample.swap_bytes)}")
+    parts.append(f"majflt {sample.major_faults_per_second:.0f}/s")
+    if sample.voluntary_switches_per_second is not None:
+        parts.append(f"ctx {sample.voluntary_switches_per_second:.0f}/{sample.involuntary_switches_per_second:.0f}/s")
+    if sample.run_wait_percent is not None:
+        parts.append(f"runq {sample.run_wait_percent:.0f}%")
+    if sample.throttled_percent:
+        parts.append(f"throttled {sample.throttled_percent:.0f}%")
+    return " | ".join(parts)
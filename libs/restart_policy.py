@@ -0,0 +1,123 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import signal
+from collections import namedtuple
+
+CONFIG_FILE = "config.ini"
+DEFAULT_MAX_RESTARTS = 5
+DEFAULT_BACKOFF = 2.0
+DEFAULT_MAX_BACKOFF = 300.0
+# A crash after this long counts as a fresh failure, the backoff starts over
+DEFAULT_STABLE_SECONDS = 600.0
+
+# Windows NTSTATUS codes a crashed keyhunt.exe exits with
+WINDOWS_CRASHES = {
+    0xC0000005: "access violation",
+    0xC0000017: "out of memory",
+    0xC00000FD: "stack overflow",
+    0xC0000409: "stack buffer overrun",
+}
+SIGNAL_REASONS = {
+    "SIGKILL": "killed by SIGKILL, most likely the kernel's out of memory killer",
+    "SIGSEGV": "segmentation fault",
+    "SIGBUS": "bus error",
+    "SIGABRT": "aborted",
+    "SIGILL": "illegal instruction, binary built for a different CPU",
+    "SIGFPE": "arithmetic error",
+    "SIGTERM": "terminated by another process",
+    "SIGINT": "interrupted by another process",
+}
+
+# outcome is one of "finished", "stopped", "error" (keyhunt refused to run) or "crashed"
+ExitStatus = namedtuple("ExitStatus", ["outcome", "reason", "restartable"])
+
+
+def signal_name(number):
+    try:
+        return signal.Signals(number).name
+    except ValueError:
+        return f"signal {number}"
+
+
+def classify_exit(exit_code, stop_requested=False, last_error=None):
+    """What an exit code means for a keyhunt instance and whether restarting it can help.
+
+    asyncio reports death by signal as a negative code; shells and wrappers like numactl
+    can turn the same thing into 128 + signal. keyhunt itself exits with 1 after printing
+    an [E] line, running the same command again would fail the same way.
+    """
+    if stop_requested:
+        return ExitStatus("stopped", "stopped by user", False)
+    if exit_code == 0:
+        return ExitStatus("finished", "finished its range", False)
+    if exit_code == -1 and last_error:
+        return ExitStatus("error", f"could not start: {last_error}", False)
+    if exit_code is not None and exit_code < 0:
+        name = signal_name(-exit_code)
+        return ExitStatus("crashed", SIGNAL_REASONS.get(name, f"killed by {name}"), True)
+    if exit_code in WINDOWS_CRASHES:
+        return ExitStatus("crashed", WINDOWS_CRASHES[exit_code], True)
+    if exit_code is not None and 128 < exit_code < 160:
+        name = signal_name(exit_code - 128)
+        return ExitStatus("crashed", SIGNAL_REASONS.get(name, f"killed by {name}"), True)
+    if last_error:
+        return ExitStatus("error", f"keyhunt error: {last_error}", False)
+    return ExitStatus("crashed", f"exited with code {exit_code}", True)
+
+
+def describe_exit(exit_code, stop_requested=False, last_error=None):
+    """Console line for a finished process"""
+    status = classify_exit(exit_code, stop_requested, last_error)
+    if status.outcome == "stopped":
+        return "Process stopped by user"
+    if status.outcome == "finished":
+        return "Process finished"
+    verb = "failed" if status.outcome == "error" else "crashed"
+    return f"Process {verb} (exit code {exit_code}): {status.reason}"
+
+
+class RestartPolicy:
+    """Exponential backoff with a per instance restart budget"""
+
+    def __init__(self, max_restarts=DEFAULT_MAX_RESTARTS, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, stable_seconds=DEFAULT_STABLE_SECONDS):
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_seconds = stable_seconds
+
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE):
+        """Settings from the [restart] section of config.ini"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        return cls(
+            config.getint("restart", "max_restarts", fallback=DEFAULT_MAX_RESTARTS),
+            config.getfloat("restart", "backoff_seconds", fallback=DEFAULT_BACKOFF),
+            config.getfloat("restart", "max_backoff_seconds", fallback=DEFAULT_MAX_BACKOFF),
+            config.getfloat("restart", "stable_seconds", fallback=DEFAULT_STABLE_SECONDS),
+        )
+
+    def delay(self, consecutive_crashes):
+        """Seconds to wait before restart number `consecutive_crashes` (1 based) in a row"""
+        return min(self.max_backoff, self.backoff * 2 ** max(0, consecutive_crashes - 1))
+
+
+class RestartState:
+    """Crash history of one instance slot over a run"""
+
+    def __init__(self):
+        self.restarts = 0
+        self.consecutive = 0
+        self.last_reason = None
+
+    def record_crash(self, reason, uptime, policy):
+        if uptime >= policy.stable_seconds:
+            self.consecutive = 0
+        self.consecutive += 1
+        self.last_reason = reason
+
+    def budget_left(self, policy):
+        return self.restarts < policy.max_restarts
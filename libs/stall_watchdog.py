@@ -0,0 +1,179 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import time
+from libs.throughput import format_duration
+
+CONFIG_FILE = "config.ini"
+DEFAULT_SILENCE_FACTOR = 4.0  # silent for this many expected intervals counts as a stall
+DEFAULT_MIN_SILENCE = 60.0
+DEFAULT_SETUP_TIMEOUT = 1800.0  # no output at all while loading or building tables
+DEFAULT_SLOW_FRACTION = 0.2  # speed below this share of the instance's own baseline
+DEFAULT_SLOW_SAMPLES = 3
+DEFAULT_RESTART_AFTER = 300.0
+CADENCE_ALPHA = 0.2  # weight of the newest interval or speed in the running averages
+MIN_BASELINE_SAMPLES = 3
+
+OK, SETUP, SILENT, SLOW = "ok", "setup", "silent", "slow"
+
+
+class Cadence:
+    """What the watchdog has learned about one instance's output"""
+
+    def __init__(self, now):
+        self.started = now
+        self.running = True
+        self.last_output = now
+        self.last_speed = None
+        self.interval = None  # running average of seconds between speed lines
+        self.deviation = 0.0
+        self.baseline = None  # running average of healthy keys/s
+        self.samples = 0
+        self.slow_samples = 0
+        self.state = SETUP
+        self.stalled_since = None
+        self.reason = None
+
+    def expected_interval(self):
+        return None if self.interval is None else self.interval + 4 * self.deviation
+
+
+class StallWatchdog:
+    """Flags instances that go quiet for longer than their own output cadence, or slow right down.
+
+    Feed it every output line and speed sample, then call check() periodically. Before the
+    first speed line an instance is loading or building tables and only a long silence counts.
+    """
+
+    def __init__(self, silence_factor=DEFAULT_SILENCE_FACTOR, min_silence=DEFAULT_MIN_SILENCE,
+                 setup_timeout=DEFAULT_SETUP_TIMEOUT, slow_fraction=DEFAULT_SLOW_FRACTION,
+                 slow_samples=DEFAULT_SLOW_SAMPLES, restart_after=DEFAULT_RESTART_AFTER,
+                 restart_stalled=False, clock=time.monotonic):
+        self.silence_factor = silence_factor
+        self.min_silence = min_silence
+        self.setup_timeout = setup_timeout
+        self.slow_fraction = slow_fraction
+        self.slow_samples = slow_samples
+        self.restart_after = restart_after
+        self.restart_stalled = restart_stalled
+        self.clock = clock
+        self.instances = {}
+
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE):
+        """Settings from the [watchdog] section of config.ini"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        return cls(
+            config.getfloat("watchdog", "silence_factor", fallback=DEFAULT_SILENCE_FACTOR),
+            config.getfloat("watchdog", "min_silence_seconds", fallback=DEFAULT_MIN_SILENCE),
+            config.getfloat("watchdog", "setup_timeout_seconds", fallback=DEFAULT_SETUP_TIMEOUT),
+            config.getfloat("watchdog", "slow_fraction", fallback=DEFAULT_SLOW_FRACTION),
+            config.getint("watchdog", "slow_samples", fallback=DEFAULT_SLOW_SAMPLES),
+            config.getfloat("watchdog", "restart_after_seconds", fallback=DEFAULT_RESTART_AFTER),
+            config.getboolean("watchdog", "restart_stalled", fallback=False),
+        )
+
+    def started(self, instance_number):
+        """A new process for this instance, keep what was learned about its cadence and speed"""
+        now = self.clock()
+        previous = self.instances.get(instance_number)
+        cadence = Cadence(now)
+        if previous is not None:
+            cadence.interval, cadence.deviation = previous.interval, previous.deviation
+            cadence.baseline, cadence.samples = previous.baseline, previous.samples
+        self.instances[instance_number] = cadence
+
+    def stopped(self, instance_number):
+        cadence = self.instances.get(instance_number)
+        if cadence is not None:
+            cadence.running = False
+            cadence.stalled_since = None
+
+    def reset(self):
+        self.instances.clear()
+
+    def output(self, instance_number):
+        cadence = self.instances.get(instance_number)
+        if cadence is not None:
+            cadence.last_output = self.clock()
+
+    def speed(self, instance_number, keys_per_second):
+        cadence = self.instances.get(instance_number)
+        if cadence is None:
+            return
+        now = self.clock()
+        if cadence.last_speed is not None:
+            gap = now - cadence.last_speed
+            if cadence.interval is None:
+                cadence.interval = gap
+            else:
+                cadence.deviation += CADENCE_ALPHA * (abs(gap - cadence.interval) - cadence.deviation)
+                cadence.interval += CADENCE_ALPHA * (gap - cadence.interval)
+        cadence.last_speed = now
+        if cadence.samples >= MIN_BASELINE_SAMPLES and keys_per_second < cadence.baseline * self.slow_fraction:
+            cadence.slow_samples += 1
+            return  # slow samples don't drag the baseline down
+        cadence.slow_samples = 0
+        cadence.samples += 1
+        if cadence.baseline is None:
+            cadence.baseline = keys_per_second
+        else:
+            cadence.baseline += CADENCE_ALPHA * (keys_per_second - cadence.baseline)
+
+    def silence_limit(self, cadence):
+        if cadence.last_speed is None:
+            return self.setup_timeout
+        expected = cadence.expected_interval()
+        if expected is None:
+            return max(self.min_silence, self.setup_timeout / 10)
+        return max(self.min_silence, self.silence_factor * expected)
+
+    def check(self):
+        """Update every running instance's state, returns [(instance_number, old state, new state, reason)] for changes"""
+        now = self.clock()
+        changes = []
+        for instance_number, cadence in list(self.instances.items()):
+            if not cadence.running:
+                continue
+            silent = now - cadence.last_output
+            if silent > self.silence_limit(cadence):
+                state = SILENT
+                reason = f"no output for {silent:.0f}s"
+                if cadence.expected_interval() is not None:
+                    reason += f", expected every {cadence.expected_interval():.0f}s"
+            elif cadence.slow_samples >= self.slow_samples:
+                state = SLOW
+                reason = f"speed below {self.slow_fraction * 100:.0f}% of its usual {cadence.baseline:,.0f} keys/s"
+            else:
+                state = SETUP if cadence.last_speed is None else OK
+                reason = None
+            stalled = state in (SILENT, SLOW)
+            if stalled and cadence.stalled_since is None:
+                # A silent instance has been stuck since its last line, not since we noticed
+                cadence.stalled_since = cadence.last_output if state == SILENT else now
+            elif not stalled:
+                cadence.stalled_since = None
+            if state != cadence.state:
+                changes.append((instance_number, cadence.state, state, reason))
+            cadence.state, cadence.reason = state, reason
+        return changes
+
+    def stalled_seconds(self, instance_number):
+        """How long the instance has been stalled, None when it is not"""
+        cadence = self.instances.get(instance_number)
+        if cadence is None or cadence.stalled_since is None:
+            return None
+        return self.clock() - cadence.stalled_since
+
+    def due_for_restart(self, instance_number):
+        stalled = self.stalled_seconds(instance_number)
+        return self.restart_stalled and stalled is not None and stalled >= self.restart_after
+
+    def describe_stall(self, instance_number):
+        """e.g. "silent 2m 5s" for a status column, None when the instance is not stalled"""
+        cadence = self.instances.get(instance_number)
+        if cadence is None or cadence.stalled_since is None:
+            return None
+        return f"{cadence.state} {format_duration(self.clock() - cadence.stalled_since)}"
@@ -0,0 +1,117 @@
+"""
+@author: Team Mizogg
+"""
+import asyncio
+import codecs
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+
+READ_CHUNK = 64 * 1024
+LINE_BREAK = re.compile(r"\r\n|\r|\n")  # keyhunt redraws its status line with bare carriage returns
+
+
+def install_child_watcher(loop):
+    """Before 3.12 asyncio waits for each child on its own thread, pidfd watches them all from the loop"""
+    if platform.system() == "Windows" or sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return  # kernel without pidfd support, keep the default watcher
+    watcher = asyncio.PidfdChildWatcher()
+    asyncio.set_child_watcher(watcher)
+    watcher.attach_loop(loop)
+
+
+class AsyncSupervisor:
+    """One asyncio event loop, on one thread, that owns every keyhunt pipe.
+
+    Toolkits talk to it through submit(); results come back through the orchestrator's
+    callbacks, which the Qt and Tk adapters already marshal onto their own loops.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self.thread = threading.Thread(target=self.run, args=(ready,), name="keyhunt-supervisor", daemon=True)
+            self.thread.start()
+            ready.wait()
+
+    def run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        install_child_watcher(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def in_loop(self):
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def stop(self, timeout=5):
+        """Cancel whatever is still scheduled and end the loop thread"""
+        with self.lock:
+            loop, thread = self.loop, self.thread
+            self.loop = self.thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the supervisor loop from any thread, returns a concurrent Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+
+async def cancel_pending():
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def spawn(command):
+    """Each instance gets its own process group so it can be signalled without touching anything else"""
+    if platform.system() == "Windows":
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        return await asyncio.create_subprocess_exec(
+            *command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            startupinfo=startupinfo, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+    return await asyncio.create_subprocess_exec(
+        *command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, start_new_session=True)
+
+
+async def read_lines(stream):
+    """Yield decoded lines from a pipe without blocking the loop, splitting on \\r as well as \\n"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        data = await stream.read(READ_CHUNK)
+        text = pending + decoder.decode(data, final=not data)
+        # A trailing \r may be the first half of \r\n, wait for the next chunk to decide
+        hold = "\r" if data and text.endswith("\r") else ""
+        if hold:
+            text = text[:-1]
+        *lines, pending = LINE_BREAK.split(text)
+        pending += hold
+        for line in lines:
+            if line:
+                yield line
+        if not data:
+            if pending.strip("\r"):
+                yield pending.strip("\r")
+            return
@@ -0,0 +1,171 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import glob
+import hashlib
+import os
+import shutil
+import threading
+from libs.keyhunt_core import bsgs_baby_steps, input_path
+
+CONFIG_FILE = "config.ini"
+DEFAULT_DIRECTORY = "table_cache"
+DEFAULT_QUOTA_GB = 50
+STATS_FILE = "stats.ini"
+# Files keyhunt writes next to itself when run with -S: the BSGS bloom filters and bP table,
+# or the bloom filter and sorted targets of address and rmd160 mode in one data_<hash>.dat
+TABLE_PATTERNS = ("keyhunt_*.blm", "keyhunt_*.tbl", "data_*.dat")
+HASH_BLOCK = 1024 * 1024
+
+_file_hashes = {}  # (path, size, mtime) -> sha256, so Start doesn't rehash an unchanged file
+
+
+def saves_tables(config):
+    """keyhunt is started with -S for this config, so it writes or loads table files"""
+    if config.mode == "bsgs":
+        return config.save_table
+    return config.move_mode == "sequential"
+
+
+def file_hash(path):
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def cache_key(config):
+    """Content address of the tables keyhunt builds for this config.
+
+    BSGS baby steps are multiples of G, so only -n and -k matter there; bloom filters of
+    the other modes are built from the input file and depend on its content.
+    """
+    if config.mode == "bsgs":
+        parts = ["bsgs", str(bsgs_baby_steps(config.k_value, config.n_value))]
+    else:
+        parts = [config.mode, config.crypto, config.look, file_hash(input_path(config.input_file))]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+def table_files(directory="."):
+    return sorted({path for pattern in TABLE_PATTERNS for path in glob.glob(os.path.join(directory, pattern))})
+
+
+def place_file(source, target, symlink=True):
+    """Make `target` refer to `source` without copying where the filesystem allows it"""
+    try:
+        os.link(source, target)
+        return
+    except OSError:
+        pass
+    if symlink:
+        try:
+            os.symlink(os.path.abspath(source), target)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+
+
+class TableCache:
+    """Content addressed store of keyhunt table files with LRU eviction under a disk quota"""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, quota_bytes=DEFAULT_QUOTA_GB * 1024 ** 3):
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.stats = configparser.ConfigParser()
+        self.stats.read(os.path.join(directory, STATS_FILE))
+        if not self.stats.has_section("stats"):
+            self.stats["stats"] = {"hits": "0", "misses": "0"}
+
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE):
+        """Settings from the [table_cache] section of config.ini"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        directory = config.get("table_cache", "directory", fallback=DEFAULT_DIRECTORY)
+        quota_gb = config.getfloat("table_cache", "quota_gb", fallback=DEFAULT_QUOTA_GB)
+        return cls(directory, int(quota_gb * 1024 ** 3))
+
+    def entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def count(self, name):
+        self.stats["stats"][name] = str(self.stats.getint("stats", name) + 1)
+        with open(os.path.join(self.directory, STATS_FILE), "w") as f:
+            self.stats.write(f)
+
+    def hit_rate(self):
+        hits = self.stats.getint("stats", "hits")
+        total = hits + self.stats.getint("stats", "misses")
+        return hits / total if total else 0.0
+
+    def summary(self):
+        hits = self.stats.getint("stats", "hits")
+        total = hits + self.stats.getint("stats", "misses")
+        return f"hit rate {self.hit_rate() * 100:.0f}% ({hits}/{total})"
+
+    def restore(self, config, workdir="."):
+        """Put cached tables for `config` where keyhunt looks for them, returns True on a hit"""
+        key = cache_key(config)
+        entry = self.entry_dir(key)
+        with self.lock:
+            files = table_files(entry)
+            if not files:
+                self.count("misses")
+                return False
+            for path in files:
+                target = os.path.join(workdir, os.path.basename(path))
+                if not os.path.exists(target):
+                    place_file(path, target)
+            os.utime(entry)  # mark as recently used
+            self.count("hits")
+            return True
+
+    def store(self, config, since, workdir="."):
+        """Cache the table files keyhunt wrote in `workdir` after time `since`, then evict"""
+        key = cache_key(config)
+        entry = self.entry_dir(key)
+        with self.lock:
+            written = [path for path in table_files(workdir) if os.path.getmtime(path) >= since]
+            if not written:
+                return []
+            os.makedirs(entry, exist_ok=True)
+            for path in written:
+                target = os.path.join(entry, os.path.basename(path))
+                if os.path.exists(target):
+                    os.remove(target)
+                place_file(path, target, symlink=False)  # the cache must outlive the working copy
+            os.utime(entry)
+            self.evict(keep=key)
+            return written
+
+    def entries(self):
+        """(last used, size, key) of every cache entry, oldest first"""
+        result = []
+        for key in os.listdir(self.directory):
+            entry = self.entry_dir(key)
+            if os.path.isdir(entry):
+                size = sum(os.path.getsize(path) for path in table_files(entry))
+                result.append((os.path.getmtime(entry), size, key))
+        return sorted(result)
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits its quota"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.quota_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            total -= size
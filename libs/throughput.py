@@ -0,0 +1,134 @@
+"""
+@author: Team Mizogg
+"""
+import time
+from collections import deque
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+HISTORY_SIZE = 60
+AVERAGE_WINDOW = 10
+
+
+def sparkline(values, width=HISTORY_SIZE):
+    """Render the last `width` values as a unicode sparkline"""
+    values = list(values)[-width:]
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(SPARK_CHARS[int((value - low) / span * (len(SPARK_CHARS) - 1))] for value in values)
+
+
+def format_rate(keys_per_second):
+    """Human readable keys/s, e.g. 4.12 Mkeys/s"""
+    for factor, unit in ((1e15, "P"), (1e12, "T"), (1e9, "G"), (1e6, "M"), (1e3, "K")):
+        if keys_per_second >= factor:
+            return f"{keys_per_second / factor:.2f} {unit}keys/s"
+    return f"{keys_per_second:.0f} keys/s"
+
+
+def format_duration(seconds):
+    """Compact duration, e.g. 3d 4h or 12m 5s"""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    years, seconds = divmod(seconds, 365 * 86400)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if years:
+        return f"{years:,}y {days}d"
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+class InstanceStats:
+    """Speed history and progress for one keyhunt instance"""
+
+    def __init__(self, instance_number, range_start, range_end, clock=time.monotonic):
+        self.instance_number = instance_number
+        self.range_start = range_start
+        self.range_end = range_end
+        self.clock = clock
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.keys_per_second = 0
+        self.total_keys = 0
+        self.keys_searched = 0  # over every process and range this instance ran in the run
+        self.last_update = None
+
+    @property
+    def range_size(self):
+        return self.range_end - self.range_start + 1
+
+    def add_sample(self, sample):
+        self.keys_per_second = sample.keys_per_second
+        if sample.total_keys < self.total_keys:
+            self.total_keys = 0  # a restarted or relaunched keyhunt counts from zero again
+        self.keys_searched += sample.total_keys - self.total_keys
+        self.total_keys = sample.total_keys
+        self.history.append(sample.keys_per_second)
+        self.last_update = self.clock()
+
+    def rolling_average(self):
+        recent = list(self.history)[-AVERAGE_WINDOW:]
+        return sum(recent) / len(recent) if recent else 0
+
+    def progress(self):
+        return min(1.0, self.total_keys / self.range_size) if self.range_size > 0 else 0.0
+
+    def eta_seconds(self):
+        rate = self.rolling_average()
+        if not rate:
+            return None
+        return max(0, self.range_size - self.total_keys) / rate
+
+    def seconds_since_update(self):
+        if self.last_update is None:
+            return None
+        return self.clock() - self.last_update
+
+
+class ThroughputTracker:
+    """Aggregate keys/s across all running instances"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.instances = {}
+        self.total_history = deque(maxlen=HISTORY_SIZE)
+
+    def reset(self, ranges):
+        """Start tracking a new run, `ranges` is the list returned by split_range (None = not running)"""
+        self.instances = {
+            number: InstanceStats(number, instance_range[0], instance_range[1], self.clock)
+            for number, instance_range in enumerate(ranges, start=1) if instance_range
+        }
+        self.total_history.clear()
+
+    def set_range(self, instance_number, range_start, range_end):
+        """Instance moved on to a new range, keep its speed history"""
+        stats = self.instances.get(instance_number)
+        if stats is None:
+            self.instances[instance_number] = InstanceStats(instance_number, range_start, range_end, self.clock)
+            return
+        stats.range_start, stats.range_end = range_start, range_end
+        stats.total_keys = 0
+
+    def record(self, instance_number, sample):
+        stats = self.instances.get(instance_number)
+        if stats is not None:
+            stats.add_sample(sample)
+
+    def total_keys_per_second(self):
+        return sum(stats.keys_per_second for stats in list(self.instances.values()))
+
+    def total_rolling_average(self):
+        return sum(stats.rolling_average() for stats in list(self.instances.values()))
+
+    def tick(self):
+        """Snapshot the current total into the history, call once per refresh"""
+        self.total_history.append(self.total_keys_per_second())
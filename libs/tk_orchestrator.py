@@ -0,0 +1,40 @@
+"""
+@author: Team Mizogg
+"""
+import queue
+from libs.orchestrator import Orchestrator
+
+POLL_INTERVAL_MS = 100
+
+class TkOrchestrator:
+    """Tk adapter: events and exits are queued by the supervisor thread and dispatched from root.after.
+
+    Output lines go straight to `output_sink`, which must be thread safe
+    (the Tk ConsoleWindow.append_output only puts into a queue, flushed from on_tick).
+    """
+
+    def __init__(self, root, output_sink, on_event=None, on_finished=None, on_tick=None):
+        self.root = root
+        self.on_event = on_event
+        self.on_finished = on_finished
+        self.on_tick = on_tick  # called once per poll, e.g. to flush console queues
+        self.ui_queue = queue.Queue()
+        self.engine = Orchestrator(
+            on_output=output_sink,
+            on_event=lambda number, event: self.ui_queue.put((self.on_event, number, event)),
+            on_finished=lambda number, code: self.ui_queue.put((self.on_finished, number, code)),
+        )
+        self.root.after(POLL_INTERVAL_MS, self.dispatch)
+
+    def dispatch(self):
+        try:
+            while True:
+                handler, number, value = self.ui_queue.get_nowait()
+                if handler:
+                    handler(number, value)
+        except queue.Empty:
+            pass
+        finally:
+            if self.on_tick:
+                self.on_tick()
+            self.root.after(POLL_INTERVAL_MS, self.dispatch)
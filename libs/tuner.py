@@ -0,0 +1,205 @@
+"""
+@author: Team Mizogg
+"""
+import configparser
+import copy
+import multiprocessing
+import socket
+import statistics
+import threading
+import time
+from collections import namedtuple
+from libs import keyhunt_core
+from libs.keyhunt_parser import SpeedSample, SetupEvent
+from libs.memory_planner import largest_fitting_k, plan_memory, usable_memory
+from libs.orchestrator import Orchestrator
+
+CONFIG_FILE = "config.ini"
+# Far above any puzzle range, so a trial never searches keys a real run cares about
+TRIAL_RANGE = (1 << 200, (1 << 201) - 1)
+TRIAL_SECONDS = 20
+STATS_SECONDS = 2  # keyhunt -s during trials, its default of 30 would give one sample per trial
+SETUP_TIMEOUT = 300  # longest a trial may spend loading or building tables
+WARMUP_SAMPLES = 1  # first speed line of each instance covers the ramp up and is ignored
+POLL_INTERVAL = 0.2
+
+Trial = namedtuple("Trial", ["instances", "threads", "k_value"])
+TrialResult = namedtuple("TrialResult", ["trial", "keys_per_second", "setup_seconds", "error"])
+Timing = namedtuple("Timing", ["speeds", "setup", "error"])
+
+
+def default_grid(config, cpus=None, instance_choices=None, k_values=None, thread_choices=None):
+    """(instances, threads, -k) combinations worth timing on this machine.
+
+    Threads per instance are tried independently of the instance count: powers of two and the
+    even split, wherever the instances use between half and all of the CPUs. Half covers one
+    thread per physical core with SMT. BSGS also tries the current -k, the largest -k that
+    fits in RAM and one in between, skipping what would swap.
+    """
+    cpus = cpus or multiprocessing.cpu_count()
+    instance_choices = instance_choices or [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cpus]
+    grid = []
+    for instances in instance_choices:
+        if instances > cpus:
+            continue
+        for threads in thread_choices or threads_to_try(instances, cpus):
+            if instances * threads > cpus:
+                continue
+            if config.mode != "bsgs":
+                grid.append(Trial(instances, threads, config.k_value))
+                continue
+            candidates = k_values or bsgs_k_candidates(config, instances)
+            usable = usable_memory()
+            for k_value in candidates:
+                if usable is None or plan_memory("bsgs", k_value, config.n_value, instances) <= usable:
+                    grid.append(Trial(instances, threads, int(k_value)))
+    return grid
+
+
+def threads_to_try(instances, cpus):
+    """-t values for an instance count that keep between half and all of the CPUs busy"""
+    even = cpus // instances
+    choices = {even} | {1 << bit for bit in range(even.bit_length()) if instances << bit >= cpus // 2}
+    return sorted(choices)
+
+
+def bsgs_k_candidates(config, instances):
+    largest = largest_fitting_k(config.n_value, instances)
+    if largest is None:
+        return [config.k_value]
+    fitting = [int(k) for k in keyhunt_core.K_VALUES if min(config.k_value, largest) <= int(k) <= largest]
+    return sorted({fitting[0], fitting[len(fitting) // 2], fitting[-1]})
+
+
+def time_run(config, instances, seconds=TRIAL_SECONDS, key_range=TRIAL_RANGE, setup_timeout=SETUP_TIMEOUT,
+             stop_event=None):
+    """Run config split over `instances` on key_range for `seconds` after every instance's first speed line.
+
+    Returns a Timing with the SpeedSample and SetupEvent lists of each instance number.
+    """
+    speeds = {number: [] for number in range(1, instances + 1)}
+    setup = {number: [] for number in range(1, instances + 1)}
+    lock = threading.Lock()
+
+    def on_event(instance_number, event):
+        with lock:
+            if isinstance(event, SpeedSample):
+                speeds[instance_number].append(event)
+            elif isinstance(event, SetupEvent):
+                setup[instance_number].append(event)
+
+    engine = Orchestrator(on_event=on_event, ledger_file=None)
+    engine.auto_restart = False
+    engine.table_cache_enabled = False  # setup times must include building the tables
+    try:
+        engine.start_all(config, keyhunt_core.split_range(*key_range, instances), resume=False)
+    except ValueError as e:
+        return Timing(speeds, setup, str(e))
+    started = time.monotonic()
+    cancelled = stop_event.is_set if stop_event else lambda: False
+    error = None
+    try:
+        # Setup: until every instance prints its first speed line
+        while True:
+            with lock:
+                ready = all(len(series) >= WARMUP_SAMPLES for series in speeds.values())
+            if ready or not engine.running() or cancelled():
+                break
+            if time.monotonic() - started > setup_timeout:
+                error = f"no speed line within {setup_timeout}s"
+                break
+            time.sleep(POLL_INTERVAL)
+        if not ready and error is None:
+            error = "cancelled" if engine.running() else "keyhunt exited during setup"
+        deadline = time.monotonic() + seconds
+        while not error and time.monotonic() < deadline and engine.running() and not cancelled():
+            time.sleep(POLL_INTERVAL)
+    finally:
+        engine.close(interrupt_grace=1)
+    return Timing(speeds, setup, error)
+
+
+def measured_samples(series):
+    """Speed samples after the warmup, the last one when the run was too short to have more"""
+    return series[WARMUP_SAMPLES:] or series[-1:]
+
+
+def run_trial(config, trial, seconds=TRIAL_SECONDS, setup_timeout=SETUP_TIMEOUT, stop_event=None):
+    """Run one combination on TRIAL_RANGE and measure the summed median keys/s of its instances"""
+    trial_config = copy.copy(config)
+    trial_config.thread_count = trial.threads
+    trial_config.k_value = trial.k_value
+    trial_config.stats_seconds = STATS_SECONDS
+    timing = time_run(trial_config, trial.instances, seconds, setup_timeout=setup_timeout, stop_event=stop_event)
+    if timing.error:
+        return TrialResult(trial, 0, None, timing.error)
+    setup_seconds = max(series[0].elapsed for series in timing.speeds.values())
+    total = sum(statistics.median(sample.keys_per_second for sample in measured_samples(series))
+                for series in timing.speeds.values())
+    return TrialResult(trial, int(total), round(setup_seconds, 1), None)
+
+
+def tune(config, grid=None, seconds=TRIAL_SECONDS, progress=None, stop_event=None):
+    """Time every combination in the grid, returns results fastest first"""
+    grid = grid or default_grid(config)
+    results = []
+    for index, trial in enumerate(grid, start=1):
+        if stop_event and stop_event.is_set():
+            break
+        if progress:
+            progress(f"Trial {index}/{len(grid)}: {describe_trial(trial, config.mode)}")
+        result = run_trial(config, trial, seconds, stop_event=stop_event)
+        if progress:
+            progress(f"  {describe_result(result, config.mode)}")
+        results.append(result)
+    return sorted(results, key=lambda result: -result.keys_per_second)
+
+
+def describe_trial(trial, mode):
+    text = f"{trial.instances} instance(s) x {trial.threads} thread(s)"
+    return text + f", -k {trial.k_value}" if mode == "bsgs" else text
+
+
+def describe_result(result, mode):
+    if result.error:
+        return f"{describe_trial(result.trial, mode)}: failed, {result.error}"
+    return (f"{describe_trial(result.trial, mode)}: {result.keys_per_second:,} keys/s "
+            f"after {result.setup_seconds}s setup")
+
+
+def host_name():
+    return socket.gethostname() or "localhost"
+
+
+def section_name(mode, host=None):
+    return f"tuned:{host or host_name()}:{mode}"
+
+
+def save_best(result, mode, host=None, path=CONFIG_FILE):
+    """Store the winning combination for this mode and host in config.ini"""
+    config = configparser.ConfigParser()
+    config.read(path)
+    config[section_name(mode, host)] = {
+        "instances": str(result.trial.instances),
+        "threads": str(result.trial.threads),
+        "k_value": str(result.trial.k_value),
+        "keys_per_second": str(result.keys_per_second),
+        "tuned": time.strftime("%Y-%m-%d %H:%M"),
+    }
+    with open(path, "w") as f:
+        config.write(f)
+
+
+def load_tuned(mode, host=None, path=CONFIG_FILE):
+    """Best measured Trial for this mode on this host and its keys/s, None if never tuned"""
+    config = configparser.ConfigParser()
+    config.read(path)
+    section = section_name(mode, host)
+    if not config.has_section(section):
+        return None
+    try:
+        trial = Trial(config.getint(section, "instances"), config.getint(section, "threads"),
+                      config.getint(section, "k_value"))
+    except (configparser.Error, ValueError):
+        return None
+    return trial, config.getint(section, "keys_per_second", fallback=0)
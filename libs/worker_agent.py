@@ -0,0 +1,161 @@
+"""
+@author: Team Mizogg
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from libs import keyhunt_core
+from libs.coordinator import PROGRESS_SECONDS, file_digest
+from libs.keyhunt_parser import KeyFoundEvent
+from libs.orchestrator import Orchestrator
+
+STOP_POLL_SECONDS = 0.5
+
+
+class RemoteChunks:
+    """Chunk source for the Orchestrator that leases chunks from the coordinator, see ChunkQueue.
+
+    take() blocks for one request to the coordinator, the orchestrator calls it on an executor thread.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def take(self):
+        return self.agent.take_lease()
+
+    def remaining_chunks(self):
+        return self.agent.remaining_chunks
+
+
+class WorkerAgent:
+    """Runs keyhunt instances on chunks leased from a coordinator and reports back on them.
+
+    Progress of every running instance is sent every `progress_seconds` from the agent's thread,
+    which renews its lease. Finished chunks and found keys are reported as they happen.
+    """
+
+    def __init__(self, client, instances=1, threads=None, name=None, pin_cpus=False, on_output=None, log=print):
+        self.client = client
+        self.instances = instances
+        self.threads = threads or max(1, multiprocessing.cpu_count() // instances)
+        self.name = name or socket.gethostname()
+        self.pin_cpus = pin_cpus
+        self.on_output = on_output
+        self.log = log
+        self.worker_id = None
+        self.progress_seconds = PROGRESS_SECONDS  # the coordinator's setting once registered
+        self.engine = None
+        self.leases = {}  # end of the leased chunk -> lease, an instance keeps its end across restarts
+        self.lock = threading.Lock()
+        self.remaining_chunks = 0
+        self.stop_event = threading.Event()
+
+    def register(self):
+        """Join the coordinator and build the KeyhuntConfig of its job, raises ValueError on a mismatch"""
+        job = self.client.call("/register", {"name": self.name, "instances": self.instances, "threads": self.threads})
+        self.worker_id = job["worker_id"]
+        self.progress_seconds = job["progress_seconds"]
+        config = keyhunt_core.KeyhuntConfig(thread_count=self.threads, **job["config"])
+        path = keyhunt_core.input_path(config.input_file)
+        if not os.path.isfile(path):
+            raise ValueError(f"Input file {path} of the coordinator's job is missing on this machine")
+        if file_digest(path) != job["input_sha256"]:
+            raise ValueError(f"{path} differs from the coordinator's copy, copy it over before joining")
+        return config
+
+    def take_lease(self):
+        """Next leased (start, end) or None. Called from the supervisor thread when an instance finishes."""
+        if self.stop_event.is_set():
+            return None
+        try:
+            reply = self.client.call("/lease", {"worker_id": self.worker_id})
+        except (OSError, ValueError) as e:
+            self.log(f"No lease from the coordinator: {e}")
+            return None
+        self.remaining_chunks = reply.get("remaining_chunks", 0)
+        lease = reply["lease"]
+        if lease is None:
+            return None
+        start, end = int(lease["start"], 16), int(lease["end"], 16)
+        with self.lock:
+            self.leases[end] = {"id": lease["id"], "start": start, "end": end}
+        return start, end
+
+    def report(self, instance, done=False, release=False):
+        """Send how far the instance got in its lease, `done` completes it and `release` hands the rest back"""
+        with self.lock:
+            lease = self.leases.get(instance.range_end)
+            if lease is not None and (done or release):
+                del self.leases[instance.range_end]
+        if lease is None:
+            return
+        stats = self.engine.tracker.instances.get(instance.instance_number)
+        self.send(lease, instance.confirmed_position() - 1, stats.keys_per_second if stats and instance.running() else 0,
+                  done, release)
+
+    def send(self, lease, searched_to, keys_per_second=0, done=False, release=False):
+        try:
+            reply = self.client.call("/progress", {
+                "worker_id": self.worker_id, "lease_id": lease["id"], "searched_to": f"{searched_to:x}",
+                "keys_per_second": keys_per_second, "done": done, "release": release,
+            })
+        except (OSError, ValueError) as e:
+            self.log(f"Progress of lease {lease['id']} not delivered: {e}")
+            return
+        if not reply.get("known"):
+            self.log(f"Lease {lease['id']} expired on the coordinator, its chunk may be searched twice")
+
+    def finished(self, instance_number, exit_code):
+        instance = self.engine.instances.get(instance_number)
+        if instance is not None and instance.finished_range():
+            self.report(instance, done=True)
+
+    def event(self, instance_number, event):
+        if isinstance(event, KeyFoundEvent):
+            self.log(f"Instance {instance_number} found a key: {event.private_key}")
+            try:
+                self.client.call("/found", {"worker_id": self.worker_id, "private_key": event.private_key,
+                                            "line": event.line})
+            except (OSError, ValueError) as e:
+                self.log(f"Found key not delivered to the coordinator, it is in keyhunt's own output: {e}")
+
+    def run(self):
+        """Work until the coordinator runs out of chunks or stop() is called, returns the exit status"""
+        config = self.register()
+        self.log(f"Joined as {self.worker_id}: {config.mode} on {config.input_file}, "
+                 f"{self.instances} instance(s) x {self.threads} thread(s)")
+        self.engine = Orchestrator(on_output=self.on_output, on_event=self.event, on_finished=self.finished,
+                                   pin_cpus=self.pin_cpus, ledger_file=None)
+        try:
+            ranges = [lease for lease in (self.take_lease() for _ in range(self.instances)) if lease]
+            if not ranges:
+                self.log("Nothing left to search")
+                return 0
+            self.engine.start_all(config, ranges, resume=False, chunk_source=RemoteChunks(self))
+            next_report = time.monotonic() + self.progress_seconds
+            while self.engine.running() and not self.stop_event.wait(STOP_POLL_SECONDS):
+                if time.monotonic() < next_report:
+                    continue
+                next_report = time.monotonic() + self.progress_seconds
+                for instance in list(self.engine.instances.values()):
+                    if instance.running():
+                        self.report(instance)
+            if not self.stop_event.is_set():
+                self.log("The coordinator has no chunks left")
+        finally:
+            self.engine.close()
+            # Anything stopped part way is handed back now instead of when its lease expires
+            for instance in list(self.engine.instances.values()):
+                self.report(instance, release=True)
+            with self.lock:
+                unstarted = list(self.leases.values())
+                self.leases.clear()
+            for lease in unstarted:
+                self.send(lease, lease["start"] - 1, release=True)
+        return 0
+
+    def stop(self):
+        self.stop_event.set()
@@ -6,13 +6,25 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtGui import *
 import os
 import glob
-import subprocess
 import webbrowser
-import signal
 import platform
 import multiprocessing
+import threading
 from libs.console_gui import ConsoleWindow
-from libs.command_thread import CommandThread
+from libs import console_layout
+from libs.qt_orchestrator import QtOrchestrator
+from libs import keyhunt_core
+from libs.chunk_scheduler import SCHEDULER_CHOICES, chunk_bits_from_choice
+from libs.cpu_topology import CpuTopology
+from libs import memory_planner
+from libs import input_compiler
+from libs import preflight
+from libs import tuner
+from libs.restart_policy import describe_exit
+from libs.resource_sampler import describe_sample
+from libs.dashboard_gui import ThroughputDashboard
+from libs.coordinator import CoordinatorClient
+from libs.coordinator_view import CoordinatorView
 from libs.about_dialog import AboutDialog
 from libs.progress_dialog import ProgressDialog
 from libs.Range_gui import RangeDialog
@@ -30,13 +42,28 @@ def open_website(self):
     webbrowser.open("https://mizogg.co.uk")
 
 class GUI(QMainWindow):
+    inputCompiled = pyqtSignal(object)
+    tuningFinished = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.current_instances = 1
         self.keyhunt_frames = []
+        self.summaryList = None  # one line per instance when there are too many for a console each
+        self.sharedConsole = None
+        self.selected_log = None
         self.shared_config = None  # Will hold shared configuration
         self.cpu_count = multiprocessing.cpu_count()  # Initialize cpu_count
-        self.command_threads = {}  # Dictionary to store command threads for each instance
+        self.orchestrator = QtOrchestrator(self.route_output, self)  # Owns every keyhunt process
+        self.orchestrator.commandFinished.connect(self.command_finished)
+        try:
+            metrics = self.orchestrator.engine.serve_metrics()  # only when enabled in config.ini
+            if metrics:
+                print(f"Metrics served on {metrics.url}")
+        except OSError as e:
+            print(f"Metrics endpoint not started: {e}")
+        self.inputCompiled.connect(self.input_compiled)
+        self.tuningFinished.connect(self.tuning_finished)
         self.initUI()
 
     def initUI(self):
@@ -47,6 +74,14 @@ class GUI(QMainWindow):
         self.shared_config = self.create_shared_config()
         main_layout.addWidget(self.shared_config)
 
+        # Add live throughput dashboard for all instances
+        self.dashboard = ThroughputDashboard(self.orchestrator.engine.tracker, self, watchdog=self.orchestrator.engine.watchdog)
+        main_layout.addWidget(self.dashboard)
+        self.resourceTimer = QTimer(self)
+        self.resourceTimer.setInterval(1000)
+        self.resourceTimer.timeout.connect(self.update_resource_labels)
+        self.resourceTimer.start()
+
         # Add grid for console windows
         self.grid_widget = QWidget(self)
         self.grid_layout = QGridLayout(self.grid_widget)
@@ -59,6 +94,7 @@ class GUI(QMainWindow):
         menubar = self.menuBar()
         file_menu = menubar.addMenu("File")
         file_menu.addAction("Settings", self.open_settings)
+        file_menu.addAction("Attach to Coordinator...", self.attach_coordinator)
         file_menu.addSeparator()
         file_menu.addAction("Quit", self.exit_app)
 
@@ -68,6 +104,10 @@ class GUI(QMainWindow):
         instances_menu.addAction("4", lambda: self.update_grid_layout(4))
         instances_menu.addAction("6", lambda: self.update_grid_layout(6))
         instances_menu.addAction("8", lambda: self.update_grid_layout(8))
+        instances_menu.addAction("16", lambda: self.update_grid_layout(16))
+        instances_menu.addAction("32", lambda: self.update_grid_layout(32))
+        instances_menu.addSeparator()
+        instances_menu.addAction("Custom...", self.choose_instance_count)
         file_menu.addSeparator()
 
         help_menu = menubar.addMenu("Help")
@@ -81,6 +121,42 @@ class GUI(QMainWindow):
         self.setWindowTitle("KeyHunter Puzzles GUI")
         self.setWindowIcon(QIcon(f"{ICO_ICON}"))
         self.update_grid_layout(1)
+        self.apply_tuned()
+
+    def attach_coordinator(self):
+        """Watch a distributed run, see keyhunt_runner.py coordinator"""
+        client = CoordinatorClient.from_config()
+        url, ok = QInputDialog.getText(self, "Attach to Coordinator", "Coordinator URL:", text=client.url)
+        if not ok or not url.strip():
+            return
+        client.url = url.strip().rstrip("/")
+        view = CoordinatorView(client, self)
+        view.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        view.show()
+
+    def choose_instance_count(self):
+        count, ok = QInputDialog.getInt(self, "Instances", "Number of keyhunt instances:", self.current_instances,
+                                        1, console_layout.MAX_INSTANCES)
+        if ok:
+            self.update_grid_layout(count)
+
+    def select_instance_console(self, row):
+        """Show the selected instance's scrollback and new output in the shared console"""
+        if self.selected_log is not None:
+            self.selected_log.attach(None)
+        self.selected_log = self.keyhunt_frames[row] if 0 <= row < len(self.keyhunt_frames) else None
+        if self.selected_log is not None:
+            self.selected_log.attach(self.sharedConsole)
+
+    def update_summary(self):
+        if self.summaryList is None:
+            return
+        engine = self.orchestrator.engine
+        for row in range(self.summaryList.count()):
+            text = console_layout.summary_line(engine, row + 1, self.summaryList.count())
+            item = self.summaryList.item(row)
+            if item.text() != text:
+                item.setText(text)
 
     def create_shared_config(self):
         group_box = QGroupBox("Shared Configuration")
@@ -112,6 +188,8 @@ class GUI(QMainWindow):
     def update_grid_layout(self, num_instances):
         self.current_instances = num_instances
         self.keyhunt_frames.clear()
+        self.summaryList = self.sharedConsole = self.selected_log = None
+        self.grid_layout.setColumnStretch(1, 0)
         
         # Clear existing widgets
         for i in reversed(range(self.grid_layout.count())):
@@ -120,18 +198,6 @@ class GUI(QMainWindow):
                 self.grid_layout.removeWidget(widget)
                 widget.setParent(None)
 
-        # Set up grid dimensions
-        if num_instances == 1:
-            rows, cols = 1, 1
-        elif num_instances == 2:
-            rows, cols = 1, 2
-        elif num_instances == 4:
-            rows, cols = 2, 2
-        elif num_instances == 6:
-            rows, cols = 2, 3
-        elif num_instances == 8:
-            rows, cols = 2, 4
-
         # Calculate max CPUs per instance
         max_cpus_per_instance = self.cpu_count // num_instances
         if max_cpus_per_instance < 1:
@@ -143,201 +209,128 @@ class GUI(QMainWindow):
             self.threadComboBox_key.addItem(str(i))
         self.threadComboBox_key.setCurrentIndex(0)  # Set to first available option
 
-        # Create new console windows
-        instance_number = 1
-        for row in range(rows):
-            for col in range(cols):
+        if console_layout.uses_grid(num_instances):
+            # Create new console windows
+            rows, cols = console_layout.grid_shape(num_instances)
+            for index in range(num_instances):
                 console = ConsoleWindow(self)
-                console.setWindowTitle(f"Instance {instance_number}/{num_instances}")
-                self.grid_layout.addWidget(console, row, col)
+                console.setWindowTitle(f"Instance {index + 1}/{num_instances}")
+                self.grid_layout.addWidget(console, index // cols, index % cols)
                 self.keyhunt_frames.append(console)
-                instance_number += 1
+        else:
+            # Dozens of consoles would be slow to draw, show a line per instance and the selected one's console
+            self.keyhunt_frames.extend(console_layout.InstanceLog(number) for number in range(1, num_instances + 1))
+            self.summaryList = QListWidget(self)
+            self.summaryList.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+            self.summaryList.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> State, speed, progress, CPU and memory of every instance, select one to show its console </span>')
+            self.summaryList.addItems(["" for _ in range(num_instances)])
+            self.summaryList.currentRowChanged.connect(self.select_instance_console)
+            self.sharedConsole = ConsoleWindow(self)
+            self.grid_layout.addWidget(self.summaryList, 0, 0)
+            self.grid_layout.addWidget(self.sharedConsole, 0, 1)
+            self.grid_layout.setColumnStretch(1, 1)
+            self.update_summary()
+            self.summaryList.setCurrentRow(0)
 
         self.grid_widget.setLayout(self.grid_layout)
+        self.update_memory_estimate()
         self.adjust_size()
 
     def start_all_instances(self):
+        # Get the range from shared input
+        range_text = self.keyspaceLineEdit.text().strip()
+        if not range_text:
+            QMessageBox.warning(self, "Error", "Please enter a range")
+            return
         try:
-            # Get the range from shared input
-            range_text = self.keyspaceLineEdit.text().strip()
-            if not range_text:
-                QMessageBox.warning(self, "Error", "Please enter a range")
-                return
-
-            start_range, end_range = range_text.split(':')
-            # Convert hex strings to integers, handling both with and without 0x prefix
-            start_range = int(start_range, 16) if start_range.startswith('0x') else int(start_range, 16)
-            end_range = int(end_range, 16) if end_range.startswith('0x') else int(end_range, 16)
-
-            # Split range among instances
-            ranges = self.split_range(start_range, end_range, len(self.keyhunt_frames))
-
-            # Start each instance with its portion of the range
-            for i, console in enumerate(self.keyhunt_frames):
-                instance_start, instance_end = ranges[i]
-                self.start_instance(console, instance_start, instance_end, i + 1)
-
+            start_range, end_range = keyhunt_core.parse_range(range_text)
         except ValueError as e:
             QMessageBox.warning(self, "Error", f"Invalid range format: {str(e)}\nPlease use hex format (e.g., 400000000000000000:7FFFFFFFFFFFFFFFFF)")
+            return
+        try:
+            config = self.current_config()
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
 
-    def start_instance(self, console, start_range, end_range, instance_number):
-        """Start a single instance with the given range"""
-        console.append_output(f"Instance {instance_number}/{len(self.keyhunt_frames)}")
-        console.append_output(f"Range: {format(start_range, 'x')} to {format(end_range, 'x')}")
-        
-        command = self.construct_command_key(start_range, end_range)
-        self.execute_command(console, command, instance_number)
-
-    def construct_command_key(self, start_range, end_range):
-        """Construct keyhunt command with current configuration"""
-        mode = self.modeComboBox.currentText().strip()
-        thread_count = int(self.threadComboBox_key.currentText())
-        base_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "keyhunt")
-
-        if platform.system() == "Windows":
-            command = [os.path.join(base_path, "keyhunt.exe"), "-m", mode, "-t", str(thread_count)]
-        else:
-            command = [os.path.join(base_path, "keyhunt"), "-m", mode, "-t", str(thread_count)]
-
-        # Add range
-        command.extend(["-r", f"{format(start_range, 'x')}:{format(end_range, 'x')}"])
-
-        # Add other parameters from shared configuration
-        file = self.inputFileLineEdit.text().strip()
-        if file:
-            input_file_relative_path = ["input", file]
-            input_file_path = os.path.join(*input_file_relative_path)
-            command.extend(["-f", input_file_path])
-
-        move_mode = self.move_modeEdit.currentText().strip()
-        if move_mode == 'random':
-            if mode == 'bsgs':
-                command.extend(["-B", move_mode])
-            else:
-                command.append("-R")
-        elif move_mode == 'sequential':
-            if mode == 'bsgs':
-                command.extend(["-B", move_mode])
+        chunk_bits = chunk_bits_from_choice(self.schedulerComboBox.currentText())
+        # Split range among instances, refused when there are more instances than keys
+        try:
+            ranges = self.split_range(start_range, end_range, len(self.keyhunt_frames))
+        except ValueError as e:
+            QMessageBox.warning(self, "Cannot Start", str(e))
+            return
+
+        for i, console in enumerate(self.keyhunt_frames):
+            instance_start, instance_end = ranges[i]
+            console.append_output(f"Instance {i + 1}/{len(self.keyhunt_frames)}")
+            if chunk_bits:
+                console.append_output(f"Range: {format(start_range, 'x')} to {format(end_range, 'x')} in chunks of 2^{chunk_bits} keys")
             else:
-                command.append("-S")
-        elif move_mode == 'backward' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-        elif move_mode == 'dance' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-        elif move_mode == 'both' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-
-        if not (mode == 'bsgs' and move_mode == 'both'):
-            stride = self.strideLineEdit.text().strip()
-            if stride:
-                command.extend(["-I", stride])
-
-        crypto = self.cryptoComboBox.currentText().strip()
-        if crypto == "eth":
-            command.extend(["-c", crypto])
-            
-        look = self.lookComboBox.currentText().strip()
-        if look and crypto != "eth":  # Only add look type if not ETH
-            command.extend(["-l", look])
-
-        if mode == 'bsgs':
-            n_value = self.nValueLineEdit.text().strip()
-            if n_value:
-                command.extend(["-n", n_value])
-            kamount = int(self.kComboBox.currentText().strip())
-            command.extend(["-k", str(kamount)])
-
-        if self.flagQCheckBox.isChecked():
-            command.append("-q")
-
-        return command
-
-    def execute_command(self, console, command, instance_number):
-        """Execute command and show output in the given console window"""
-        # Stop existing thread for this instance if it exists
-        if instance_number in self.command_threads:
-            self.command_threads[instance_number].terminate()
-            self.command_threads[instance_number].wait()
-
-        # Convert command list to string for display
-        command_str = ' '.join(str(x) for x in command)
-        console.append_output(f"Executing command: {command_str}")
-
-        # Create and start new thread for this instance
-        thread = CommandThread(command)
-        thread.commandOutput.connect(console.append_output)
-        thread.commandFinished.connect(lambda: self.command_finished(console, instance_number))
-        thread.start()
-        
-        # Store the thread
-        self.command_threads[instance_number] = thread
+                console.append_output(f"Range: {format(instance_start, 'x')} to {format(instance_end, 'x')}")
 
-    def command_finished(self, console, instance_number):
+        self.orchestrator.engine.pin_cpus = self.pinCheckBox.isChecked()
+        self.orchestrator.engine.auto_restart = self.restartCheckBox.isChecked()
+        try:
+            # Refuses input files that don't suit the mode and BSGS tables that would not fit in RAM
+            self.orchestrator.engine.start_all(config, ranges, chunk_bits=chunk_bits, wait=False)
+        except ValueError as e:
+            QMessageBox.warning(self, "Cannot Start", str(e))
+            return
+        self.dashboard.reset()
+
+    def current_config(self):
+        """Collect the shared configuration widgets into a KeyhuntConfig"""
+        return keyhunt_core.KeyhuntConfig(
+            mode=self.modeComboBox.currentText(),
+            thread_count=self.threadComboBox_key.currentText(),
+            crypto=self.cryptoComboBox.currentText(),
+            move_mode=self.move_modeEdit.currentText(),
+            stride=self.strideLineEdit.text(),
+            look=self.lookComboBox.currentText(),
+            input_file=self.inputFileLineEdit.text(),
+            k_value=self.kComboBox.currentText(),
+            n_value=self.nValueLineEdit.text(),
+            quiet=self.flagQCheckBox.isChecked(),
+            save_table=self.shareTableCheckBox.isChecked(),
+        )
+
+    def route_output(self, instance_number, line):
+        """Called from the supervisor thread, ConsoleWindow.append_output is thread safe"""
+        if 0 < instance_number <= len(self.keyhunt_frames):
+            self.keyhunt_frames[instance_number - 1].append_output(line)
+
+    def update_resource_labels(self):
+        """Latest /proc sample of each instance above its console"""
+        sampler = self.orchestrator.engine.sampler
+        for number, console in enumerate(self.keyhunt_frames, start=1):
+            console.set_resources(describe_sample(sampler.latest(number)))
+        self.update_summary()
+
+    def command_finished(self, instance_number, exit_code):
         """Handle command completion for a specific instance"""
-        if instance_number in self.command_threads:
-            thread = self.command_threads[instance_number]
-            if thread and thread.isRunning():
-                thread.terminate()
-            console.append_output("Process stopped by user")
-            del self.command_threads[instance_number]
-
-    def stop_all_instances(self):
-        """Stop all running instances"""
+        if not 0 < instance_number <= len(self.keyhunt_frames):
+            return
+        console = self.keyhunt_frames[instance_number - 1]
+        instance = self.orchestrator.engine.instances.get(instance_number)
+        if instance:
+            console.append_output(describe_exit(exit_code, instance.stop_requested, instance.last_error))
+        else:
+            console.append_output(f"Process finished with exit code {exit_code}")
+
+    def stop_all_instances(self, wait=False):
+        """Stop all running instances, each console reports its exit once the escalation is done"""
         try:
-            for instance_number, thread in list(self.command_threads.items()):
-                if thread and thread.isRunning():
-                    # Terminate the thread
-                    thread.terminate()
-                    thread.wait()
-                    
-                    # Kill any remaining keyhunt processes
-                    if platform.system() == "Windows":
-                        try:
-                            subprocess.run(["taskkill", "/f", "/im", "keyhunt.exe"], 
-                                         stdout=subprocess.DEVNULL, 
-                                         stderr=subprocess.DEVNULL,
-                                         timeout=2)
-                        except subprocess.TimeoutExpired:
-                            pass
-                        except Exception:
-                            pass
-                    else:
-                        try:
-                            subprocess.run(["pkill", "-f", "keyhunt"], 
-                                         stdout=subprocess.DEVNULL, 
-                                         stderr=subprocess.DEVNULL,
-                                         timeout=2)
-                        except subprocess.TimeoutExpired:
-                            pass
-                        except Exception:
-                            pass
-                    
-                if instance_number <= len(self.keyhunt_frames):
-                    self.keyhunt_frames[instance_number - 1].append_output("Process stopped by user")
-            
-            # Clear the thread dictionary
-            self.command_threads.clear()
+            # Only the processes this window started are signalled, on the supervisor thread
+            stopping = self.orchestrator.engine.stop_all()
+            if wait:
+                stopping.result()
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
 
     def split_range(self, start, end, num_splits):
         """Split a range into equal parts"""
-        total_range = end - start
-        chunk_size = total_range // num_splits
-        remainder = total_range % num_splits
-        
-        ranges = []
-        current_start = start
-        
-        for i in range(num_splits):
-            extra = 1 if i < remainder else 0
-            current_end = current_start + chunk_size + extra - 1
-            if i == num_splits - 1:
-                current_end = end
-            ranges.append((current_start, current_end))
-            current_start = current_end + 1
-        
-        return ranges
+        return keyhunt_core.split_range(start, end, num_splits)
 
     def open_settings(self):
         from libs.theme_manager import SettingsDialog
@@ -434,6 +427,13 @@ class GUI(QMainWindow):
         self.threadComboBox_key.setToolTip(f'<span style="font-size: 10pt; font-weight: bold;"> Maximum CPUs per instance: {max_cpus_per_instance} (Total CPUs: {self.cpu_count})</span>')
         self.row1Layout.setStretchFactor(self.threadComboBox_key, 1)
         self.row1Layout.addWidget(self.threadComboBox_key)
+        self.pinCheckBox = QCheckBox("Pin CPUs", self)
+        self.pinCheckBox.setToolTip(f'<span style="font-size: 10pt; font-weight: bold;"> Pin each instance to its own cores and NUMA node, memory stays local to the node. {CpuTopology.detect().summary()} </span>')
+        self.row1Layout.addWidget(self.pinCheckBox)
+        self.restartCheckBox = QCheckBox("Auto Restart", self)
+        self.restartCheckBox.setChecked(True)
+        self.restartCheckBox.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Restart crashed instances on the rest of their range, with exponential backoff and a restart budget ([restart] in config.ini) </span>')
+        self.row1Layout.addWidget(self.restartCheckBox)
 
         self.cryptoLabel = QLabel("Crypto:", self)
         self.row1Layout.addWidget(self.cryptoLabel)
@@ -480,10 +480,102 @@ class GUI(QMainWindow):
         self.nValueLineEdit.setPlaceholderText('0x1000000000000000')
         self.row1Layout.addWidget(self.nValueLineEdit)
         self.row1Layout.setStretchFactor(self.nValueLineEdit, 2)
-        
+
+        self.memoryLayout = QHBoxLayout()
+        self.memoryLabel = QLabel("", self)
+        self.memoryLabel.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Estimated RAM for the BSGS bloom filters and tables of all instances </span>')
+        self.memoryLayout.addWidget(self.memoryLabel)
+        self.fitKButton = QPushButton("Fit K to RAM", self)
+        self.fitKButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Select the largest K factor that fits in memory for every instance </span>')
+        self.fitKButton.clicked.connect(self.fit_k_to_memory)
+        self.memoryLayout.addWidget(self.fitKButton)
+        self.tuneButton = QPushButton("Tune", self)
+        self.tuneButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Time instance, thread and K combinations on a throwaway range and keep the fastest for this mode </span>')
+        self.tuneButton.clicked.connect(self.tune_settings)
+        self.memoryLayout.addWidget(self.tuneButton)
+        self.shareTableCheckBox = QCheckBox("Share BSGS table", self)
+        self.shareTableCheckBox.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Build the bloom filter and bP table once with -S, every other instance loads the saved files instead of building its own </span>')
+        self.memoryLayout.addWidget(self.shareTableCheckBox)
+        self.memoryLayout.addStretch()
+        self.keyhuntLayout.addLayout(self.memoryLayout)
+        self.kComboBox.currentIndexChanged.connect(self.update_memory_estimate)
+        self.nValueLineEdit.textChanged.connect(self.update_memory_estimate)
+        self.modeComboBox.currentIndexChanged.connect(self.update_memory_estimate)
+        self.modeComboBox.currentIndexChanged.connect(self.apply_tuned)
+
         threadGroupBox.setLayout(self.keyhuntLayout)
         return threadGroupBox
 
+    def update_memory_estimate(self):
+        """Show the RAM all instances need with the current BSGS settings"""
+        if self.modeComboBox.currentText() != "bsgs":
+            self.memoryLabel.setText("")
+            return
+        try:
+            text, fits = memory_planner.describe_plan("bsgs", self.kComboBox.currentText(),
+                                                      self.nValueLineEdit.text(), self.current_instances)
+        except ValueError:
+            text, fits = "Invalid N value", False
+        self.memoryLabel.setText(text)
+        self.memoryLabel.setStyleSheet("" if fits else "color: red;")
+
+    def fit_k_to_memory(self):
+        try:
+            k_value = memory_planner.largest_fitting_k(self.nValueLineEdit.text(), self.current_instances)
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Invalid N value")
+            return
+        if k_value is None:
+            QMessageBox.warning(self, "Not Enough Memory", "No K factor fits in RAM, use fewer instances or a smaller N value")
+            return
+        self.kComboBox.setCurrentText(str(k_value))
+
+    def tune_settings(self):
+        """Run the tuner in the background, trials are reported in the first console"""
+        if self.orchestrator.engine.running():
+            QMessageBox.warning(self, "Tune", "Stop all instances before tuning")
+            return
+        config = self.current_config()
+        grid = tuner.default_grid(config)
+        if not grid:
+            QMessageBox.warning(self, "Tune", "Nothing to try, no combination fits in RAM")
+            return
+        answer = QMessageBox.question(self, "Tune", f"Time {len(grid)} combinations for {config.mode} mode, "
+                                      f"about {len(grid) * tuner.TRIAL_SECONDS // 60 + 1} minutes plus table setup?")
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        self.tuneButton.setEnabled(False)
+        self.start_button.setEnabled(False)
+        threading.Thread(target=self.run_tuner, args=(config, grid), daemon=True).start()
+
+    def run_tuner(self, config, grid):
+        results = tuner.tune(config, grid, progress=lambda message: self.route_output(1, message))
+        self.tuningFinished.emit((config.mode, results))
+
+    def tuning_finished(self, result):
+        mode, results = result
+        self.tuneButton.setEnabled(True)
+        self.start_button.setEnabled(True)
+        if not results or results[0].error:
+            self.route_output(1, "Tuning failed, no combination produced a speed line")
+            return
+        tuner.save_best(results[0], mode)
+        self.route_output(1, f"Fastest: {tuner.describe_result(results[0], mode)}")
+        self.apply_tuned()
+
+    def apply_tuned(self):
+        """Select the tuned instances, threads and K for the current mode on this host"""
+        tuned = tuner.load_tuned(self.modeComboBox.currentText())
+        if tuned is None:
+            return
+        trial, _ = tuned
+        # Regridding replaces the consoles, leave the instance count alone while they are in use
+        if trial.instances != self.current_instances and not self.orchestrator.engine.running():
+            self.update_grid_layout(trial.instances)
+        self.threadComboBox_key.setCurrentText(str(trial.threads))
+        if self.modeComboBox.currentText() == "bsgs":
+            self.kComboBox.setCurrentText(str(trial.k_value))
+
     def create_keyspaceGroupBox(self):
         keyspaceGroupBox = QGroupBox(self)
         keyspaceGroupBox.setTitle("Key Space Configuration")
@@ -513,6 +605,15 @@ class GUI(QMainWindow):
         keyspacerange_layout1.addWidget(self.bitsLineEdit)
         keyspaceMainLayout.addLayout(keyspacerange_layout)
         keyspaceMainLayout.addLayout(keyspacerange_layout1)
+        schedulerLayout = QHBoxLayout()
+        schedulerLabel = QLabel("Scheduler:", self)
+        schedulerLayout.addWidget(schedulerLabel)
+        self.schedulerComboBox = QComboBox(self)
+        self.schedulerComboBox.addItems(SCHEDULER_CHOICES)
+        self.schedulerComboBox.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Static split gives each instance one slice. Chunks hand out fixed size pieces on demand so every instance finishes together (sequential only) </span>')
+        schedulerLayout.addWidget(self.schedulerComboBox)
+        schedulerLayout.addStretch()
+        keyspaceMainLayout.addLayout(schedulerLayout)
         return keyspaceGroupBox
 
     def update_keyspace_range(self, value):
@@ -574,6 +675,14 @@ class GUI(QMainWindow):
         self.inputFileButton.clicked.connect(self.browse_input_file)
         self.inputFileButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Type the Name of database txt file or Browse location </span>')
         outputFileLayout.addWidget(self.inputFileButton)
+        self.compileButton = QPushButton("Compile", self)
+        self.compileButton.clicked.connect(self.compile_input_file)
+        self.compileButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Validate and dedupe the input file into a sorted binary hash file keyhunt loads without parsing </span>')
+        outputFileLayout.addWidget(self.compileButton)
+        self.inputStatsButton = QPushButton("Stats", self)
+        self.inputStatsButton.clicked.connect(self.scan_input_file)
+        self.inputStatsButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Scan the input file once: line count, entry formats and duplicate ratio </span>')
+        outputFileLayout.addWidget(self.inputStatsButton)
         self.found_progButton = QPushButton("🔥 Check if Found 🔥")
         self.found_progButton.clicked.connect(self.found_prog)
         self.found_progButton.setToolTip('<span style="font-size: 10pt; font-weight: bold;"> Click Here to See if your a Winner </span>')
@@ -629,6 +738,53 @@ class GUI(QMainWindow):
             file_name = os.path.basename(file_path)
             self.inputFileLineEdit.setText(file_name)
 
+    def scan_input_file(self):
+        """Full input statistics in the background, the result goes to the first console"""
+        source = keyhunt_core.input_path(self.inputFileLineEdit.text().strip())
+        if not os.path.isfile(source):
+            QMessageBox.warning(self, "Error", f"Input file not found: {source}")
+            return
+        self.route_output(1, f"Scanning {source}")
+        threading.Thread(target=self.run_input_scan, args=(source,), daemon=True).start()
+
+    def run_input_scan(self, source):
+        try:
+            stats = preflight.scan_input(source, progress=lambda message: self.route_output(1, message))
+            self.route_output(1, stats.describe())
+        except OSError as e:
+            self.route_output(1, f"Error: {e}")
+
+    def compile_input_file(self):
+        """Compile the input file in the background, progress goes to the first console"""
+        file_name = self.inputFileLineEdit.text().strip()
+        source = keyhunt_core.input_path(file_name)
+        if not os.path.isfile(source):
+            QMessageBox.warning(self, "Error", f"Input file not found: {source}")
+            return
+        if source.endswith(".bin"):
+            QMessageBox.information(self, "Compile", "This file is already a compiled binary file")
+            return
+        self.compileButton.setEnabled(False)
+        self.route_output(1, f"Compiling {source}")
+        threading.Thread(target=self.run_input_compiler, args=(source, file_name), daemon=True).start()
+
+    def run_input_compiler(self, source, file_name):
+        try:
+            manifest = input_compiler.compile_input(source, progress=lambda message: self.route_output(1, message))
+        except (OSError, ValueError) as e:
+            self.route_output(1, f"Error: {e}")
+            manifest = None
+        self.inputCompiled.emit((manifest, file_name))
+
+    def input_compiled(self, result):
+        manifest, file_name = result
+        self.compileButton.setEnabled(True)
+        if manifest is None:
+            return
+        self.route_output(1, input_compiler.describe_manifest(manifest))
+        output = manifest["output"] if os.path.dirname(file_name) else os.path.basename(manifest["output"])
+        self.inputFileLineEdit.setText(output)
+
     def found_prog(self):
         file_path = 'KEYFOUNDKEYFOUND.txt'
         self.read_and_display_file(file_path, "😀😀 Keyhunt File found. Check for Winners 😀😀.", "😞😞No Winners Yet 😞😞")
@@ -682,31 +838,10 @@ class GUI(QMainWindow):
     def closeEvent(self, event):
         """Handle window close event"""
         try:
-            # Stop all instances first
-            self.stop_all_instances()
+            # Stop all instances first, nothing may outlive the window
+            self.hide()
+            self.stop_all_instances(wait=True)
             
-            # Additional cleanup
-            if platform.system() == "Windows":
-                try:
-                    subprocess.run(["taskkill", "/f", "/im", "keyhunt.exe"], 
-                                 stdout=subprocess.DEVNULL, 
-                                 stderr=subprocess.DEVNULL,
-                                 timeout=2)
-                except subprocess.TimeoutExpired:
-                    pass
-                except Exception:
-                    pass
-            else:
-                try:
-                    subprocess.run(["pkill", "-f", "keyhunt"], 
-                                 stdout=subprocess.DEVNULL, 
-                                 stderr=subprocess.DEVNULL,
-                                 timeout=2)
-                except subprocess.TimeoutExpired:
-                    pass
-                except Exception:
-                    pass
-                
             event.accept()
         except Exception as e:
             print(f"Error during window close: {str(e)}")
@@ -0,0 +1,28 @@
+from libs.cpu_topology import CpuInfo, CpuTopology
+
+
+def two_nodes(cpus_per_node):
+    return CpuTopology([CpuInfo(cpu, (node, cpu), node, node)
+                        for node in range(2) for cpu in range(node * cpus_per_node, (node + 1) * cpus_per_node)])
+
+
+def test_plan_spreads_evenly():
+    placements = two_nodes(8).plan(4, 4)
+    assert [placement.node for placement in placements] == [0, 0, 1, 1]
+    assert sorted(cpu for placement in placements for cpu in placement.cpus) == list(range(16))
+
+
+def test_plan_caps_nodes_at_their_cpus():
+    # 5 x 3 threads fit in 16 CPUs, but 3 instances would not fit on one 8 CPU node
+    placements = two_nodes(8).plan(5, 3)
+    assert len(placements) == 5
+    assert all(len(placement.cpus) == 3 for placement in placements)
+    cpus = [cpu for placement in placements for cpu in placement.cpus]
+    assert len(cpus) == len(set(cpus))
+    assert sorted(placement.node for placement in placements if placement.node is not None) == [0, 0, 1, 1]
+
+
+def test_plan_shares_cpus_only_when_oversubscribed():
+    placements = two_nodes(4).plan(3, 4)
+    assert [len(placement.cpus) for placement in placements] == [4, 4, 4]
+    assert [placement.node for placement in placements] == [0, 1, None]
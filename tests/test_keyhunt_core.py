@@ -0,0 +1,19 @@
+import pytest
+
+from libs.keyhunt_core import split_range
+
+
+def test_split_range_covers_the_range_in_order():
+    ranges = split_range(0x80, 0xff, 3)
+    assert ranges[0][0] == 0x80 and ranges[-1][1] == 0xff
+    assert all(low <= high for low, high in ranges)
+    assert all(ranges[index][1] + 1 == ranges[index + 1][0] for index in range(len(ranges) - 1))
+
+
+def test_split_range_one_key_per_instance():
+    assert split_range(0x80, 0xff, 128) == [(key, key) for key in range(0x80, 0x100)]
+
+
+def test_split_range_refuses_more_instances_than_keys():
+    with pytest.raises(ValueError):
+        split_range(0x80, 0xff, 256)
@@ -0,0 +1,33 @@
+from libs.keyhunt_core import KeyhuntConfig, DEFAULT_N
+from libs.orchestrator import KeyhuntInstance, sequential_block, stride_step
+
+
+def make_instance(config, range_start, range_end):
+    return KeyhuntInstance(1, [], range_start, range_end, threads=config.thread_count, stride=stride_step(config),
+                           block=sequential_block(config))
+
+
+def test_bsgs_confirmed_position_stays_below_blocks_in_flight():
+    config = KeyhuntConfig(mode="bsgs", thread_count=4, move_mode="sequential", k_value=1)
+    block = 2 * DEFAULT_N
+    assert sequential_block(config) == block
+    instance = make_instance(config, 1 << 60, (1 << 61) - 1)
+    # Each thread printed the start of the block it took, none of them has finished it
+    starts = [instance.range_start + index * block for index in range(8, 12)]
+    instance.last_position = starts[-1]
+    assert instance.confirmed_position() <= starts[0]
+    assert instance.confirmed_position() >= instance.range_start
+
+
+def test_bsgs_confirmed_position_follows_n():
+    config = KeyhuntConfig(mode="bsgs", thread_count=2, move_mode="sequential", n_value="0x1000000")
+    instance = make_instance(config, 0, (1 << 40) - 1)
+    instance.last_position = 100 * 0x2000000
+    assert instance.confirmed_position() == 98 * 0x2000000
+
+
+def test_address_confirmed_position_counts_stride():
+    config = KeyhuntConfig(mode="address", thread_count=2, move_mode="sequential", stride="0x10")
+    instance = make_instance(config, 0, (1 << 50) - 1)
+    instance.keys_done = 5 * 0x100000000
+    assert instance.confirmed_position() == 3 * 0x100000000 * 0x10
@@ -5,15 +5,27 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog, colorchooser
 import os
 import glob
-import subprocess
 import webbrowser
-import signal
-import platform
 import multiprocessing
-import threading
 import queue
 import configparser
+import threading
 from datetime import datetime
+from libs import keyhunt_core
+from libs.chunk_scheduler import SCHEDULER_CHOICES, chunk_bits_from_choice
+from libs import memory_planner
+from libs import input_compiler
+from libs import preflight
+from libs import tuner
+from libs.restart_policy import describe_exit
+from libs.resource_sampler import describe_sample
+from libs.tk_orchestrator import TkOrchestrator
+from libs import console_layout
+from libs.coordinator import CoordinatorClient, status_text
+
+MAX_SCROLLBACK_LINES = 5000
+COORDINATOR_REFRESH_MS = 2000
+SUMMARY_TICKS = 10  # refresh the per instance summary lines every 10th console flush, once a second
 
 class ConsoleWindow(ttk.Frame):
     def __init__(self, parent, title="Console"):
@@ -21,7 +33,6 @@ class ConsoleWindow(ttk.Frame):
         self.title = title
         self.output_queue = queue.Queue()
         self.setup_ui()
-        self.after(100, self.check_queue)
 
     def setup_ui(self):
         # Create text widget with scrollbar
@@ -29,67 +40,56 @@ class ConsoleWindow(ttk.Frame):
         scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.text.yview)
         self.text.configure(yscrollcommand=scrollbar.set)
         
+        # CPU, memory and scheduler counters sampled from /proc
+        self.resource_label = ttk.Label(self, text="")
+        # Stall time reported by the watchdog, empty while the instance is healthy
+        self.status_label = ttk.Label(self, text="", foreground="red")
+
         # Pack widgets
+        self.resource_label.pack(side=tk.TOP, fill=tk.X)
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
         self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+    def set_resources(self, text):
+        if self.resource_label.cget("text") != text:
+            self.resource_label.configure(text=text)
+
+    def set_status(self, text):
+        if self.status_label.cget("text") != text:
+            self.status_label.configure(text=text)
+
     def append_output(self, text):
         self.output_queue.put(text)
 
-    def check_queue(self):
+    def set_output(self, text):
+        """Replace the text, lines still queued are dropped with the old text"""
         try:
             while True:
-                text = self.output_queue.get_nowait()
-                self.text.insert(tk.END, text + "\n")
-                self.text.see(tk.END)
-                self.text.update_idletasks()
+                self.output_queue.get_nowait()
         except queue.Empty:
             pass
-        finally:
-            self.after(100, self.check_queue)
-
-class CommandThread(threading.Thread):
-    def __init__(self, command, console):
-        super().__init__()
-        self.command = command
-        self.console = console
-        self.process = None
-        self.daemon = True
-        self.running = True
-
-    def run(self):
+        self.text.delete('1.0', tk.END)
+        if text:
+            self.text.insert(tk.END, text + "\n")
+        self.text.see(tk.END)
+
+    def flush(self):
+        """Drain everything queued since the last tick and insert it in one go, called by the app's single poll"""
+        lines = []
         try:
-            self.process = subprocess.Popen(
-                self.command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1,
-                creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-            )
-            
-            while self.running:
-                line = self.process.stdout.readline()
-                if not line:
-                    break
-                self.console.append_output(line.strip())
-                
-        except Exception as e:
-            self.console.append_output(f"Error: {str(e)}")
+            while True:
+                lines.append(self.output_queue.get_nowait())
+        except queue.Empty:
+            pass
         finally:
-            if self.process:
-                self.process.stdout.close()
-                self.process.wait()
-
-    def terminate(self):
-        self.running = False
-        if self.process:
-            if platform.system() == "Windows":
-                subprocess.run(["taskkill", "/f", "/t", "/pid", str(self.process.pid)], 
-                             stdout=subprocess.DEVNULL, 
-                             stderr=subprocess.DEVNULL)
-            else:
-                self.process.terminate()
+            if lines:
+                self.text.insert(tk.END, "\n".join(lines) + "\n")
+                # Keep a bounded scrollback by dropping the oldest lines
+                line_count = int(self.text.index('end-1c').split('.')[0])
+                if line_count > MAX_SCROLLBACK_LINES:
+                    self.text.delete('1.0', f"{line_count - MAX_SCROLLBACK_LINES + 1}.0")
+                self.text.see(tk.END)
 
 class KeyHunterGUI:
     def __init__(self, root):
@@ -97,7 +97,18 @@ class KeyHunterGUI:
         self.root.title("KeyHunter Puzzles TKinter GUI ")
         self.current_instances = 1
         self.console_frames = []
-        self.command_threads = {}
+        self.summary_list = None  # one line per instance when there are too many for a console each
+        self.shared_console = None
+        self.selected_log = None
+        self.summary_ticks = 0
+        self.orchestrator = TkOrchestrator(root, self.route_output, on_finished=self.command_finished,
+                                           on_tick=self.flush_consoles)
+        try:
+            metrics = self.orchestrator.engine.serve_metrics()  # only when enabled in config.ini
+            if metrics:
+                print(f"Metrics served on {metrics.url}")
+        except OSError as e:
+            print(f"Metrics endpoint not started: {e}")
         self.cpu_count = multiprocessing.cpu_count()
         
         # Set theme
@@ -106,6 +117,8 @@ class KeyHunterGUI:
         
         self.setup_ui()
         self.load_config()
+        self.apply_tuned()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         # Create main container
@@ -134,17 +147,20 @@ class KeyHunterGUI:
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Settings", command=self.open_settings)
+        file_menu.add_command(label="Attach to Coordinator...", command=self.attach_coordinator)
         file_menu.add_separator()
-        file_menu.add_command(label="Quit", command=self.root.quit)
+        file_menu.add_command(label="Quit", command=self.on_close)
         menubar.add_cascade(label="File", menu=file_menu)
 
         # Instances menu
         instances_menu = tk.Menu(menubar, tearoff=0)
-        for num in [1, 2, 4, 6, 8]:
+        for num in [1, 2, 4, 6, 8, 16, 32]:
             instances_menu.add_command(
                 label=str(num),
                 command=lambda n=num: self.update_grid_layout(n)
             )
+        instances_menu.add_separator()
+        instances_menu.add_command(label="Custom...", command=self.choose_instance_count)
         menubar.add_cascade(label="Instances", menu=instances_menu)
 
         # Help menu
@@ -173,6 +189,14 @@ class KeyHunterGUI:
         self.thread_combo.pack(side=tk.LEFT, padx=5)
         self.update_cpu_options()
 
+        # Pin instances to cores and NUMA nodes
+        self.pin_var = tk.BooleanVar()
+        ttk.Checkbutton(row1, text="Pin CPUs", variable=self.pin_var).pack(side=tk.LEFT, padx=5)
+
+        # Restart crashed instances with backoff
+        self.restart_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(row1, text="Auto Restart", variable=self.restart_var).pack(side=tk.LEFT, padx=5)
+
         # Crypto Type
         ttk.Label(row1, text="Crypto:").pack(side=tk.LEFT, padx=5)
         self.crypto_combo = ttk.Combobox(row1, values=["btc", "eth"], width=5)
@@ -211,6 +235,21 @@ class KeyHunterGUI:
         self.n_value_entry.insert(0, "0x1000000000000000")
         self.n_value_entry.pack(side=tk.LEFT, padx=5)
 
+        # BSGS memory estimate
+        row2 = ttk.Frame(hunt_frame)
+        row2.pack(fill=tk.X, pady=2)
+        self.memory_label = ttk.Label(row2, text="")
+        self.memory_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(row2, text="Fit K to RAM", command=self.fit_k_to_memory).pack(side=tk.LEFT, padx=5)
+        self.tune_button = ttk.Button(row2, text="Tune", command=self.tune_settings)
+        self.tune_button.pack(side=tk.LEFT, padx=5)
+        self.share_table_var = tk.BooleanVar()
+        ttk.Checkbutton(row2, text="Share BSGS table", variable=self.share_table_var).pack(side=tk.LEFT, padx=5)
+        self.k_combo.bind('<<ComboboxSelected>>', lambda e: self.update_memory_estimate())
+        self.n_value_entry.bind('<KeyRelease>', lambda e: self.update_memory_estimate())
+        self.mode_combo.bind('<<ComboboxSelected>>', lambda e: self.update_memory_estimate(), add="+")
+        self.mode_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_tuned(), add="+")
+
         # Key Space Configuration
         keyspace_frame = ttk.LabelFrame(config_frame, text="Key Space Configuration", padding="5")
         keyspace_frame.pack(fill=tk.X, pady=5)
@@ -221,6 +260,12 @@ class KeyHunterGUI:
         self.keyspace_entry.insert(0, "400000000000000000:7FFFFFFFFFFFFFFFFF")
         self.keyspace_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
+        # Scheduler
+        ttk.Label(keyspace_frame, text="Scheduler:").pack(side=tk.LEFT, padx=5)
+        self.scheduler_combo = ttk.Combobox(keyspace_frame, values=SCHEDULER_CHOICES, width=18, state="readonly")
+        self.scheduler_combo.set(SCHEDULER_CHOICES[0])
+        self.scheduler_combo.pack(side=tk.LEFT, padx=5)
+
         # Bits slider and entry
         bits_frame = ttk.Frame(keyspace_frame)
         bits_frame.pack(fill=tk.X, pady=5)
@@ -253,12 +298,16 @@ class KeyHunterGUI:
         self.input_file_entry.insert(0, "btc.txt")
         self.input_file_entry.pack(side=tk.LEFT, padx=5)
         ttk.Button(file_frame, text="Browse", command=self.browse_input_file).pack(side=tk.LEFT, padx=5)
+        self.compile_button = ttk.Button(file_frame, text="Compile", command=self.compile_input_file)
+        self.compile_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Stats", command=self.scan_input_file).pack(side=tk.LEFT, padx=5)
 
         # Buttons
         button_frame = ttk.Frame(config_frame)
         button_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Button(button_frame, text="Start All Instances", command=self.start_all_instances).pack(side=tk.LEFT, padx=5)
+        self.start_button = ttk.Button(button_frame, text="Start All Instances", command=self.start_all_instances)
+        self.start_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Stop All Instances", command=self.stop_all_instances).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🔥 Check if Found 🔥", command=self.found_prog).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="💾 Check Progress 💾", command=self.check_prog).pack(side=tk.LEFT, padx=5)
@@ -278,31 +327,36 @@ class KeyHunterGUI:
     def update_grid_layout(self, num_instances):
         self.current_instances = num_instances
         self.console_frames.clear()
+        self.summary_list = self.shared_console = self.selected_log = None
         
         # Clear existing consoles
         for widget in self.console_grid.winfo_children():
             widget.destroy()
-
-        # Calculate grid dimensions
-        if num_instances == 1:
-            rows, cols = 1, 1
-        elif num_instances == 2:
-            rows, cols = 1, 2
-        elif num_instances == 4:
-            rows, cols = 2, 2
-        elif num_instances == 6:
-            rows, cols = 2, 3
-        elif num_instances == 8:
-            rows, cols = 2, 4
-
-        # Create new consoles
-        instance_number = 1
-        for row in range(rows):
-            for col in range(cols):
-                console = ConsoleWindow(self.console_grid, f"Instance {instance_number}/{num_instances}")
-                console.grid(row=row, column=col, sticky="nsew", padx=5, pady=5)
+        for i in range(self.console_grid.grid_size()[0]):
+            self.console_grid.grid_columnconfigure(i, weight=0)
+        for i in range(self.console_grid.grid_size()[1]):
+            self.console_grid.grid_rowconfigure(i, weight=0)
+
+        if console_layout.uses_grid(num_instances):
+            # Create new consoles
+            rows, cols = console_layout.grid_shape(num_instances)
+            for index in range(num_instances):
+                console = ConsoleWindow(self.console_grid, f"Instance {index + 1}/{num_instances}")
+                console.grid(row=index // cols, column=index % cols, sticky="nsew", padx=5, pady=5)
                 self.console_frames.append(console)
-                instance_number += 1
+        else:
+            # Dozens of consoles would be slow to draw, show a line per instance and the selected one's console
+            rows, cols = 1, 2
+            self.console_frames.extend(console_layout.InstanceLog(number) for number in range(1, num_instances + 1))
+            self.summary_list = tk.Listbox(self.console_grid, font="TkFixedFont", width=70, exportselection=False)
+            self.summary_list.insert(tk.END, *["" for _ in range(num_instances)])
+            self.summary_list.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+            self.summary_list.bind('<<ListboxSelect>>', lambda e: self.select_instance_console())
+            self.shared_console = ConsoleWindow(self.console_grid, "Selected instance")
+            self.shared_console.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+            self.update_summary()
+            self.summary_list.selection_set(0)
+            self.select_instance_console()
 
         # Update grid weights
         for i in range(rows):
@@ -312,6 +366,110 @@ class KeyHunterGUI:
 
         # Update CPU options
         self.update_cpu_options()
+        self.update_memory_estimate()
+
+    def choose_instance_count(self):
+        count = simpledialog.askinteger("Instances", "Number of keyhunt instances:", parent=self.root,
+                                        initialvalue=self.current_instances, minvalue=1,
+                                        maxvalue=console_layout.MAX_INSTANCES)
+        if count:
+            self.update_grid_layout(count)
+
+    def select_instance_console(self):
+        """Show the selected instance's scrollback and new output in the shared console"""
+        selection = self.summary_list.curselection()
+        if not selection:
+            return
+        if self.selected_log is not None:
+            self.selected_log.attach(None)
+        self.selected_log = self.console_frames[selection[0]]
+        self.selected_log.attach(self.shared_console)
+
+    def visible_consoles(self):
+        return [self.shared_console] if self.shared_console is not None else self.console_frames
+
+    def update_summary(self):
+        if self.summary_list is None:
+            return
+        engine = self.orchestrator.engine
+        count = len(self.console_frames)
+        for row in range(count):
+            text = console_layout.summary_line(engine, row + 1, count)
+            if self.summary_list.get(row) != text:
+                selected = row in self.summary_list.curselection()
+                self.summary_list.delete(row)
+                self.summary_list.insert(row, text)
+                if selected:
+                    self.summary_list.selection_set(row)
+
+    def update_memory_estimate(self):
+        """Show the RAM all instances need with the current BSGS settings"""
+        if self.mode_combo.get() != "bsgs":
+            self.memory_label.configure(text="")
+            return
+        try:
+            text, fits = memory_planner.describe_plan("bsgs", self.k_combo.get(),
+                                                      self.n_value_entry.get(), self.current_instances)
+        except ValueError:
+            text, fits = "Invalid N value", False
+        self.memory_label.configure(text=text, foreground="" if fits else "red")
+
+    def fit_k_to_memory(self):
+        try:
+            k_value = memory_planner.largest_fitting_k(self.n_value_entry.get(), self.current_instances)
+        except ValueError:
+            messagebox.showwarning("Error", "Invalid N value")
+            return
+        if k_value is None:
+            messagebox.showwarning("Not Enough Memory", "No K factor fits in RAM, use fewer instances or a smaller N value")
+            return
+        self.k_combo.set(str(k_value))
+        self.update_memory_estimate()
+
+    def tune_settings(self):
+        """Run the tuner in the background, trials are reported in the first console"""
+        if self.orchestrator.engine.running():
+            messagebox.showwarning("Tune", "Stop all instances before tuning")
+            return
+        config = self.current_config()
+        grid = tuner.default_grid(config)
+        if not grid:
+            messagebox.showwarning("Tune", "Nothing to try, no combination fits in RAM")
+            return
+        if not messagebox.askyesno("Tune", f"Time {len(grid)} combinations for {config.mode} mode, "
+                                   f"about {len(grid) * tuner.TRIAL_SECONDS // 60 + 1} minutes plus table setup?"):
+            return
+        self.tune_button.configure(state="disabled")
+        self.start_button.configure(state="disabled")
+        threading.Thread(target=self.run_tuner, args=(config, grid), daemon=True).start()
+
+    def run_tuner(self, config, grid):
+        results = tuner.tune(config, grid, progress=lambda message: self.route_output(1, message))
+        self.orchestrator.ui_queue.put((self.tuning_finished, config.mode, results))
+
+    def tuning_finished(self, mode, results):
+        self.tune_button.configure(state="normal")
+        self.start_button.configure(state="normal")
+        if not results or results[0].error:
+            self.route_output(1, "Tuning failed, no combination produced a speed line")
+            return
+        tuner.save_best(results[0], mode)
+        self.route_output(1, f"Fastest: {tuner.describe_result(results[0], mode)}")
+        self.apply_tuned()
+
+    def apply_tuned(self):
+        """Select the tuned instances, threads and K for the current mode on this host"""
+        tuned = tuner.load_tuned(self.mode_combo.get())
+        if tuned is None:
+            return
+        trial, _ = tuned
+        # Regridding replaces the consoles, leave the instance count alone while they are in use
+        if trial.instances != self.current_instances and not self.orchestrator.engine.running():
+            self.update_grid_layout(trial.instances)
+        self.thread_combo.set(str(trial.threads))
+        if self.mode_combo.get() == "bsgs":
+            self.k_combo.set(str(trial.k_value))
+            self.update_memory_estimate()
 
     def update_look_type_options(self, event=None):
         crypto = self.crypto_combo.get()
@@ -367,176 +525,112 @@ class KeyHunterGUI:
         except ValueError:
             messagebox.showinfo("Range Error", "Range should be in Bit 1-256")
 
-    def construct_command_key(self, start_range, end_range):
-        """Construct keyhunt command with current configuration"""
-        mode = self.mode_combo.get()
-        thread_count = self.thread_combo.get()
-        base_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "keyhunt")
-
-        if platform.system() == "Windows":
-            command = [os.path.join(base_path, "keyhunt.exe"), "-m", mode, "-t", thread_count]
-        else:
-            command = [os.path.join(base_path, "keyhunt"), "-m", mode, "-t", thread_count]
-
-        # Add range
-        command.extend(["-r", f"{format(start_range, 'x')}:{format(end_range, 'x')}"])
-
-        # Add other parameters
-        file = self.input_file_entry.get().strip()
-        if file:
-            input_file_relative_path = ["input", file]
-            input_file_path = os.path.join(*input_file_relative_path)
-            command.extend(["-f", input_file_path])
-
-        move_mode = self.move_mode_combo.get()
-        if move_mode == 'random':
-            if mode == 'bsgs':
-                command.extend(["-B", move_mode])
-            else:
-                command.append("-R")
-        elif move_mode == 'sequential':
-            if mode == 'bsgs':
-                command.extend(["-B", move_mode])
-            else:
-                command.append("-S")
-        elif move_mode == 'backward' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-        elif move_mode == 'dance' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-        elif move_mode == 'both' and mode == 'bsgs':
-            command.extend(["-B", move_mode])
-
-        if not (mode == 'bsgs' and move_mode == 'both'):
-            stride = self.stride_entry.get().strip()
-            if stride:
-                command.extend(["-I", stride])
-
-        crypto = self.crypto_combo.get()
-        if crypto == "eth":
-            command.extend(["-c", crypto])
-            
-        look = self.look_combo.get()
-        if look and crypto != "eth":  # Only add look type if not ETH
-            command.extend(["-l", look])
-
-        if mode == 'bsgs':
-            n_value = self.n_value_entry.get().strip()
-            if n_value:
-                command.extend(["-n", n_value])
-            kamount = self.k_combo.get()
-            command.extend(["-k", kamount])
-
-        if self.quiet_var.get():
-            command.append("-q")
-
-        return command
+    def current_config(self):
+        """Collect the shared configuration widgets into a KeyhuntConfig"""
+        return keyhunt_core.KeyhuntConfig(
+            mode=self.mode_combo.get(),
+            thread_count=self.thread_combo.get(),
+            crypto=self.crypto_combo.get(),
+            move_mode=self.move_mode_combo.get(),
+            stride=self.stride_entry.get(),
+            look=self.look_combo.get(),
+            input_file=self.input_file_entry.get(),
+            k_value=self.k_combo.get(),
+            n_value=self.n_value_entry.get(),
+            quiet=self.quiet_var.get(),
+            save_table=self.share_table_var.get(),
+        )
 
     def start_all_instances(self):
+        # Get the range from shared input
+        range_text = self.keyspace_entry.get().strip()
+        if not range_text:
+            messagebox.showwarning("Error", "Please enter a range")
+            return
         try:
-            # Get the range from shared input
-            range_text = self.keyspace_entry.get().strip()
-            if not range_text:
-                messagebox.showwarning("Error", "Please enter a range")
-                return
-
-            start_range, end_range = range_text.split(':')
-            # Convert hex strings to integers
-            start_range = int(start_range, 16)
-            end_range = int(end_range, 16)
+            start_range, end_range = keyhunt_core.parse_range(range_text)
+        except ValueError as e:
+            messagebox.showwarning("Error", f"Invalid range format: {str(e)}\nPlease use hex format (e.g., 400000000000000000:7FFFFFFFFFFFFFFFFF)")
+            return
+        try:
+            config = self.current_config()
+        except ValueError as e:
+            messagebox.showwarning("Error", str(e))
+            return
 
-            # Split range among instances
+        chunk_bits = chunk_bits_from_choice(self.scheduler_combo.get())
+        # Split range among instances, refused when there are more instances than keys
+        try:
             ranges = self.split_range(start_range, end_range, len(self.console_frames))
-
-            # Start each instance with its portion of the range
-            for i, console in enumerate(self.console_frames):
-                instance_start, instance_end = ranges[i]
-                self.start_instance(console, instance_start, instance_end, i + 1)
-
         except ValueError as e:
-            messagebox.showwarning("Error", f"Invalid range format: {str(e)}\nPlease use hex format (e.g., 400000000000000000:7FFFFFFFFFFFFFFFFF)")
+            messagebox.showwarning("Cannot Start", str(e))
+            return
+
+        for i, console in enumerate(self.console_frames):
+            instance_start, instance_end = ranges[i]
+            console.append_output(f"Instance {i + 1}/{len(self.console_frames)}")
+            if chunk_bits:
+                console.append_output(f"Range: {format(start_range, 'x')} to {format(end_range, 'x')} in chunks of 2^{chunk_bits} keys")
+            else:
+                console.append_output(f"Range: {format(instance_start, 'x')} to {format(instance_end, 'x')}")
 
-    def start_instance(self, console, start_range, end_range, instance_number):
-        """Start a single instance with the given range"""
-        console.append_output(f"Instance {instance_number}/{len(self.console_frames)}")
-        console.append_output(f"Range: {format(start_range, 'x')} to {format(end_range, 'x')}")
-        
-        command = self.construct_command_key(start_range, end_range)
-        self.execute_command(console, command, instance_number)
-
-    def execute_command(self, console, command, instance_number):
-        """Execute command and show output in the given console window"""
-        # Stop existing thread for this instance if it exists
-        if instance_number in self.command_threads:
-            self.command_threads[instance_number].terminate()
-            self.command_threads[instance_number].join()
-
-        # Convert command list to string for display
-        command_str = ' '.join(str(x) for x in command)
-        console.append_output(f"Executing command: {command_str}")
-
-        # Create and start new thread for this instance
-        thread = CommandThread(command, console)
-        thread.start()
-        
-        # Store the thread
-        self.command_threads[instance_number] = thread
+        self.orchestrator.engine.pin_cpus = self.pin_var.get()
+        self.orchestrator.engine.auto_restart = self.restart_var.get()
+        try:
+            # Refuses input files that don't suit the mode and BSGS tables that would not fit in RAM
+            self.orchestrator.engine.start_all(config, ranges, chunk_bits=chunk_bits, wait=False)
+        except ValueError as e:
+            messagebox.showwarning("Cannot Start", str(e))
+
+    def flush_consoles(self):
+        """One Tk timer for all consoles instead of one per console"""
+        watchdog = self.orchestrator.engine.watchdog
+        sampler = self.orchestrator.engine.sampler
+        for number, console in enumerate(self.console_frames, start=1):
+            console.flush()
+            stall = watchdog.describe_stall(number)
+            console.set_status(f"Stalled: {stall}" if stall else "")
+            console.set_resources(describe_sample(sampler.latest(number)))
+        self.summary_ticks += 1
+        if self.summary_ticks >= SUMMARY_TICKS:
+            self.summary_ticks = 0
+            self.update_summary()
+
+    def route_output(self, instance_number, line):
+        """Called from the supervisor thread, ConsoleWindow.append_output only queues"""
+        if 0 < instance_number <= len(self.console_frames):
+            self.console_frames[instance_number - 1].append_output(line)
+
+    def command_finished(self, instance_number, exit_code):
+        """Handle command completion for a specific instance"""
+        if not 0 < instance_number <= len(self.console_frames):
+            return
+        console = self.console_frames[instance_number - 1]
+        instance = self.orchestrator.engine.instances.get(instance_number)
+        if instance:
+            console.append_output(describe_exit(exit_code, instance.stop_requested, instance.last_error))
+        else:
+            console.append_output(f"Process finished with exit code {exit_code}")
 
-    def stop_all_instances(self):
-        """Stop all running instances"""
+    def stop_all_instances(self, wait=False):
+        """Stop all running instances, each console reports its exit once the escalation is done"""
         try:
-            for instance_number, thread in list(self.command_threads.items()):
-                if thread and thread.is_alive():
-                    thread.terminate()
-                    thread.join()
-                    
-                    # Kill any remaining keyhunt processes
-                    if platform.system() == "Windows":
-                        try:
-                            subprocess.run(["taskkill", "/f", "/im", "keyhunt.exe"], 
-                                         stdout=subprocess.DEVNULL, 
-                                         stderr=subprocess.DEVNULL,
-                                         timeout=2)
-                        except subprocess.TimeoutExpired:
-                            pass
-                        except Exception:
-                            pass
-                    else:
-                        try:
-                            subprocess.run(["pkill", "-f", "keyhunt"], 
-                                         stdout=subprocess.DEVNULL, 
-                                         stderr=subprocess.DEVNULL,
-                                         timeout=2)
-                        except subprocess.TimeoutExpired:
-                            pass
-                        except Exception:
-                            pass
-                    
-                if instance_number <= len(self.console_frames):
-                    self.console_frames[instance_number - 1].append_output("Process stopped by user")
-            
-            # Clear the thread dictionary
-            self.command_threads.clear()
+            # Only the processes this window started are signalled, on the supervisor thread
+            stopping = self.orchestrator.engine.stop_all()
+            if wait:
+                stopping.result()
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
 
+    def on_close(self):
+        """Stop every instance before the window goes away"""
+        self.root.withdraw()
+        self.stop_all_instances(wait=True)
+        self.root.destroy()
+
     def split_range(self, start, end, num_splits):
         """Split a range into equal parts"""
-        total_range = end - start
-        chunk_size = total_range // num_splits
-        remainder = total_range % num_splits
-        
-        ranges = []
-        current_start = start
-        
-        for i in range(num_splits):
-            extra = 1 if i < remainder else 0
-            current_end = current_start + chunk_size + extra - 1
-            if i == num_splits - 1:
-                current_end = end
-            ranges.append((current_start, current_end))
-            current_start = current_end + 1
-        
-        return ranges
+        return keyhunt_core.split_range(start, end, num_splits)
 
     def browse_input_file(self):
         file_path = filedialog.askopenfilename(
@@ -552,6 +646,54 @@ class KeyHunterGUI:
             self.input_file_entry.delete(0, tk.END)
             self.input_file_entry.insert(0, file_name)
 
+    def scan_input_file(self):
+        """Full input statistics in the background, the result goes to the first console"""
+        source = keyhunt_core.input_path(self.input_file_entry.get().strip())
+        if not os.path.isfile(source):
+            messagebox.showwarning("Error", f"Input file not found: {source}")
+            return
+        self.route_output(1, f"Scanning {source}")
+        threading.Thread(target=self.run_input_scan, args=(source,), daemon=True).start()
+
+    def run_input_scan(self, source):
+        try:
+            stats = preflight.scan_input(source, progress=lambda message: self.route_output(1, message))
+            self.route_output(1, stats.describe())
+        except OSError as e:
+            self.route_output(1, f"Error: {e}")
+
+    def compile_input_file(self):
+        """Compile the input file in the background, progress goes to the first console"""
+        file_name = self.input_file_entry.get().strip()
+        source = keyhunt_core.input_path(file_name)
+        if not os.path.isfile(source):
+            messagebox.showwarning("Error", f"Input file not found: {source}")
+            return
+        if source.endswith(".bin"):
+            messagebox.showinfo("Compile", "This file is already a compiled binary file")
+            return
+        self.compile_button.configure(state="disabled")
+        self.route_output(1, f"Compiling {source}")
+        threading.Thread(target=self.run_input_compiler, args=(source, file_name), daemon=True).start()
+
+    def run_input_compiler(self, source, file_name):
+        try:
+            manifest = input_compiler.compile_input(source, progress=lambda message: self.route_output(1, message))
+        except (OSError, ValueError) as e:
+            self.route_output(1, f"Error: {e}")
+            manifest = None
+        # Hand the result to the Tk thread through the orchestrator's dispatch queue
+        self.orchestrator.ui_queue.put((self.input_compiled, file_name, manifest))
+
+    def input_compiled(self, file_name, manifest):
+        self.compile_button.configure(state="normal")
+        if manifest is None:
+            return
+        self.route_output(1, input_compiler.describe_manifest(manifest))
+        output = manifest["output"] if os.path.dirname(file_name) else os.path.basename(manifest["output"])
+        self.input_file_entry.delete(0, tk.END)
+        self.input_file_entry.insert(0, output)
+
     def found_prog(self):
         file_path = 'KEYFOUNDKEYFOUND.txt'
         self.read_and_display_file(file_path, "😀😀 Keyhunt File found. Check for Winners 😀😀.", "😞😞No Winners Yet 😞😞")
@@ -732,6 +874,38 @@ class KeyHunterGUI:
         # Load current range if available
         load_current_range()
 
+    def attach_coordinator(self):
+        """Watch a distributed run, see keyhunt_runner.py coordinator"""
+        client = CoordinatorClient.from_config()
+        url = simpledialog.askstring("Attach to Coordinator", "Coordinator URL:", initialvalue=client.url,
+                                     parent=self.root)
+        if not url or not url.strip():
+            return
+        client.url = url.strip().rstrip("/")
+        window = tk.Toplevel(self.root)
+        window.title(f"Coordinator {client.url}")
+        window.geometry("760x420")
+        text = tk.Text(window, wrap=tk.NONE, font=("Courier", 10))
+        text.insert(tk.END, f"Connecting to {client.url} ...")
+        text.config(state=tk.DISABLED)
+        text.pack(fill=tk.BOTH, expand=True)
+
+        def show(widget, status):
+            if not widget.winfo_exists():
+                return
+            widget.config(state=tk.NORMAL)
+            widget.delete("1.0", tk.END)
+            widget.insert(tk.END, status)
+            widget.config(state=tk.DISABLED)
+            widget.after(COORDINATOR_REFRESH_MS, fetch)
+
+        def fetch():
+            # One request at a time, the next is scheduled once this one is shown
+            threading.Thread(target=lambda: self.orchestrator.ui_queue.put((show, text, status_text(client))),
+                             daemon=True).start()
+
+        fetch()
+
     def open_settings(self):
         # Create a new top-level window
         settings_window = tk.Toplevel(self.root)
@@ -932,7 +1106,7 @@ class KeyHunterGUI:
             colors = self.get_theme_colors(theme)
         
         # Apply theme to all console windows
-        for console in self.console_frames:
+        for console in self.visible_consoles():
             console.text.configure(bg=colors['bg'], fg=colors['text'])
         
         # Save theme to config